@@ -1,14 +1,30 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func, desc
-from typing import Optional, List
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Select, and_, or_, func, desc, select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from typing import AsyncIterator, Dict, Iterable, Optional, List, Set
 from datetime import datetime, date, timedelta
-from collections import defaultdict
 import calendar
 
-from ..database.connection import get_db
+from ..database.connection import AsyncSessionLocal, get_db
 from ..models.attendance import Attendance
+from ..models.session_usage import SessionUsage
 from ..models.student import Student
+from ..utils.broker import Broker
+from ..utils.cache import cache_key, cached, encode_json, response_cache
+from ..utils.session_usage import SESSION_CONSUMING_STATUSES, consume_sessions
+from ..utils.sse import sse_comment, sse_event, sse_response
+from ..utils.table_versions import bump_tables, table_versions
+from ..utils.export import export_response
+from ..utils.fast_json import FastJSONResponse, row_dicts
+from ..utils.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+from ..utils.projection import FIELDS_DESCRIPTION, parse_fields, with_fields
+from ..utils.attendance_rollup import (
+    AttendanceSummary,
+    load_monthly_summaries,
+    month_key,
+    refresh_monthly_stats
+)
 from ..schemas.attendance import (
     Attendance as AttendanceSchema,
     AttendanceCreate,
@@ -23,75 +39,159 @@ from ..schemas.attendance import (
 
 router = APIRouter(prefix="/attendance", tags=["attendance"])
 
-@router.get("/", response_model=List[AttendanceWithStudent])
-def get_attendance_records(
-    date_filter: Optional[date] = Query(None, description="Filter by specific date"),
-    student_id: Optional[int] = Query(None, description="Filter by student ID"),
-    start_date: Optional[date] = Query(None, description="Filter from start date"),
-    end_date: Optional[date] = Query(None, description="Filter to end date"),
-    limit: int = Query(100, ge=1, le=500, description="Number of records to return"),
-    offset: int = Query(0, ge=0, description="Number of records to skip"),
-    db: Session = Depends(get_db)
+ATTENDANCE_EXPORT_FIELDS = [
+    'id', 'student_id', 'student_name', 'student_grade', 'date', 'status',
+    'time_in', 'time_out', 'note', 'created_at'
+]
+
+# Listing rows are sent as dicts with the response model's fields, in its order
+ATTENDANCE_LIST_FIELDS = list(AttendanceWithStudent.model_fields)
+
+# The column selected for each listing field
+ATTENDANCE_COLUMNS = {
+    'id': Attendance.id,
+    'student_id': Attendance.student_id,
+    'date': Attendance.date,
+    'status': Attendance.status,
+    'time_in': Attendance.time_in,
+    'time_out': Attendance.time_out,
+    'note': Attendance.note,
+    'created_at': Attendance.created_at,
+    'student_name': Student.name.label('student_name'),
+    'student_grade': Student.grade.label('student_grade')
+}
+
+# Listing pages follow ix_attendances_date_id backwards, so a page (and a
+# cursor page deep into the history) is read in index order without sorting
+ATTENDANCE_PAGE_ORDER = (desc(Attendance.date), desc(Attendance.id))
+
+# Columns the cursor and the in-page ordering are built from, selected
+# whatever fields were requested
+ATTENDANCE_CURSOR_FIELDS = ('date', 'student_name', 'id')
+
+# Seconds between keep-alive comments on an idle attendance board stream
+TODAY_STREAM_HEARTBEAT_SECONDS = 15
+
+# Pushes changes to today's attendance to /today/stream subscribers
+attendance_board = Broker()
+
+def _dialect_insert(db: AsyncSession):
+    """Return the INSERT construct supporting ON CONFLICT for the session's database"""
+    if db.get_bind().dialect.name == "postgresql":
+        return postgresql.insert
+    return sqlite.insert
+
+def _attendance_records_query(
+    date_filter: Optional[date],
+    student_id: Optional[int],
+    start_date: Optional[date],
+    end_date: Optional[date],
+    fields: Iterable[str] = ATTENDANCE_EXPORT_FIELDS
 ):
-    """Get attendance records with optional filtering"""
+    """Attendance rows joined with their student, filtered but not yet ordered"""
     
-    # Build query with joins
-    query = db.query(
-        Attendance.id,
-        Attendance.student_id,
-        Attendance.date,
-        Attendance.status,
-        Attendance.time_in,
-        Attendance.time_out,
-        Attendance.note,
-        Attendance.created_at,
-        Student.name.label('student_name'),
-        Student.grade.label('student_grade')
-    ).join(Student, Attendance.student_id == Student.id)
+    # Build query with joins, selecting only the columns of ``fields``
+    query = select(*(ATTENDANCE_COLUMNS[field] for field in fields)).join(
+        Student, Attendance.student_id == Student.id
+    )
     
     # Apply filters
     if date_filter:
-        query = query.filter(Attendance.date == date_filter)
+        query = query.where(Attendance.date == date_filter)
     
     if student_id:
-        query = query.filter(Attendance.student_id == student_id)
+        query = query.where(Attendance.student_id == student_id)
     
     if start_date:
-        query = query.filter(Attendance.date >= start_date)
+        query = query.where(Attendance.date >= start_date)
     
     if end_date:
-        query = query.filter(Attendance.date <= end_date)
+        query = query.where(Attendance.date <= end_date)
     
-    # Order by date desc, then by student name
-    query = query.order_by(desc(Attendance.date), Student.name)
+    return query
+
+def _after_cursor(query: Select, last_date: date, last_id: int) -> Select:
+    """Rows after (last_date, last_id) in ATTENDANCE_PAGE_ORDER"""
+    # A row value rather than OR-ed conditions, so the index still gives the order
+    return query.where(tuple_(Attendance.date, Attendance.id) < (last_date, last_id))
+
+def _by_date_and_name(rows: list) -> list:
+    """A page's rows newest date first, by student name within a date"""
+    rows = sorted(rows, key=lambda row: (row.student_name, row.id))
+    return sorted(rows, key=lambda row: row.date, reverse=True)
+
+@router.get("/", response_model=List[AttendanceWithStudent])
+async def get_attendance_records(
+    date_filter: Optional[date] = Query(None, description="Filter by specific date"),
+    student_id: Optional[int] = Query(None, description="Filter by student ID"),
+    start_date: Optional[date] = Query(None, description="Filter from start date"),
+    end_date: Optional[date] = Query(None, description="Filter to end date"),
+    limit: int = Query(100, ge=1, le=500, description="Number of records to return"),
+    offset: int = Query(0, ge=0, description="Number of records to skip"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get attendance records with optional filtering and offset or cursor pagination"""
     
-    # Apply pagination
-    results = query.offset(offset).limit(limit).all()
+    list_fields = parse_fields(fields, ATTENDANCE_LIST_FIELDS)
+    query = _attendance_records_query(
+        date_filter, student_id, start_date, end_date,
+        with_fields(list_fields, *ATTENDANCE_CURSOR_FIELDS)
+    ).order_by(*ATTENDANCE_PAGE_ORDER)
     
-    # Convert to response format
-    attendance_records = []
-    for result in results:
-        attendance_records.append(AttendanceWithStudent(
-            id=result.id,
-            student_id=result.student_id,
-            date=result.date,
-            status=result.status,
-            time_in=result.time_in,
-            time_out=result.time_out,
-            note=result.note,
-            created_at=result.created_at,
-            student_name=result.student_name,
-            student_grade=result.student_grade
-        ))
+    # Apply pagination: continue after the cursor row, or skip by offset
+    if cursor:
+        last = decode_cursor(cursor)
+        try:
+            last_date = date.fromisoformat(last['date'])
+            last_id = int(last['id'])
+        except (KeyError, TypeError, ValueError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+        results = (await db.execute(_after_cursor(query, last_date, last_id).limit(limit))).all()
+    else:
+        results = (await db.execute(query.offset(offset).limit(limit))).all()
+    
+    headers = {}
+    if len(results) == limit:
+        # The last row in index order, before the page is sorted by name
+        last_result = results[-1]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor({
+            'date': last_result.date.isoformat(),
+            'id': last_result.id
+        })
     
-    return attendance_records
+    # The rows already have the response fields; skip building and validating models
+    return FastJSONResponse(row_dicts(_by_date_and_name(results), list_fields), headers=headers)
+
+@router.get("/export")
+async def export_attendance_records(
+    date_filter: Optional[date] = Query(None, description="Filter by specific date"),
+    student_id: Optional[int] = Query(None, description="Filter by student ID"),
+    start_date: Optional[date] = Query(None, description="Filter from start date"),
+    end_date: Optional[date] = Query(None, description="Filter to end date"),
+    format: str = Query("csv", regex="^(csv|ndjson)$", description="Export format")
+):
+    """Stream all matching attendance records as CSV or NDJSON"""
+    return export_response(
+        _attendance_records_query(date_filter, student_id, start_date, end_date).order_by(
+            desc(Attendance.date), Student.name, Attendance.id
+        ),
+        lambda row: row._asdict(),
+        ATTENDANCE_EXPORT_FIELDS,
+        format,
+        f"attendance_{date.today().strftime('%Y%m%d')}"
+    )
 
 @router.post("/", response_model=AttendanceSchema, status_code=status.HTTP_201_CREATED)
-def create_attendance(attendance: AttendanceCreate, db: Session = Depends(get_db)):
+async def create_attendance(attendance: AttendanceCreate, db: AsyncSession = Depends(get_db)):
     """Create attendance record with duplicate check"""
     
     # Check if student exists
-    student = db.query(Student).filter(Student.id == attendance.student_id).first()
+    student = await db.get(Student, attendance.student_id)
     if not student:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -99,12 +199,14 @@ def create_attendance(attendance: AttendanceCreate, db: Session = Depends(get_db
         )
     
     # Check for duplicate attendance on same date
-    existing = db.query(Attendance).filter(
-        and_(
-            Attendance.student_id == attendance.student_id,
-            Attendance.date == attendance.date
-        )
-    ).first()
+    existing = (await db.scalars(
+        select(Attendance).where(
+            and_(
+                Attendance.student_id == attendance.student_id,
+                Attendance.date == attendance.date
+            )
+        ).limit(1)
+    )).first()
     
     if existing:
         raise HTTPException(
@@ -115,24 +217,29 @@ def create_attendance(attendance: AttendanceCreate, db: Session = Depends(get_db
     try:
         db_attendance = Attendance(**attendance.model_dump())
         db.add(db_attendance)
-        db.commit()
-        db.refresh(db_attendance)
-        return db_attendance
+        await db.flush()
+        await db.run_sync(refresh_monthly_stats, [(db_attendance.student_id, month_key(db_attendance.date))])
+        await db.commit()
+        bump_tables("attendances")
+        await db.refresh(db_attendance)
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Failed to create attendance record: {str(e)}"
         )
+    
+    await _publish_attendance_changes(db, [db_attendance.student_id], db_attendance.date)
+    return db_attendance
 
 @router.put("/{attendance_id}", response_model=AttendanceSchema)
-def update_attendance(
+async def update_attendance(
     attendance_id: int,
     attendance_update: AttendanceUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update attendance record"""
-    attendance = db.query(Attendance).filter(Attendance.id == attendance_id).first()
+    attendance = await db.get(Attendance, attendance_id)
     if not attendance:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -144,23 +251,24 @@ def update_attendance(
         for field, value in update_data.items():
             setattr(attendance, field, value)
         
-        db.commit()
-        db.refresh(attendance)
-        return attendance
+        await db.flush()
+        await db.run_sync(refresh_monthly_stats, [(attendance.student_id, month_key(attendance.date))])
+        await db.commit()
+        bump_tables("attendances")
+        await db.refresh(attendance)
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Failed to update attendance record: {str(e)}"
         )
-
-@router.get("/today", response_model=List[TodayAttendanceItem])
-def get_today_attendance(db: Session = Depends(get_db)):
-    """Get today's attendance status for all active students"""
-    today = date.today()
     
-    # Get all active students with their attendance for today
-    results = db.query(
+    await _publish_attendance_changes(db, [attendance.student_id], attendance.date)
+    return attendance
+
+def _today_attendance_query(today: date) -> Select:
+    """Every active student with their attendance on ``today``, if any"""
+    return select(
         Student.id.label('student_id'),
         Student.name.label('student_name'),
         Student.grade.label('student_grade'),
@@ -175,8 +283,9 @@ def get_today_attendance(db: Session = Depends(get_db)):
             Attendance.student_id == Student.id,
             Attendance.date == today
         )
-    ).filter(Student.is_active == True).order_by(Student.name).all()
-    
+    ).where(Student.is_active == True).order_by(Student.name)
+
+def _today_attendance_items(results) -> List[TodayAttendanceItem]:
     attendance_items = []
     for result in results:
         attendance_items.append(TodayAttendanceItem(
@@ -189,19 +298,76 @@ def get_today_attendance(db: Session = Depends(get_db)):
             time_out=result.time_out,
             note=result.note
         ))
-    
     return attendance_items
 
+@router.get("/today", response_model=List[TodayAttendanceItem])
+@cached("attendance.today", ttl=30, tables=("students", "attendances"))
+async def get_today_attendance(db: AsyncSession = Depends(get_db)):
+    """Get today's attendance status for all active students"""
+    
+    # Get all active students with their attendance for today
+    results = (await db.execute(_today_attendance_query(date.today()))).all()
+    return _today_attendance_items(results)
+
+async def _load_today_board(today: date) -> bytes:
+    """Today's attendance as JSON, shared with the GET /today cache"""
+    async def compute() -> bytes:
+        async with AsyncSessionLocal() as db:
+            results = (await db.execute(_today_attendance_query(today))).all()
+        return encode_json(_today_attendance_items(results))
+    
+    return await response_cache.get_or_compute("attendance.today", cache_key(today, {}), compute)
+
+async def _publish_attendance_changes(db: AsyncSession, student_ids: Iterable[int], attendance_date: date):
+    """Push the updated board rows of ``student_ids`` to stream subscribers"""
+    if attendance_date != date.today() or not attendance_board.subscribers:
+        return
+    
+    results = (await db.execute(
+        _today_attendance_query(attendance_date).where(Student.id.in_(list(student_ids)))
+    )).all()
+    if results:
+        attendance_board.publish(sse_event("attendance", encode_json(_today_attendance_items(results))))
+
+def _resync_board_on_student_change(*tables: str) -> None:
+    # Names, grades and who is active are on the board; send everyone a fresh snapshot
+    if "students" in tables:
+        attendance_board.resync()
+
+table_versions.subscribe(_resync_board_on_student_change)
+
+async def _stream_today_board() -> AsyncIterator[bytes]:
+    with attendance_board.subscribe() as subscription:
+        today = date.today()
+        yield sse_event("snapshot", await _load_today_board(today))
+        
+        while True:
+            message = await subscription.next(timeout=TODAY_STREAM_HEARTBEAT_SECONDS)
+            if message is not None:
+                yield message
+            elif subscription.resync.is_set() or date.today() != today:
+                # Fell behind, students changed or the day rolled over
+                subscription.resync.clear()
+                today = date.today()
+                yield sse_event("snapshot", await _load_today_board(today))
+            else:
+                yield sse_comment("heartbeat")
+
+@router.get("/today/stream")
+async def stream_today_attendance():
+    """Stream today's attendance: a snapshot, then the changed rows as they are written"""
+    return sse_response(_stream_today_board())
+
 @router.get("/stats/{student_id}", response_model=AttendanceStats)
-def get_attendance_stats(
+async def get_attendance_stats(
     student_id: int,
     period: str = Query("monthly", regex="^(weekly|monthly)$", description="Stats period"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get attendance statistics for a student"""
     
     # Check if student exists
-    student = db.query(Student).filter(Student.id == student_id).first()
+    student = await db.get(Student, student_id)
     if not student:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -215,70 +381,34 @@ def get_attendance_stats(
     else:  # monthly
         start_date = end_date - timedelta(days=90)  # Last 3 months
     
-    # Get attendance records for the period
-    records = db.query(Attendance).filter(
-        and_(
-            Attendance.student_id == student_id,
-            Attendance.date >= start_date,
-            Attendance.date <= end_date
-        )
-    ).order_by(Attendance.date).all()
-    
-    # Calculate basic stats
-    total_days = len(records)
-    status_counts = defaultdict(int)
-    for record in records:
-        status_counts[record.status] += 1
-    
-    present_days = status_counts['present']
-    absent_days = status_counts['absent']
-    late_days = status_counts['late']
-    early_leave_days = status_counts['early_leave']
-    
-    attendance_rate = (present_days / total_days * 100) if total_days > 0 else 0
-    
-    # Calculate consecutive days
-    consecutive_present = 0
-    consecutive_absent = 0
-    current_present_streak = 0
-    current_absent_streak = 0
-    
-    for record in reversed(records):  # Start from most recent
-        if record.status == 'present':
-            current_present_streak += 1
-            current_absent_streak = 0
-        elif record.status == 'absent':
-            current_absent_streak += 1
-            current_present_streak = 0
-        else:
-            current_present_streak = 0
-            current_absent_streak = 0
-        
-        consecutive_present = max(consecutive_present, current_present_streak)
-        consecutive_absent = max(consecutive_absent, current_absent_streak)
+    # Combine monthly rollups with the raw records of the partial edge months
+    monthly_summaries = await db.run_sync(load_monthly_summaries, student_id, start_date, end_date)
     
-    # Generate monthly trend
+    summary = AttendanceSummary()
     monthly_trend = []
-    monthly_data = defaultdict(lambda: {'present': 0, 'absent': 0, 'late': 0, 'early_leave': 0})
-    
-    for record in records:
-        month_key = record.date.strftime('%Y-%m')
-        monthly_data[month_key][record.status] += 1
-    
-    for month_key in sorted(monthly_data.keys()):
-        data = monthly_data[month_key]
-        total_month = sum(data.values())
-        rate = (data['present'] / total_month * 100) if total_month > 0 else 0
+    for month, month_summary in monthly_summaries:
+        summary = summary.combine(month_summary)
+        rate = (month_summary.present / month_summary.total * 100) if month_summary.total > 0 else 0
         
         monthly_trend.append({
-            'month': month_key,
+            'month': month,
             'attendance_rate': round(rate, 1),
-            'present': data['present'],
-            'absent': data['absent'],
-            'late': data['late'],
-            'early_leave': data['early_leave']
+            'present': month_summary.present,
+            'absent': month_summary.absent,
+            'late': month_summary.late,
+            'early_leave': month_summary.early_leave
         })
     
+    total_days = summary.total
+    present_days = summary.present
+    absent_days = summary.absent
+    late_days = summary.late
+    early_leave_days = summary.early_leave
+    
+    attendance_rate = (present_days / total_days * 100) if total_days > 0 else 0
+    consecutive_present = summary.longest_present_run
+    consecutive_absent = summary.longest_absent_run
+    
     return AttendanceStats(
         student_id=student_id,
         student_name=student.name,
@@ -293,71 +423,140 @@ def get_attendance_stats(
         monthly_trend=monthly_trend
     )
 
+async def _attendances_needing_sessions(
+    db: AsyncSession,
+    attendances: List[Attendance],
+    overwritten_student_ids: Set[int]
+) -> Dict[int, int]:
+    """Student id to attendance id for attended records that have not used a session yet"""
+    attended = {a.id: a.student_id for a in attendances if a.status in SESSION_CONSUMING_STATUSES}
+    # Only records overwritten by an upsert can have used one already
+    overwritten = [a_id for a_id, student_id in attended.items() if student_id in overwritten_student_ids]
+    used = set(await db.scalars(
+        select(SessionUsage.attendance_id).where(SessionUsage.attendance_id.in_(overwritten))
+    )) if overwritten else set()
+    return {student_id: a_id for a_id, student_id in attended.items() if a_id not in used}
+
 @router.post("/bulk", response_model=BulkAttendanceResult)
-def bulk_create_attendance(
+async def bulk_create_attendance(
     bulk_request: BulkAttendanceRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    """Bulk create attendance records"""
+    """Bulk create attendance records in a single transaction"""
     
     target_date = bulk_request.date
     results = {
         'success_count': 0,
         'error_count': 0,
+        'updated_count': 0,
         'errors': [],
-        'created_attendances': []
+        'created_attendances': [],
+        'sessions_completed': 0,
+        'students_without_sessions': []
     }
     
-    for item in bulk_request.attendances:
-        try:
-            # Check if student exists
-            student = db.query(Student).filter(Student.id == item.student_id).first()
-            if not student:
-                results['errors'].append({
-                    'student_id': item.student_id,
-                    'error': 'Student not found'
-                })
-                results['error_count'] += 1
-                continue
-            
-            # Check for duplicate
-            existing = db.query(Attendance).filter(
+    # Validate all students and existing records with one query each
+    student_ids = {item.student_id for item in bulk_request.attendances}
+    known_student_ids = set(
+        await db.scalars(select(Student.id).where(Student.id.in_(student_ids)))
+    )
+    existing_student_ids = set(
+        await db.scalars(
+            select(Attendance.student_id).where(
                 and_(
-                    Attendance.student_id == item.student_id,
+                    Attendance.student_id.in_(student_ids),
                     Attendance.date == target_date
                 )
-            ).first()
-            
-            if existing:
-                results['errors'].append({
-                    'student_id': item.student_id,
-                    'error': f'Attendance already exists for {target_date}'
-                })
-                results['error_count'] += 1
-                continue
-            
-            # Create attendance record
-            db_attendance = Attendance(
-                student_id=item.student_id,
-                date=target_date,
-                status=item.status,
-                time_in=item.time_in,
-                note=item.note
             )
-            
-            db.add(db_attendance)
-            db.commit()
-            db.refresh(db_attendance)
-            
-            results['created_attendances'].append(db_attendance)
-            results['success_count'] += 1
-            
-        except Exception as e:
-            db.rollback()
+        )
+    )
+    
+    rows = []
+    seen_student_ids = set()
+    for item in bulk_request.attendances:
+        if item.student_id not in known_student_ids:
             results['errors'].append({
                 'student_id': item.student_id,
+                'error': 'Student not found'
+            })
+            results['error_count'] += 1
+            continue
+        
+        already_exists = item.student_id in existing_student_ids and not bulk_request.upsert
+        if already_exists or item.student_id in seen_student_ids:
+            results['errors'].append({
+                'student_id': item.student_id,
+                'error': f'Attendance already exists for {target_date}'
+            })
+            results['error_count'] += 1
+            continue
+        
+        seen_student_ids.add(item.student_id)
+        rows.append({
+            'student_id': item.student_id,
+            'date': target_date,
+            'status': item.status,
+            'time_in': item.time_in,
+            'note': item.note
+        })
+    
+    if not rows:
+        return BulkAttendanceResult(**results)
+    
+    insert_stmt = _dialect_insert(db)(Attendance)
+    if bulk_request.upsert:
+        insert_stmt = insert_stmt.on_conflict_do_update(
+            index_elements=[Attendance.student_id, Attendance.date],
+            set_={
+                'status': insert_stmt.excluded.status,
+                'time_in': insert_stmt.excluded.time_in,
+                'note': insert_stmt.excluded.note
+            }
+        )
+    # Without sort_by_parameter_order SQLite can insert all rows in one
+    # statement; rows are put back in request order by student instead
+    insert_stmt = insert_stmt.returning(Attendance)
+    
+    try:
+        returned = {a.student_id: a for a in (await db.scalars(
+            insert_stmt,
+            rows,
+            execution_options={'populate_existing': True}
+        )).all()}
+        db_attendances = [returned[row['student_id']] for row in rows]
+        created_attendances = [AttendanceSchema.model_validate(a) for a in db_attendances]
+        await db.run_sync(refresh_monthly_stats, [(row['student_id'], month_key(target_date)) for row in rows])
+        consuming = {}
+        if bulk_request.complete_sessions:
+            consuming = await _attendances_needing_sessions(
+                db, db_attendances, seen_student_ids & existing_student_ids
+            )
+            completed_payments = await consume_sessions(db, consuming)
+        await db.commit()
+        if consuming:
+            bump_tables("attendances", "payments")
+        else:
+            bump_tables("attendances")
+    except Exception as e:
+        await db.rollback()
+        for row in rows:
+            results['errors'].append({
+                'student_id': row['student_id'],
                 'error': str(e)
             })
             results['error_count'] += 1
+        return BulkAttendanceResult(**results)
+    
+    await _publish_attendance_changes(db, [row['student_id'] for row in rows], target_date)
+    
+    if consuming:
+        results['sessions_completed'] = len(completed_payments)
+        results['students_without_sessions'] = sorted(
+            set(consuming) - {payment.student_id for payment in completed_payments}
+        )
+    
+    results['created_attendances'] = created_attendances
+    results['success_count'] = len(created_attendances)
+    results['updated_count'] = len(seen_student_ids & existing_student_ids)
     
-    return BulkAttendanceResult(**results)
\ No newline at end of file
+    return BulkAttendanceResult(**results)
@@ -0,0 +1,76 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional, List
+from datetime import date
+
+from ..database.connection import get_db
+from ..models.holiday import Holiday
+from ..schemas.holiday import (
+    Holiday as HolidaySchema,
+    HolidayCreate,
+    HolidayCalendarInfo
+)
+from ..utils.table_versions import bump_tables
+from ..utils.holiday_calendar import (
+    get_holiday_calendar,
+    reload_holiday_calendar
+)
+
+router = APIRouter(prefix="/holidays", tags=["holidays"])
+
+def _calendar_info(calendar) -> HolidayCalendarInfo:
+    return HolidayCalendarInfo(
+        first_day=calendar.first_day,
+        last_day=calendar.last_day,
+        holiday_count=len(calendar.holidays),
+        session_day_count=calendar.session_day_count,
+        loaded_at=calendar.loaded_at
+    )
+
+@router.get("/", response_model=List[HolidaySchema])
+async def get_holidays(
+    start_date: Optional[date] = Query(None, description="Filter from start date"),
+    end_date: Optional[date] = Query(None, description="Filter to end date"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get holidays known to the session calendar"""
+    calendar = await db.run_sync(get_holiday_calendar)
+    
+    holidays = calendar.holidays_between(start_date or date.min, end_date or date.max)
+    return [
+        HolidaySchema(
+            date=day,
+            name=name,
+            source="custom" if day in calendar.custom_dates else "bundled"
+        )
+        for day, name in holidays.items()
+    ]
+
+@router.post("/", response_model=HolidayCalendarInfo, status_code=status.HTTP_201_CREATED)
+async def create_holiday(holiday: HolidayCreate, db: AsyncSession = Depends(get_db)):
+    """Add an academy-specific closed day and reload the calendar"""
+    existing = await db.scalar(select(Holiday).where(Holiday.date == holiday.date))
+    if existing:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Holiday already exists on {holiday.date}"
+        )
+    
+    try:
+        db.add(Holiday(**holiday.model_dump()))
+        await db.commit()
+        bump_tables("holidays")
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Failed to create holiday: {str(e)}"
+        )
+    
+    return _calendar_info(await db.run_sync(reload_holiday_calendar))
+
+@router.post("/reload", response_model=HolidayCalendarInfo)
+async def reload_holidays(db: AsyncSession = Depends(get_db)):
+    """Reload holidays from the bundled data file and the database without a restart"""
+    return _calendar_info(await db.run_sync(reload_holiday_calendar))
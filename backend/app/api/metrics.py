@@ -0,0 +1,120 @@
+import os
+import time
+from datetime import date, timedelta
+from typing import Optional, Tuple
+
+from fastapi import APIRouter, Response
+from sqlalchemy import and_, func, select
+
+from ..database.connection import AsyncSessionLocal, get_async_engine, get_engine
+from ..models.payment import Payment
+from ..models.student import Student
+from ..utils.cache import response_cache
+from ..utils.idempotency import idempotency_store
+from ..utils.metrics import CONTENT_TYPE, metrics
+from ..utils.scheduler import scheduler
+from ..utils.table_versions import table_versions
+from .attendance import attendance_board
+
+router = APIRouter(tags=["metrics"])
+
+# Business gauges are recounted only after students or payments change, the
+# date rolls over, or this many seconds pass (to pick up direct DB edits)
+METRICS_BUSINESS_TTL = float(os.getenv("METRICS_BUSINESS_TTL", "300"))
+EXPIRING_WITHIN_DAYS = 7
+
+pool_size = metrics.gauge("db_pool_size", "Connections the pool keeps open", ("engine",))
+pool_checked_out = metrics.gauge("db_pool_checked_out", "Connections currently in use", ("engine",))
+pool_overflow = metrics.gauge("db_pool_overflow", "Connections open beyond the pool size", ("engine",))
+
+cache_entries = metrics.gauge("response_cache_entries", "Entries in the response cache")
+cache_bytes = metrics.gauge("response_cache_bytes", "Size of the cached response bodies")
+cache_requests = metrics.counter(
+    "response_cache_requests_total", "Cache lookups by namespace and result", ("namespace", "result")
+)
+stream_subscribers = metrics.gauge("attendance_stream_subscribers", "Open today's attendance streams")
+stream_messages = metrics.counter(
+    "attendance_stream_messages_total", "Attendance changes published, and dropped for slow clients", ("result",)
+)
+idempotent_responses = metrics.counter(
+    "idempotent_responses_total", "Idempotency-Key responses stored and replayed", ("result",)
+)
+scheduled_job_runs = metrics.counter(
+    "scheduled_job_runs_total", "Runs of the daily background jobs", ("job", "result")
+)
+
+students_active = metrics.gauge("students_active", "Active students")
+payments_active = metrics.gauge("payments_active", "Active payments")
+payments_expiring = metrics.gauge(
+    "payments_expiring", f"Active payments ending within {EXPIRING_WITHIN_DAYS} days"
+)
+
+@metrics.collector
+def _collect_pools():
+    # Only engines that were created; a scrape must not open a pool
+    for label, get in (("sync", get_engine), ("async", get_async_engine)):
+        if not get.cache_info().currsize:
+            continue
+        pool = get().pool
+        if hasattr(pool, "checkedout"):
+            pool_size.set(pool.size(), label)
+            pool_checked_out.set(pool.checkedout(), label)
+            pool_overflow.set(max(pool.overflow(), 0), label)
+
+@metrics.collector
+def _collect_cache():
+    stats = response_cache.stats()
+    cache_entries.set(stats["entries"])
+    cache_bytes.set(stats["size_bytes"])
+    for name, namespace in stats["namespaces"].items():
+        for result in ("hits", "misses", "coalesced", "not_modified"):
+            cache_requests.set(namespace[result], name, result)
+    board = attendance_board.stats()
+    stream_subscribers.set(board["subscribers"])
+    stream_messages.set(board["published"], "published")
+    stream_messages.set(board["dropped"], "dropped")
+
+@metrics.collector
+def _collect_idempotency():
+    idempotent_responses.set(idempotency_store.stored, "stored")
+    idempotent_responses.set(idempotency_store.replayed, "replayed")
+
+@metrics.collector
+def _collect_jobs():
+    for name, job in scheduler.stats().items():
+        scheduled_job_runs.set(job["runs"], name, "success")
+        scheduled_job_runs.set(job["failures"], name, "failure")
+
+_business_key: Optional[Tuple] = None
+_business_counted_at = 0.0
+
+@metrics.collector
+async def _collect_business():
+    global _business_key, _business_counted_at
+    today = date.today()
+    key = (today, table_versions.get(("students", "payments")))
+    if key == _business_key and time.monotonic() - _business_counted_at < METRICS_BUSINESS_TTL:
+        return
+
+    async with AsyncSessionLocal() as db:
+        counts = (await db.execute(select(
+            select(func.count(Student.id)).where(Student.is_active == True).scalar_subquery(),
+            select(func.count(Payment.id)).where(Payment.is_active == True).scalar_subquery(),
+            select(func.count(Payment.id)).where(
+                and_(
+                    Payment.is_active == True,
+                    Payment.end_date >= today,
+                    Payment.end_date <= today + timedelta(days=EXPIRING_WITHIN_DAYS)
+                )
+            ).scalar_subquery()
+        ))).one()
+
+    students_active.set(counts[0])
+    payments_active.set(counts[1])
+    payments_expiring.set(counts[2])
+    _business_key, _business_counted_at = key, time.monotonic()
+
+@router.get("/metrics", response_class=Response)
+async def get_metrics():
+    """Metrics in the Prometheus text format"""
+    return Response(content=await metrics.render(), media_type=CONTENT_TYPE)
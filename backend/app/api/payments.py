@@ -1,20 +1,22 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func, desc
-from typing import Optional, List
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, or_, func, desc, case, extract, select
+from typing import Iterable, Optional, List
 from datetime import datetime, date, timedelta
-from collections import defaultdict
 from decimal import Decimal
 
-from ..database.connection import get_db
+from ..database.connection import AsyncSessionLocal, get_db
 from ..models.payment import Payment
 from ..models.student import Student
 from ..models.attendance import Attendance
+from ..models.session_usage import SessionUsage
 from ..schemas.payment import (
     Payment as PaymentSchema,
     PaymentCreateRequest,
     PaymentWithStudent,
     SessionCompleteRequest,
+    BulkSessionCompleteRequest,
+    BulkSessionCompleteResult,
     PaymentExtendRequest,
     PaymentStats,
     ExpiringPayment
@@ -22,18 +24,69 @@ from ..schemas.payment import (
 from ..utils.date_calculator import (
     calculate_session_end_date,
     calculate_days_until_expiry,
-    calculate_progress_percentage,
-    get_current_year_holidays
+    calculate_progress_percentage
 )
+from ..utils.holiday_calendar import get_holiday_calendar
+from ..utils.cache import cached
+from ..utils.table_versions import bump_tables
+from ..utils.export import export_response
+from ..utils.fast_json import FastJSONResponse, row_dicts
+from ..utils.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+from ..utils.projection import FIELDS_DESCRIPTION, parse_fields, with_fields
+from ..utils.payment_expiry import (
+    EXPIRING_SNAPSHOT_DAYS,
+    PAYMENT_SWEEP_ENABLED,
+    PAYMENT_SWEEP_TIME,
+    ExpiringSnapshot,
+    expire_payments
+)
+from ..utils.scheduler import scheduler
+from ..utils.session_usage import complete_sessions_statement, next_payment_per_student
 
 router = APIRouter(prefix="/payments", tags=["payments"])
 
+PAYMENT_EXPORT_FIELDS = [
+    'id', 'student_id', 'student_name', 'student_grade', 'amount', 'payment_method',
+    'start_date', 'end_date', 'sessions_total', 'sessions_completed', 'is_active',
+    'days_until_expiry', 'progress_percentage', 'created_at', 'updated_at'
+]
+
+# Listing fields read from the row, in response model order; the two
+# computed fields come last
+COMPUTED_PAYMENT_FIELDS = ('days_until_expiry', 'progress_percentage')
+PAYMENT_ROW_FIELDS = [f for f in PaymentWithStudent.model_fields if f not in COMPUTED_PAYMENT_FIELDS]
+EXPIRING_ROW_FIELDS = [f for f in ExpiringPayment.model_fields if f not in COMPUTED_PAYMENT_FIELDS]
+PAYMENT_LIST_FIELDS = [*PAYMENT_ROW_FIELDS, *COMPUTED_PAYMENT_FIELDS]
+
+# The column selected for each listing field read from the row
+PAYMENT_COLUMNS = {
+    'id': Payment.id,
+    'student_id': Payment.student_id,
+    'amount': Payment.amount,
+    'payment_method': Payment.payment_method,
+    'start_date': Payment.start_date,
+    'end_date': Payment.end_date,
+    'sessions_total': Payment.sessions_total,
+    'sessions_completed': Payment.sessions_completed,
+    'is_active': Payment.is_active,
+    'created_at': Payment.created_at,
+    'updated_at': Payment.updated_at,
+    'student_name': Student.name.label('student_name'),
+    'student_grade': Student.grade.label('student_grade')
+}
+
+# Columns each computed field is derived from
+COMPUTED_PAYMENT_SOURCES = {
+    'days_until_expiry': ('end_date',),
+    'progress_percentage': ('sessions_completed', 'sessions_total')
+}
+
 @router.post("/", response_model=PaymentSchema, status_code=status.HTTP_201_CREATED)
-def create_payment(payment_request: PaymentCreateRequest, db: Session = Depends(get_db)):
+async def create_payment(payment_request: PaymentCreateRequest, db: AsyncSession = Depends(get_db)):
     """Create a new payment with automatic end date calculation"""
     
     # Check if student exists
-    student = db.query(Student).filter(Student.id == payment_request.student_id).first()
+    student = await db.get(Student, payment_request.student_id)
     if not student:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -42,21 +95,28 @@ def create_payment(payment_request: PaymentCreateRequest, db: Session = Depends(
     
     try:
         # Calculate end date based on sessions and business logic
-        holidays = get_current_year_holidays() if payment_request.exclude_weekends else []
-        end_date = calculate_session_end_date(
-            start_date=payment_request.start_date,
-            total_sessions=payment_request.sessions_total,
-            exclude_weekends=payment_request.exclude_weekends,
-            holidays=holidays
-        )
+        if payment_request.exclude_weekends:
+            calendar = await db.run_sync(get_holiday_calendar)
+            end_date = calendar.add_session_days(
+                payment_request.start_date,
+                payment_request.sessions_total
+            )
+        else:
+            end_date = calculate_session_end_date(
+                start_date=payment_request.start_date,
+                total_sessions=payment_request.sessions_total,
+                exclude_weekends=False
+            )
         
         # Deactivate any existing active payments for this student
-        existing_active_payments = db.query(Payment).filter(
-            and_(
-                Payment.student_id == payment_request.student_id,
-                Payment.is_active == True
+        existing_active_payments = (await db.scalars(
+            select(Payment).where(
+                and_(
+                    Payment.student_id == payment_request.student_id,
+                    Payment.is_active == True
+                )
             )
-        ).all()
+        )).all()
         
         for existing_payment in existing_active_payments:
             existing_payment.is_active = False
@@ -74,156 +134,240 @@ def create_payment(payment_request: PaymentCreateRequest, db: Session = Depends(
         )
         
         db.add(db_payment)
-        db.commit()
-        db.refresh(db_payment)
+        await db.commit()
+        bump_tables("payments")
+        await db.refresh(db_payment)
         return db_payment
         
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Failed to create payment: {str(e)}"
         )
 
-@router.get("/", response_model=List[PaymentWithStudent])
-def get_payments(
-    student_id: Optional[int] = Query(None, description="Filter by student ID"),
-    is_active: Optional[bool] = Query(None, description="Filter by active status"),
-    expires_within_days: Optional[int] = Query(None, description="Filter payments expiring within N days"),
-    limit: int = Query(100, ge=1, le=500, description="Number of records to return"),
-    offset: int = Query(0, ge=0, description="Number of records to skip"),
-    db: Session = Depends(get_db)
+def _payments_query(
+    student_id: Optional[int],
+    is_active: Optional[bool],
+    expires_within_days: Optional[int],
+    fields: Iterable[str] = PAYMENT_ROW_FIELDS
 ):
-    """Get payments with optional filtering"""
-    
-    # Build query with joins
-    query = db.query(
-        Payment.id,
-        Payment.student_id,
-        Payment.amount,
-        Payment.payment_method,
-        Payment.start_date,
-        Payment.end_date,
-        Payment.sessions_total,
-        Payment.sessions_completed,
-        Payment.is_active,
-        Payment.created_at,
-        Payment.updated_at,
-        Student.name.label('student_name'),
-        Student.grade.label('student_grade')
-    ).join(Student, Payment.student_id == Student.id)
+    """Payment rows joined with their student, filtered and ordered for listing"""
+    
+    # Build query with joins, selecting only the columns of ``fields``
+    query = select(*(PAYMENT_COLUMNS[field] for field in fields)).join(
+        Student, Payment.student_id == Student.id
+    )
     
     # Apply filters
     if student_id:
-        query = query.filter(Payment.student_id == student_id)
+        query = query.where(Payment.student_id == student_id)
     
     if is_active is not None:
-        query = query.filter(Payment.is_active == is_active)
+        query = query.where(Payment.is_active == is_active)
     
     if expires_within_days is not None:
         cutoff_date = date.today() + timedelta(days=expires_within_days)
-        query = query.filter(
+        query = query.where(
             and_(
                 Payment.end_date <= cutoff_date,
                 Payment.is_active == True
             )
         )
     
-    # Order by creation date desc
-    query = query.order_by(desc(Payment.created_at))
+    # Order by creation date desc, with id as a unique tiebreaker
+    query = query.order_by(desc(Payment.created_at), desc(Payment.id))
     
-    # Apply pagination
-    results = query.offset(offset).limit(limit).all()
+    return query
+
+@router.get("/", response_model=List[PaymentWithStudent])
+async def get_payments(
+    student_id: Optional[int] = Query(None, description="Filter by student ID"),
+    is_active: Optional[bool] = Query(None, description="Filter by active status"),
+    expires_within_days: Optional[int] = Query(None, description="Filter payments expiring within N days"),
+    limit: int = Query(100, ge=1, le=500, description="Number of records to return"),
+    offset: int = Query(0, ge=0, description="Number of records to skip"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get payments with optional filtering and offset or cursor pagination"""
     
-    # Convert to response format
-    payment_records = []
-    for result in results:
-        days_until_expiry = calculate_days_until_expiry(result.end_date)
-        progress_percentage = calculate_progress_percentage(
-            result.sessions_completed, 
-            result.sessions_total
-        )
-        
-        payment_records.append(PaymentWithStudent(
-            id=result.id,
-            student_id=result.student_id,
-            amount=result.amount,
-            payment_method=result.payment_method,
-            start_date=result.start_date,
-            end_date=result.end_date,
-            sessions_total=result.sessions_total,
-            sessions_completed=result.sessions_completed,
-            is_active=result.is_active,
-            created_at=result.created_at,
-            updated_at=result.updated_at,
-            student_name=result.student_name,
-            student_grade=result.student_grade,
-            days_until_expiry=days_until_expiry,
-            progress_percentage=progress_percentage
+    list_fields = parse_fields(fields, PAYMENT_LIST_FIELDS)
+    row_fields = [f for f in list_fields if f not in COMPUTED_PAYMENT_FIELDS]
+    computed_fields = [f for f in list_fields if f in COMPUTED_PAYMENT_FIELDS]
+    # The cursor needs the id, and computed fields their source columns
+    query = _payments_query(
+        student_id, is_active, expires_within_days,
+        with_fields(row_fields, 'id', *(
+            source for field in computed_fields for source in COMPUTED_PAYMENT_SOURCES[field]
         ))
+    )
+    
+    # Apply pagination: continue after the cursor row, or skip by offset
+    if cursor:
+        last = decode_cursor(cursor)
+        try:
+            last_id = int(last['id'])
+        except (KeyError, TypeError, ValueError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+        # Read created_at back from the cursor row rather than binding it:
+        # SQLite stores server timestamps in a different text format than
+        # bound datetimes, so an equality check on a bound value would miss.
+        last_created_at = select(Payment.created_at).where(Payment.id == last_id).scalar_subquery()
+        query = query.where(
+            or_(
+                Payment.created_at < last_created_at,
+                and_(Payment.created_at == last_created_at, Payment.id < last_id)
+            )
+        )
+        results = (await db.execute(query.limit(limit))).all()
+    else:
+        results = (await db.execute(query.offset(offset).limit(limit))).all()
+    
+    headers = {}
+    if len(results) == limit:
+        headers[NEXT_CURSOR_HEADER] = encode_cursor({'id': results[-1].id})
+    
+    # Map rows to dicts instead of building and then re-validating models
+    payment_records = row_dicts(results, row_fields)
+    if 'days_until_expiry' in computed_fields:
+        for record, row in zip(payment_records, results):
+            record['days_until_expiry'] = calculate_days_until_expiry(row.end_date)
+    if 'progress_percentage' in computed_fields:
+        for record, row in zip(payment_records, results):
+            record['progress_percentage'] = calculate_progress_percentage(
+                row.sessions_completed, 
+                row.sessions_total
+            )
     
-    return payment_records
+    return FastJSONResponse(payment_records, headers=headers)
 
-@router.get("/expiring", response_model=List[ExpiringPayment])
-def get_expiring_payments(
-    days: int = Query(7, ge=1, le=30, description="Days ahead to check for expiring payments"),
-    db: Session = Depends(get_db)
+@router.get("/export")
+async def export_payments(
+    student_id: Optional[int] = Query(None, description="Filter by student ID"),
+    is_active: Optional[bool] = Query(None, description="Filter by active status"),
+    expires_within_days: Optional[int] = Query(None, description="Filter payments expiring within N days"),
+    format: str = Query("csv", regex="^(csv|ndjson)$", description="Export format")
 ):
-    """Get payments expiring within specified days"""
+    """Stream all matching payments as CSV or NDJSON"""
+    def to_record(row):
+        record = row._asdict()
+        record['days_until_expiry'] = calculate_days_until_expiry(row.end_date)
+        record['progress_percentage'] = calculate_progress_percentage(
+            row.sessions_completed,
+            row.sessions_total
+        )
+        return record
     
-    today = date.today()
+    return export_response(
+        _payments_query(student_id, is_active, expires_within_days),
+        to_record,
+        PAYMENT_EXPORT_FIELDS,
+        format,
+        f"payments_{date.today().strftime('%Y%m%d')}"
+    )
+
+async def _load_expiring_payments(today: date, days: int) -> List[dict]:
+    """Active payments ending from ``today`` to ``days`` days later, soonest first"""
     cutoff_date = today + timedelta(days=days)
     
-    results = db.query(
-        Payment.id,
-        Payment.student_id,
-        Payment.amount,
-        Payment.sessions_total,
-        Payment.sessions_completed,
-        Payment.end_date,
-        Student.name.label('student_name'),
-        Student.grade.label('student_grade')
-    ).join(Student, Payment.student_id == Student.id).filter(
-        and_(
-            Payment.is_active == True,
-            Payment.end_date <= cutoff_date,
-            Payment.end_date >= today
-        )
-    ).order_by(Payment.end_date).all()
-    
-    expiring_payments = []
-    for result in results:
-        days_until_expiry = calculate_days_until_expiry(result.end_date)
-        progress_percentage = calculate_progress_percentage(
-            result.sessions_completed,
-            result.sessions_total
+    async with AsyncSessionLocal() as db:
+        results = (await db.execute(
+            select(
+                Payment.id,
+                Payment.student_id,
+                Payment.amount,
+                Payment.sessions_total,
+                Payment.sessions_completed,
+                Payment.end_date,
+                Student.name.label('student_name'),
+                Student.grade.label('student_grade')
+            ).join(Student, Payment.student_id == Student.id).where(
+                and_(
+                    Payment.is_active == True,
+                    Payment.end_date <= cutoff_date,
+                    Payment.end_date >= today
+                )
+            ).order_by(Payment.end_date)
+        )).all()
+    
+    expiring_payments = row_dicts(results, EXPIRING_ROW_FIELDS)
+    for payment in expiring_payments:
+        payment['days_until_expiry'] = calculate_days_until_expiry(payment['end_date'])
+        payment['progress_percentage'] = calculate_progress_percentage(
+            payment['sessions_completed'],
+            payment['sessions_total']
         )
-        
-        expiring_payments.append(ExpiringPayment(
-            id=result.id,
-            student_id=result.student_id,
-            student_name=result.student_name,
-            student_grade=result.student_grade,
-            amount=result.amount,
-            sessions_total=result.sessions_total,
-            sessions_completed=result.sessions_completed,
-            end_date=result.end_date,
-            days_until_expiry=days_until_expiry,
-            progress_percentage=progress_percentage
-        ))
     
     return expiring_payments
 
+expiring_snapshot = ExpiringSnapshot(_load_expiring_payments)
+
+async def sweep_expired_payments() -> None:
+    """Deactivate payments past their end date and reload the expiring snapshot"""
+    async with AsyncSessionLocal() as db:
+        expired = await db.run_sync(expire_payments)
+    if expired:
+        bump_tables("payments")
+    await expiring_snapshot.refresh()
+
+if PAYMENT_SWEEP_ENABLED:
+    scheduler.daily("expire-payments", PAYMENT_SWEEP_TIME, sweep_expired_payments)
+
+@router.get("/expiring", response_model=List[ExpiringPayment])
+@cached("payments.expiring", ttl=60, tables=("students", "payments"))
+async def get_expiring_payments(
+    days: int = Query(7, ge=1, le=EXPIRING_SNAPSHOT_DAYS, description="Days ahead to check for expiring payments")
+):
+    """Get payments expiring within specified days"""
+    return await expiring_snapshot.within(days)
+
 @router.put("/{payment_id}/complete-session", response_model=PaymentSchema)
-def complete_session(
+async def complete_session(
     payment_id: int,
     session_data: SessionCompleteRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Mark a session as completed and update payment progress"""
     
-    # Get payment
-    payment = db.query(Payment).filter(Payment.id == payment_id).first()
+    conditions = [Payment.id == payment_id]
+    # If attendance_id is provided, it must belong to the payment's student
+    # and not have used a session already
+    if session_data.attendance_id:
+        conditions.append(
+            select(Attendance.id).where(
+                and_(
+                    Attendance.id == session_data.attendance_id,
+                    Attendance.student_id == Payment.student_id
+                )
+            ).exists()
+        )
+        conditions.append(
+            ~select(SessionUsage.id).where(SessionUsage.attendance_id == session_data.attendance_id).exists()
+        )
+    
+    try:
+        payment = (await db.scalars(complete_sessions_statement(*conditions))).first()
+        if payment is not None and session_data.attendance_id:
+            db.add(SessionUsage(payment_id=payment.id, attendance_id=session_data.attendance_id))
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Failed to complete session: {str(e)}"
+        )
+    
+    if payment is not None:
+        bump_tables("payments")
+        return payment
+    
+    # Nothing was updated; find out why
+    payment = await db.get(Payment, payment_id)
     if not payment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -242,44 +386,99 @@ def complete_session(
             detail="All sessions for this payment have already been completed"
         )
     
-    try:
-        # Increment sessions completed
-        payment.sessions_completed += 1
-        
-        # If all sessions are completed, deactivate the payment
-        if payment.sessions_completed >= payment.sessions_total:
-            payment.is_active = False
-        
-        # If attendance_id is provided, verify it exists and belongs to the student
-        if session_data.attendance_id:
-            attendance = db.query(Attendance).filter(
-                and_(
-                    Attendance.id == session_data.attendance_id,
-                    Attendance.student_id == payment.student_id
-                )
-            ).first()
-            
-            if not attendance:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Attendance record not found or doesn't belong to this student"
-                )
-        
-        db.commit()
-        db.refresh(payment)
-        return payment
-        
-    except Exception as e:
-        db.rollback()
+    attendance = await db.get(Attendance, session_data.attendance_id)
+    if not attendance or attendance.student_id != payment.student_id:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Failed to complete session: {str(e)}"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Attendance record not found or doesn't belong to this student"
         )
+    
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="A session was already completed for this attendance record"
+    )
+
+@router.post("/complete-sessions", response_model=BulkSessionCompleteResult)
+async def bulk_complete_sessions(
+    bulk_request: BulkSessionCompleteRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """Complete one session for many payments, or students' active payments, in one statement"""
+    
+    results = {
+        'success_count': 0,
+        'error_count': 0,
+        'errors': [],
+        'completed_payments': []
+    }
+    
+    # Each payment and student is completed at most once per request
+    payment_ids, student_ids = [], []
+    for key, requested, unique in (
+        ('payment_id', bulk_request.payment_ids, payment_ids),
+        ('student_id', bulk_request.student_ids, student_ids)
+    ):
+        for item_id in requested:
+            if item_id in unique:
+                results['errors'].append({key: item_id, 'error': 'Listed more than once'})
+                results['error_count'] += 1
+            else:
+                unique.append(item_id)
+    
+    try:
+        completed = (await db.scalars(complete_sessions_statement(
+            or_(Payment.id.in_(payment_ids), Payment.id.in_(next_payment_per_student(student_ids)))
+        ))).all()
+        completed_payments = [PaymentSchema.model_validate(p) for p in completed]
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        for key, item_ids in (('payment_id', payment_ids), ('student_id', student_ids)):
+            for item_id in item_ids:
+                results['errors'].append({key: item_id, 'error': str(e)})
+                results['error_count'] += 1
+        return BulkSessionCompleteResult(**results)
+    
+    if completed_payments:
+        bump_tables("payments")
+    
+    # Explain the requested payments and students that were not completed
+    missed_payment_ids = set(payment_ids) - {p.id for p in completed_payments}
+    missed_student_ids = set(student_ids) - {p.student_id for p in completed_payments}
+    if missed_payment_ids:
+        found = {
+            p.id: p for p in await db.scalars(select(Payment).where(Payment.id.in_(missed_payment_ids)))
+        }
+        for payment_id in payment_ids:
+            if payment_id not in missed_payment_ids:
+                continue
+            payment = found.get(payment_id)
+            if payment is None:
+                error = 'Payment not found'
+            elif not payment.is_active:
+                error = 'Payment is not active'
+            else:
+                error = 'All sessions for this payment have already been completed'
+            results['errors'].append({'payment_id': payment_id, 'error': error})
+            results['error_count'] += 1
+    for student_id in student_ids:
+        if student_id in missed_student_ids:
+            results['errors'].append({
+                'student_id': student_id,
+                'error': 'No active payment with sessions remaining'
+            })
+            results['error_count'] += 1
+    
+    results['completed_payments'] = completed_payments
+    results['success_count'] = len(completed_payments)
+    
+    return BulkSessionCompleteResult(**results)
 
 @router.get("/stats", response_model=PaymentStats)
-def get_payment_stats(
+@cached("payments.stats", ttl=300, tables=("payments",))
+async def get_payment_stats(
     period: str = Query("monthly", regex="^(monthly|quarterly)$", description="Stats period"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get payment and revenue statistics"""
     
@@ -290,42 +489,59 @@ def get_payment_stats(
     else:  # quarterly
         start_date = end_date - timedelta(days=270)  # Last 9 months
     
-    # Get payments for the period
-    payments = db.query(Payment).filter(
-        Payment.created_at >= datetime.combine(start_date, datetime.min.time())
-    ).all()
-    
-    # Calculate basic stats
-    total_revenue = sum(payment.amount for payment in payments)
-    active_payments_count = len([p for p in payments if p.is_active])
-    completed_payments_count = len([p for p in payments if not p.is_active])
+    period_filter = Payment.created_at >= datetime.combine(start_date, datetime.min.time())
     
     # Calculate expiring soon (within 7 days)
     today = date.today()
     expiring_cutoff = today + timedelta(days=7)
-    expiring_soon_count = len([
-        p for p in payments 
-        if p.is_active and p.end_date <= expiring_cutoff
-    ])
+    is_active = Payment.is_active == True
+    
+    # Calculate basic stats in a single aggregate query
+    summary = (await db.execute(
+        select(
+            func.count(Payment.id).label('payment_count'),
+            func.sum(Payment.amount).label('total_revenue'),
+            func.sum(case((is_active, 1), else_=0)).label('active_count'),
+            func.sum(case((and_(is_active, Payment.end_date <= expiring_cutoff), 1), else_=0)).label('expiring_count')
+        ).where(period_filter)
+    )).one()
+    
+    payment_count = summary.payment_count
+    total_revenue = summary.total_revenue if payment_count else Decimal('0')
+    active_payments_count = summary.active_count or 0
+    completed_payments_count = payment_count - active_payments_count
+    expiring_soon_count = summary.expiring_count or 0
     
     # Calculate average payment amount
-    average_amount = total_revenue / len(payments) if payments else Decimal('0')
+    average_amount = total_revenue / payment_count if payment_count else Decimal('0')
     
-    # Generate monthly revenue trend
-    monthly_revenue = defaultdict(Decimal)
-    payment_method_counts = defaultdict(int)
+    # Payment method distribution
+    method_counts = (await db.execute(
+        select(
+            Payment.payment_method,
+            func.count(Payment.id).label('payment_count')
+        ).where(period_filter).group_by(Payment.payment_method)
+    )).all()
+    payment_method_counts = {row.payment_method: row.payment_count for row in method_counts}
     
-    for payment in payments:
-        month_key = payment.created_at.strftime('%Y-%m')
-        monthly_revenue[month_key] += payment.amount
-        payment_method_counts[payment.payment_method] += 1
+    # Generate monthly revenue trend
+    created_year = extract('year', Payment.created_at)
+    created_month = extract('month', Payment.created_at)
+    monthly_rows = (await db.execute(
+        select(
+            created_year.label('year'),
+            created_month.label('month'),
+            func.sum(Payment.amount).label('revenue'),
+            func.count(Payment.id).label('payment_count')
+        ).where(period_filter).group_by(created_year, created_month).order_by(created_year, created_month)
+    )).all()
     
     monthly_trend = []
-    for month_key in sorted(monthly_revenue.keys()):
+    for row in monthly_rows:
         monthly_trend.append({
-            'month': month_key,
-            'revenue': float(monthly_revenue[month_key]),
-            'payment_count': len([p for p in payments if p.created_at.strftime('%Y-%m') == month_key])
+            'month': f"{int(row.year):04d}-{int(row.month):02d}",
+            'revenue': float(row.revenue),
+            'payment_count': row.payment_count
         })
     
     return PaymentStats(
@@ -336,19 +552,19 @@ def get_payment_stats(
         completed_payments_count=completed_payments_count,
         average_payment_amount=average_amount,
         monthly_revenue_trend=monthly_trend,
-        payment_method_distribution=dict(payment_method_counts)
+        payment_method_distribution=payment_method_counts
     )
 
 @router.put("/{payment_id}/extend", response_model=PaymentSchema)
-def extend_payment(
+async def extend_payment(
     payment_id: int,
     extend_data: PaymentExtendRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Extend a payment with additional sessions and amount"""
     
     # Get payment
-    payment = db.query(Payment).filter(Payment.id == payment_id).first()
+    payment = await db.get(Payment, payment_id)
     if not payment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -364,22 +580,21 @@ def extend_payment(
         remaining_sessions = payment.sessions_total - payment.sessions_completed
         if remaining_sessions > 0:
             # Calculate new end date from today
-            holidays = get_current_year_holidays()
-            new_end_date = calculate_session_end_date(
-                start_date=date.today(),
-                total_sessions=remaining_sessions,
-                exclude_weekends=True,
-                holidays=holidays
+            calendar = await db.run_sync(get_holiday_calendar)
+            new_end_date = calendar.add_session_days(
+                date.today(),
+                remaining_sessions
             )
             payment.end_date = new_end_date
             payment.is_active = True
         
-        db.commit()
-        db.refresh(payment)
+        await db.commit()
+        bump_tables("payments")
+        await db.refresh(payment)
         return payment
         
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Failed to extend payment: {str(e)}"
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_
-from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, and_, or_, case, desc, select
+from typing import Optional, List, Dict
 from datetime import datetime, timedelta
 import math
 
@@ -9,6 +9,11 @@ from ..database.connection import get_db
 from ..models.student import Student
 from ..models.attendance import Attendance
 from ..models.payment import Payment
+from ..utils.cache import cached
+from ..utils.fast_json import row_dicts
+from ..utils.projection import FIELDS_DESCRIPTION, parse_fields, with_fields
+from ..utils.table_versions import bump_tables
+from ..utils.student_search import MAX_RANKED_MATCHES, apply_student_search
 from ..schemas.student import (
     Student as StudentSchema, 
     StudentCreate, 
@@ -21,122 +26,147 @@ from ..schemas.student import (
 
 router = APIRouter(prefix="/students", tags=["students"])
 
-def calculate_attendance_rate(student_id: int, db: Session) -> Optional[float]:
-    """Calculate attendance rate for a student in the last 30 days"""
-    thirty_days_ago = datetime.now().date() - timedelta(days=30)
+STUDENT_LIST_FIELDS = list(StudentListItem.model_fields)
+# Listing fields loaded for the whole page by their own query, only when requested
+STUDENT_ENRICHED_FIELDS = ('attendance_rate', 'active_payment')
+
+async def calculate_attendance_rates(student_ids: List[int], db: AsyncSession) -> Dict[int, Optional[float]]:
+    """Calculate attendance rates for several students in the last 30 days with one grouped query"""
+    if not student_ids:
+        return {}
     
-    total_records = db.query(Attendance).filter(
-        and_(
-            Attendance.student_id == student_id,
-            Attendance.date >= thirty_days_ago
-        )
-    ).count()
+    thirty_days_ago = datetime.now().date() - timedelta(days=30)
     
-    if total_records == 0:
-        return None
+    results = (await db.execute(
+        select(
+            Attendance.student_id,
+            func.count(Attendance.id).label('total_records'),
+            func.sum(case((Attendance.status == "present", 1), else_=0)).label('present_records')
+        ).where(
+            and_(
+                Attendance.student_id.in_(student_ids),
+                Attendance.date >= thirty_days_ago
+            )
+        ).group_by(Attendance.student_id)
+    )).all()
     
-    present_records = db.query(Attendance).filter(
-        and_(
-            Attendance.student_id == student_id,
-            Attendance.date >= thirty_days_ago,
-            Attendance.status == "present"
-        )
-    ).count()
+    attendance_rates = {}
+    for result in results:
+        attendance_rates[result.student_id] = round((result.present_records / result.total_records) * 100, 1)
     
-    return round((present_records / total_records) * 100, 1)
+    return attendance_rates
 
-def get_active_payment(student_id: int, db: Session) -> Optional[ActivePaymentInfo]:
-    """Get active payment information for a student"""
-    active_payment = db.query(Payment).filter(
-        and_(
-            Payment.student_id == student_id,
-            Payment.is_active == True
+async def get_active_payments(student_ids: List[int], db: AsyncSession) -> Dict[int, ActivePaymentInfo]:
+    """Get active payment information for several students with one query"""
+    if not student_ids:
+        return {}
+    
+    # Most recent active payment first, so it wins if a student has several
+    results = (await db.scalars(
+        select(Payment).where(
+            and_(
+                Payment.student_id.in_(student_ids),
+                Payment.is_active == True
+            )
+        ).order_by(desc(Payment.id))
+    )).all()
+    
+    active_payments = {}
+    for payment in results:
+        if payment.student_id in active_payments:
+            continue
+        
+        active_payments[payment.student_id] = ActivePaymentInfo(
+            id=payment.id,
+            amount=payment.amount,
+            sessions_total=payment.sessions_total,
+            sessions_completed=payment.sessions_completed,
+            start_date=payment.start_date.isoformat(),
+            end_date=payment.end_date.isoformat()
         )
-    ).first()
-    
-    if not active_payment:
-        return None
-    
-    return ActivePaymentInfo(
-        id=active_payment.id,
-        amount=active_payment.amount,
-        sessions_total=active_payment.sessions_total,
-        sessions_completed=active_payment.sessions_completed,
-        start_date=active_payment.start_date.isoformat(),
-        end_date=active_payment.end_date.isoformat()
-    )
+    
+    return active_payments
 
 @router.get("/", response_model=StudentListResponse)
-def get_students(
-    search: Optional[str] = Query(None, description="Search by student name"),
+@cached("students.list", ttl=30, tables=("students", "attendances", "payments"))
+async def get_students(
+    search: Optional[str] = Query(None, description="Search by name, grade, phone numbers or memo"),
     is_active: Optional[bool] = Query(None, description="Filter by active status"),
     limit: int = Query(10, ge=1, le=100, description="Number of items per page"),
     offset: int = Query(0, ge=0, description="Number of items to skip"),
-    db: Session = Depends(get_db)
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncSession = Depends(get_db)
 ):
     """Get paginated list of students with attendance rate and active payment info"""
     
-    # Base query
-    query = db.query(Student)
+    list_fields = parse_fields(fields, STUDENT_LIST_FIELDS)
+    row_fields = [f for f in list_fields if f not in STUDENT_ENRICHED_FIELDS]
+    
+    # Base query, selecting only the requested columns (and the id)
+    query = select(*(getattr(Student, f) for f in with_fields(row_fields, 'id')))
+    ordering = []
     
     # Apply filters
     if search:
-        query = query.filter(Student.name.ilike(f"%{search}%"))
+        query, ordering = apply_student_search(query, search, db.get_bind().dialect.name)
     
     if is_active is not None:
-        query = query.filter(Student.is_active == is_active)
+        query = query.where(Student.is_active == is_active)
     
     # Get total count
-    total = query.count()
+    total = await db.scalar(select(func.count()).select_from(query.subquery()))
+    if total > MAX_RANKED_MATCHES:
+        ordering = []
     
-    # Apply pagination
-    students = query.offset(offset).limit(limit).all()
+    # Apply pagination, best search matches first
+    students = (await db.execute(query.order_by(*ordering, Student.id).offset(offset).limit(limit))).all()
+    student_items = row_dicts(students, row_fields)
     
-    # Build response with additional data
-    student_items = []
-    for student in students:
-        attendance_rate = calculate_attendance_rate(student.id, db)
-        active_payment = get_active_payment(student.id, db)
-        
-        student_item = StudentListItem(
-            **student.__dict__,
-            attendance_rate=attendance_rate,
-            active_payment=active_payment
-        )
-        student_items.append(student_item)
+    # Enrich the whole page at once instead of querying per student
+    student_ids = [student.id for student in students]
+    if 'attendance_rate' in list_fields:
+        attendance_rates = await calculate_attendance_rates(student_ids, db)
+        for item, student_id in zip(student_items, student_ids):
+            item['attendance_rate'] = attendance_rates.get(student_id)
+    if 'active_payment' in list_fields:
+        active_payments = await get_active_payments(student_ids, db)
+        for item, student_id in zip(student_items, student_ids):
+            item['active_payment'] = active_payments.get(student_id)
     
     # Calculate pagination info
     page = (offset // limit) + 1
     total_pages = math.ceil(total / limit)
     
-    return StudentListResponse(
-        students=student_items,
-        total=total,
-        page=page,
-        per_page=limit,
-        total_pages=total_pages
-    )
+    # Items may hold only some fields, so they are not built as StudentListItem
+    return {
+        'students': student_items,
+        'total': total,
+        'page': page,
+        'per_page': limit,
+        'total_pages': total_pages
+    }
 
 @router.post("/", response_model=StudentSchema, status_code=status.HTTP_201_CREATED)
-def create_student(student: StudentCreate, db: Session = Depends(get_db)):
+async def create_student(student: StudentCreate, db: AsyncSession = Depends(get_db)):
     """Create a new student"""
     try:
         db_student = Student(**student.model_dump())
         db.add(db_student)
-        db.commit()
-        db.refresh(db_student)
+        await db.commit()
+        bump_tables("students")
+        await db.refresh(db_student)
         return db_student
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Failed to create student: {str(e)}"
         )
 
 @router.get("/{student_id}", response_model=StudentDetail)
-def get_student(student_id: int, db: Session = Depends(get_db)):
+async def get_student(student_id: int, db: AsyncSession = Depends(get_db)):
     """Get detailed information about a specific student"""
-    student = db.query(Student).filter(Student.id == student_id).first()
+    student = await db.get(Student, student_id)
     if not student:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -144,9 +174,11 @@ def get_student(student_id: int, db: Session = Depends(get_db)):
         )
     
     # Get recent attendance records (last 10)
-    recent_attendances = db.query(Attendance).filter(
-        Attendance.student_id == student_id
-    ).order_by(Attendance.date.desc()).limit(10).all()
+    recent_attendances = (await db.scalars(
+        select(Attendance).where(
+            Attendance.student_id == student_id
+        ).order_by(Attendance.date.desc()).limit(10)
+    )).all()
     
     attendance_data = []
     for attendance in recent_attendances:
@@ -160,12 +192,14 @@ def get_student(student_id: int, db: Session = Depends(get_db)):
         })
     
     # Get active payments
-    active_payments = db.query(Payment).filter(
-        and_(
-            Payment.student_id == student_id,
-            Payment.is_active == True
+    active_payments = (await db.scalars(
+        select(Payment).where(
+            and_(
+                Payment.student_id == student_id,
+                Payment.is_active == True
+            )
         )
-    ).all()
+    )).all()
     
     payment_data = []
     for payment in active_payments:
@@ -185,13 +219,13 @@ def get_student(student_id: int, db: Session = Depends(get_db)):
     )
 
 @router.put("/{student_id}", response_model=StudentSchema)
-def update_student(
+async def update_student(
     student_id: int, 
     student_update: StudentUpdate, 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update student information"""
-    student = db.query(Student).filter(Student.id == student_id).first()
+    student = await db.get(Student, student_id)
     if not student:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -203,20 +237,21 @@ def update_student(
         for field, value in update_data.items():
             setattr(student, field, value)
         
-        db.commit()
-        db.refresh(student)
+        await db.commit()
+        bump_tables("students")
+        await db.refresh(student)
         return student
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Failed to update student: {str(e)}"
         )
 
 @router.delete("/{student_id}", status_code=status.HTTP_200_OK)
-def deactivate_student(student_id: int, db: Session = Depends(get_db)):
+async def deactivate_student(student_id: int, db: AsyncSession = Depends(get_db)):
     """Deactivate a student (soft delete)"""
-    student = db.query(Student).filter(Student.id == student_id).first()
+    student = await db.get(Student, student_id)
     if not student:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -225,10 +260,11 @@ def deactivate_student(student_id: int, db: Session = Depends(get_db)):
     
     try:
         student.is_active = False
-        db.commit()
+        await db.commit()
+        bump_tables("students")
         return {"message": "Student deactivated successfully"}
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Failed to deactivate student: {str(e)}"
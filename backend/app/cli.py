@@ -0,0 +1,80 @@
+"""
+Maintenance commands for the study room backend.
+
+Usage (from the backend directory):
+    python -m app.cli init-db
+    python -m app.cli rebuild-attendance-stats
+    python -m app.cli expire-payments
+"""
+import argparse
+
+from dotenv import load_dotenv
+
+# Before the app modules, which read their settings when imported
+load_dotenv()
+
+from .database.connection import SessionLocal
+from .utils.attendance_rollup import rebuild_monthly_stats
+from .utils import payment_expiry
+
+def init_db(args) -> None:
+    """Create missing tables and the search index without running migrations"""
+    from .database.schema import create_tables
+
+    create_tables()
+    print("Created missing tables")
+
+def rebuild_attendance_stats(args) -> None:
+    """Backfill the monthly attendance rollup from the attendances table"""
+    db = SessionLocal()
+    try:
+        written = rebuild_monthly_stats(db, batch_size=args.batch_size)
+        db.commit()
+        print(f"Rebuilt {written} monthly attendance rows")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+def expire_payments(args) -> None:
+    """Deactivate payments whose end date has passed"""
+    db = SessionLocal()
+    try:
+        expired = payment_expiry.expire_payments(db, batch_size=args.batch_size)
+        print(f"Deactivated {expired} expired payments")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Study room maintenance commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    init_parser = subparsers.add_parser(
+        "init-db",
+        help="Create missing tables for a development database (use alembic upgrade head in production)"
+    )
+    init_parser.set_defaults(handler=init_db)
+
+    rebuild_parser = subparsers.add_parser(
+        "rebuild-attendance-stats",
+        help="Recompute attendance_monthly_stats from all attendance records"
+    )
+    rebuild_parser.add_argument("--batch-size", type=int, default=5000)
+    rebuild_parser.set_defaults(handler=rebuild_attendance_stats)
+
+    expire_parser = subparsers.add_parser(
+        "expire-payments",
+        help="Deactivate active payments past their end date (the API also does this daily)"
+    )
+    expire_parser.add_argument("--batch-size", type=int, default=500)
+    expire_parser.set_defaults(handler=expire_payments)
+
+    args = parser.parse_args()
+    args.handler(args)
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,208 @@
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from dotenv import load_dotenv
-
-load_dotenv()
+from functools import lru_cache
+from typing import AsyncIterator, Dict, Optional
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
 
+# Settings are read from the environment when this module is imported. The
+# entry points (app.main, app.cli, migrations/env.py) load .env before
+# importing it.
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./study_room.db")
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Async driver for the same database, used by the API. When unset it is
+# derived from DATABASE_URL (aiosqlite for SQLite, asyncpg for PostgreSQL).
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+# SQLite connection profile, applied as PRAGMAs on every new connection.
+# WAL lets readers proceed while a writer commits, and synchronous=NORMAL
+# only fsyncs at checkpoints instead of on every commit.
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", "-64000"))  # negative values are KiB
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", "268435456"))
+SQLITE_TEMP_STORE = os.getenv("SQLITE_TEMP_STORE", "MEMORY")
+
+# Connection pool sizing
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+
+def get_sqlite_pragmas() -> Dict[str, object]:
+    """PRAGMA settings for SQLite connections, from the environment"""
+    return {
+        "journal_mode": SQLITE_JOURNAL_MODE,
+        "synchronous": SQLITE_SYNCHRONOUS,
+        "busy_timeout": SQLITE_BUSY_TIMEOUT_MS,
+        "cache_size": SQLITE_CACHE_SIZE,
+        "mmap_size": SQLITE_MMAP_SIZE,
+        "temp_store": SQLITE_TEMP_STORE,
+    }
+
+def is_memory_database(database_url: str) -> bool:
+    """Whether the URL points at an in-memory SQLite database"""
+    url = make_url(database_url)
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+def get_async_database_url(database_url: str = DATABASE_URL) -> str:
+    """The async-driver form of a synchronous database URL"""
+    url = make_url(database_url)
+    drivername = ASYNC_DRIVERS.get(url.get_backend_name())
+    if drivername is None:
+        return database_url
+    return url.set(drivername=drivername).render_as_string(hide_password=False)
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or get_async_database_url()
+
+def _apply_sqlite_pragmas_on_connect(db_engine: Engine, pragmas: Dict[str, object]) -> None:
+    @event.listens_for(db_engine, "connect")
+    def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+def create_db_engine(
+    database_url: str = DATABASE_URL,
+    sqlite_pragmas: Optional[Dict[str, object]] = None
+) -> Engine:
+    """
+    Create the application engine.
+
+    SQLite file databases use a QueuePool sized from DB_POOL_SIZE /
+    DB_MAX_OVERFLOW, and every new connection is configured with
+    ``sqlite_pragmas`` (defaults to get_sqlite_pragmas()). In-memory
+    databases share a single connection through StaticPool.
+    """
+    from .pool import TimedQueuePool
+
+    if make_url(database_url).get_backend_name() != "sqlite":
+        return create_engine(
+            database_url,
+            poolclass=TimedQueuePool,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_pre_ping=True
+        )
+
+    if is_memory_database(database_url):
+        db_engine = create_engine(
+            database_url,
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool
+        )
+    else:
+        db_engine = create_engine(
+            database_url,
+            connect_args={"check_same_thread": False},
+            poolclass=TimedQueuePool,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT
+        )
+
+    pragmas = get_sqlite_pragmas() if sqlite_pragmas is None else sqlite_pragmas
+    if pragmas:
+        _apply_sqlite_pragmas_on_connect(db_engine, pragmas)
+
+    return db_engine
+
+def create_async_db_engine(
+    database_url: str = ASYNC_DATABASE_URL,
+    sqlite_pragmas: Optional[Dict[str, object]] = None
+) -> AsyncEngine:
+    """
+    Create the async engine used by the API routers.
+
+    Pooling and SQLite PRAGMAs follow create_db_engine. The PRAGMAs are
+    applied through the engine's sync facade, which aiosqlite supports.
+    """
+    from .pool import TimedAsyncQueuePool
+
+    if make_url(database_url).get_backend_name() != "sqlite":
+        return create_async_engine(
+            database_url,
+            poolclass=TimedAsyncQueuePool,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_pre_ping=True
+        )
+
+    if is_memory_database(database_url):
+        db_engine = create_async_engine(database_url, poolclass=StaticPool)
+    else:
+        db_engine = create_async_engine(
+            database_url,
+            poolclass=TimedAsyncQueuePool,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT
+        )
+
+    pragmas = get_sqlite_pragmas() if sqlite_pragmas is None else sqlite_pragmas
+    if pragmas:
+        _apply_sqlite_pragmas_on_connect(db_engine.sync_engine, pragmas)
+
+    return db_engine
+
+# Engines are created on first use, so importing the app, a model or a
+# maintenance command opens no connection pool and touches no database.
+# Query stats and pool metrics are loaded along with the first engine.
+
+@lru_cache(maxsize=None)
+def get_engine() -> Engine:
+    """Synchronous engine for maintenance commands, migrations and scripts"""
+    from ..utils.query_stats import instrument_engine
+
+    return instrument_engine(create_db_engine())
+
+@lru_cache(maxsize=None)
+def get_async_engine() -> AsyncEngine:
+    """Async engine used by the API"""
+    from ..utils.query_stats import instrument_engine
+
+    db_engine = create_async_db_engine()
+    instrument_engine(db_engine.sync_engine)
+    return db_engine
+
+@lru_cache(maxsize=None)
+def _sessionmaker() -> sessionmaker:
+    return sessionmaker(autocommit=False, autoflush=False, bind=get_engine())
+
+@lru_cache(maxsize=None)
+def _async_sessionmaker() -> async_sessionmaker:
+    # Keep objects loaded after commit so handlers can return them; an async
+    # session cannot lazily reload expired attributes
+    return async_sessionmaker(get_async_engine(), autoflush=False, expire_on_commit=False)
+
+def SessionLocal() -> Session:
+    return _sessionmaker()()
+
+def AsyncSessionLocal() -> AsyncSession:
+    return _async_sessionmaker()()
+
+def __getattr__(name: str):
+    # ``engine`` and ``async_engine`` stay importable, created on first access
+    if name == "engine":
+        return get_engine()
+    if name == "async_engine":
+        return get_async_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+async def dispose_engines() -> None:
+    """Close the pools of whichever engines were created"""
+    if get_async_engine.cache_info().currsize:
+        await get_async_engine().dispose()
+    if get_engine.cache_info().currsize:
+        get_engine().dispose()
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db() -> AsyncIterator[AsyncSession]:
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
\ No newline at end of file
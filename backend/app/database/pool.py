@@ -0,0 +1,35 @@
+"""
+Connection pools that record how long checkouts wait.
+
+Imported by the engine factories in connection.py when the first engine is
+created, so importing the connection module does not load the metrics.
+"""
+import time
+
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from ..utils.metrics import metrics
+
+pool_checkout_wait = metrics.histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time to get a pooled connection, including opening a new one",
+    ("engine",),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0)
+)
+
+class _TimedCheckout:
+    engine_label = "sync"
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            pool_checkout_wait.observe(time.perf_counter() - started, self.engine_label)
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    """QueuePool that records how long checkouts wait"""
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    """Async engines' queue pool, recording how long checkouts wait"""
+    engine_label = "async"
@@ -0,0 +1,27 @@
+"""
+Table creation for development databases.
+
+Production databases are managed with Alembic (``alembic upgrade head``).
+For local setups the tables can be created directly, either once with
+``python -m app.cli init-db`` or by the API at startup when DB_AUTO_CREATE
+is enabled. Neither happens at import time.
+"""
+import os
+
+from .base import Base
+from .connection import get_async_engine, get_engine
+from .. import models  # noqa: F401 - registers the models on Base.metadata
+
+# Create missing tables when the API starts. Convenient for a single dev
+# server; turn it off when migrations manage the schema or several workers
+# start at once
+DB_AUTO_CREATE = os.getenv("DB_AUTO_CREATE", "true").lower() in ("1", "true", "yes")
+
+def create_tables() -> None:
+    """Create missing tables and the search index with the synchronous engine"""
+    Base.metadata.create_all(bind=get_engine())
+
+async def create_tables_async() -> None:
+    """Create missing tables and the search index through the API's async engine"""
+    async with get_async_engine().begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
@@ -0,0 +1,87 @@
+"""
+Full-text index over the searchable student columns.
+
+SQLite uses an FTS5 table with the trigram tokenizer, which matches any
+substring of three or more characters. Word tokenizers cannot find part of
+a Korean name, which is written without spaces, and trigrams also cover
+phone number fragments. The table uses the students table as external
+content and is kept in sync by triggers, so Core bulk inserts are indexed
+too. PostgreSQL uses a pg_trgm GIN index over the same columns instead.
+"""
+from sqlalchemy import column, event, table, text
+from sqlalchemy.engine import Connection
+
+SEARCH_COLUMNS = ("name", "grade", "phone", "parent_phone", "memo")
+
+# Lightweight handle on the FTS5 table for queries; it is not part of
+# Base.metadata because create_all cannot create virtual tables
+students_fts = table("students_fts", column("rowid"), *(column(name) for name in SEARCH_COLUMNS))
+
+_COLUMN_LIST = ", ".join(SEARCH_COLUMNS)
+_NEW_VALUES = ", ".join(f"new.{name}" for name in SEARCH_COLUMNS)
+_OLD_VALUES = ", ".join(f"old.{name}" for name in SEARCH_COLUMNS)
+
+SQLITE_SEARCH_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS students_fts USING fts5(
+        {_COLUMN_LIST},
+        content='students',
+        content_rowid='id',
+        tokenize='trigram'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS students_fts_ai AFTER INSERT ON students BEGIN
+        INSERT INTO students_fts(rowid, {_COLUMN_LIST}) VALUES (new.id, {_NEW_VALUES});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS students_fts_ad AFTER DELETE ON students BEGIN
+        INSERT INTO students_fts(students_fts, rowid, {_COLUMN_LIST}) VALUES ('delete', old.id, {_OLD_VALUES});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS students_fts_au AFTER UPDATE OF {_COLUMN_LIST} ON students BEGIN
+        INSERT INTO students_fts(students_fts, rowid, {_COLUMN_LIST}) VALUES ('delete', old.id, {_OLD_VALUES});
+        INSERT INTO students_fts(rowid, {_COLUMN_LIST}) VALUES (new.id, {_NEW_VALUES});
+    END""",
+]
+
+SQLITE_SEARCH_DROP = [
+    "DROP TRIGGER IF EXISTS students_fts_au",
+    "DROP TRIGGER IF EXISTS students_fts_ad",
+    "DROP TRIGGER IF EXISTS students_fts_ai",
+    "DROP TABLE IF EXISTS students_fts",
+]
+
+# Must match the expression used in queries for the index to be used
+POSTGRES_SEARCH_DOCUMENT = "(" + " || ' ' || ".join(
+    f"coalesce(students.{name}, '')" for name in SEARCH_COLUMNS
+) + ")"
+
+POSTGRES_SEARCH_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    f"CREATE INDEX IF NOT EXISTS ix_students_search_trgm ON students USING gin ({POSTGRES_SEARCH_DOCUMENT} gin_trgm_ops)",
+]
+
+POSTGRES_SEARCH_DROP = [
+    "DROP INDEX IF EXISTS ix_students_search_trgm",
+]
+
+def rebuild_search_index(connection: Connection) -> None:
+    """Re-index every student, e.g. after creating the index on an existing table"""
+    if connection.dialect.name == "sqlite":
+        connection.execute(text("INSERT INTO students_fts(students_fts) VALUES ('rebuild')"))
+
+def ensure_search_index(connection: Connection) -> None:
+    """Create the search index if it is missing, indexing existing students"""
+    if connection.dialect.name == "sqlite":
+        exists = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'students_fts'")
+        ).first()
+        for statement in SQLITE_SEARCH_DDL:
+            connection.execute(text(statement))
+        if not exists:
+            rebuild_search_index(connection)
+    elif connection.dialect.name == "postgresql":
+        for statement in POSTGRES_SEARCH_DDL:
+            connection.execute(text(statement))
+
+def register_search_index(metadata) -> None:
+    """Have ``metadata.create_all()`` also create the search index"""
+    @event.listens_for(metadata, "after_create")
+    def _create_search_index(target, connection, **kw):
+        ensure_search_index(connection)
@@ -1,28 +1,61 @@
+from contextlib import asynccontextmanager
+
+from dotenv import load_dotenv
+
+# Before the app modules, which read their settings when imported
+load_dotenv()
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from .database.connection import engine
-from .database.base import Base
-from .api import students, attendance, payments
+from .database.connection import dispose_engines
+from .database.schema import DB_AUTO_CREATE, create_tables_async
+from .api import students, attendance, payments, holidays, metrics
+from .utils.cache import response_cache
+from .utils.compression import CompressionMiddleware
+from .utils.idempotency import IdempotencyMiddleware
+from .utils.metrics import MetricsMiddleware
+from .utils.query_stats import QueryStatsMiddleware
+from .utils.scheduler import scheduler
 
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Schema work happens at startup, not import, and only when enabled
+    if DB_AUTO_CREATE:
+        await create_tables_async()
+    # Daily jobs such as the expired payment sweep; the first run starts now
+    scheduler.start()
+    yield
+    await scheduler.stop()
+    await dispose_engines()
 
 app = FastAPI(
     title="Study Room Management System",
     description="API for managing study room students, attendance, and payments",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+# Innermost, so stored responses hold only the handler's own headers
+app.add_middleware(IdempotencyMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Server-Timing", "Idempotent-Replayed"],
 )
+# Outside the idempotency store, which keeps and replays uncompressed bodies
+app.add_middleware(CompressionMiddleware)
+# QueryStatsMiddleware wraps MetricsMiddleware, which reads its totals
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(QueryStatsMiddleware)
 
 app.include_router(students.router, prefix="/api/v1")
 app.include_router(attendance.router, prefix="/api/v1")
 app.include_router(payments.router, prefix="/api/v1")
+app.include_router(holidays.router, prefix="/api/v1")
+app.include_router(metrics.router)
 
 @app.get("/")
 def read_root():
@@ -30,4 +63,9 @@ def read_root():
 
 @app.get("/health")
 def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy"}
+
+@app.get("/cache/stats")
+def cache_stats():
+    """Hit/miss counters and size of the in-process response cache"""
+    return response_cache.stats()
@@ -1,5 +1,9 @@
 from .student import Student
 from .attendance import Attendance
 from .payment import Payment
+from .holiday import Holiday
+from .attendance_stat import AttendanceMonthlyStat
+from .session_usage import SessionUsage
+from .idempotency_key import IdempotencyKey
 
-__all__ = ["Student", "Attendance", "Payment"]
\ No newline at end of file
+__all__ = ["Student", "Attendance", "Payment", "Holiday", "AttendanceMonthlyStat", "SessionUsage", "IdempotencyKey"]
@@ -1,10 +1,16 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Date, Time, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Date, Time, Text, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..database.base import Base
 
 class Attendance(Base):
     __tablename__ = "attendances"
+    __table_args__ = (
+        # One record per student per day; also serves the (student_id, date) lookups
+        Index("ix_attendances_student_id_date", "student_id", "date", unique=True),
+        # Date-ordered listing and keyset pagination
+        Index("ix_attendances_date_id", "date", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     student_id = Column(Integer, ForeignKey("students.id"), nullable=False)
@@ -15,4 +21,5 @@ class Attendance(Base):
     note = Column(Text)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
-    student = relationship("Student", back_populates="attendances")
\ No newline at end of file
+    student = relationship("Student", back_populates="attendances")
+    session_usage = relationship("SessionUsage", back_populates="attendance", uselist=False, cascade="all, delete-orphan")
\ No newline at end of file
@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from ..database.base import Base
+
+class AttendanceMonthlyStat(Base):
+    """Per-student, per-month attendance rollup maintained alongside attendances"""
+    __tablename__ = "attendance_monthly_stats"
+    __table_args__ = (
+        Index("ix_attendance_monthly_stats_student_id_month", "student_id", "month", unique=True),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    student_id = Column(Integer, ForeignKey("students.id"), nullable=False)
+    month = Column(String(7), nullable=False)  # "YYYY-MM"
+    present = Column(Integer, nullable=False, default=0)
+    absent = Column(Integer, nullable=False, default=0)
+    late = Column(Integer, nullable=False, default=0)
+    early_leave = Column(Integer, nullable=False, default=0)
+    # Streak state: runs at the start and end of the month and the longest runs inside it
+    first_status = Column(String(20))
+    leading_run = Column(Integer, nullable=False, default=0)
+    last_status = Column(String(20))
+    trailing_run = Column(Integer, nullable=False, default=0)
+    longest_present_run = Column(Integer, nullable=False, default=0)
+    longest_absent_run = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    student = relationship("Student", back_populates="attendance_monthly_stats")
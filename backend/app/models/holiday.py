@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Integer, String, DateTime, Date
+from sqlalchemy.sql import func
+from ..database.base import Base
+
+class Holiday(Base):
+    """Academy-specific closed days, merged with the bundled public holidays"""
+    __tablename__ = "holidays"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    date = Column(Date, nullable=False, unique=True)
+    name = Column(String(100), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
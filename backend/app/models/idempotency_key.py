@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON, LargeBinary, Index
+from sqlalchemy.sql import func
+from ..database.base import Base
+
+class IdempotencyKey(Base):
+    """Stored response of a write request sent with an Idempotency-Key header"""
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        Index("ix_idempotency_keys_key", "key", unique=True),
+        Index("ix_idempotency_keys_expires_at", "expires_at"),
+        # Ids of deleted claims are never handed out again, so a stalled
+        # request cannot complete or release the claim that replaced its own
+        {"sqlite_autoincrement": True},
+    )
+    
+    id = Column(Integer, primary_key=True)
+    key = Column(String(255), nullable=False)
+    # SHA-256 of method, path, query string and body; a key reused for a
+    # different request is rejected
+    fingerprint = Column(String(64), nullable=False)
+    # NULL while the first request with the key is still running
+    status_code = Column(Integer)
+    headers = Column(JSON)
+    body = Column(LargeBinary)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False)
@@ -1,10 +1,16 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Numeric, Date
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Numeric, Date, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..database.base import Base
 
 class Payment(Base):
     __tablename__ = "payments"
+    __table_args__ = (
+        Index("ix_payments_student_id_is_active", "student_id", "is_active"),
+        Index("ix_payments_is_active_end_date", "is_active", "end_date"),
+        # created_at-ordered listing and keyset pagination
+        Index("ix_payments_created_at_id", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     student_id = Column(Integer, ForeignKey("students.id"), nullable=False)
@@ -18,4 +24,5 @@ class Payment(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
-    student = relationship("Student", back_populates="payments")
\ No newline at end of file
+    student = relationship("Student", back_populates="payments")
+    session_usages = relationship("SessionUsage", back_populates="payment", cascade="all, delete-orphan")
\ No newline at end of file
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from ..database.base import Base
+
+class SessionUsage(Base):
+    """Which attendance consumed a session of which payment"""
+    __tablename__ = "session_usages"
+    __table_args__ = (
+        # An attendance consumes at most one session
+        Index("ix_session_usages_attendance_id", "attendance_id", unique=True),
+        Index("ix_session_usages_payment_id", "payment_id"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    payment_id = Column(Integer, ForeignKey("payments.id"), nullable=False)
+    attendance_id = Column(Integer, ForeignKey("attendances.id"), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    payment = relationship("Payment", back_populates="session_usages")
+    attendance = relationship("Attendance", back_populates="session_usage")
@@ -2,12 +2,13 @@ from sqlalchemy import Column, Integer, String, DateTime, Boolean, JSON, Text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..database.base import Base
+from ..database.search import register_search_index
 
 class Student(Base):
     __tablename__ = "students"
     
     id = Column(Integer, primary_key=True, index=True)
-    name = Column(String(100), nullable=False)
+    name = Column(String(100), nullable=False, index=True)
     grade = Column(String(20))
     phone = Column(String(20))
     parent_phone = Column(String(20))
@@ -19,4 +20,7 @@ class Student(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     attendances = relationship("Attendance", back_populates="student", cascade="all, delete-orphan")
-    payments = relationship("Payment", back_populates="student", cascade="all, delete-orphan")
\ No newline at end of file
+    payments = relationship("Payment", back_populates="student", cascade="all, delete-orphan")
+    attendance_monthly_stats = relationship("AttendanceMonthlyStat", back_populates="student", cascade="all, delete-orphan")
+
+register_search_index(Base.metadata)
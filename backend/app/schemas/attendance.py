@@ -1,5 +1,6 @@
 from pydantic import BaseModel, validator
 from datetime import datetime, date, time
+import datetime as dt
 from typing import Optional, List, Dict, Any
 from enum import Enum
 
@@ -71,10 +72,14 @@ class BulkAttendanceItem(BaseModel):
     note: Optional[str] = None
 
 class BulkAttendanceRequest(BaseModel):
-    date: Optional[date] = None
+    # dt.date because the field name shadows the date type inside the class body
+    date: Optional[dt.date] = None
     attendances: List[BulkAttendanceItem]
+    upsert: bool = False  # overwrite existing records instead of reporting them as errors
+    # Use a session of each attending student's active payment, in the same transaction
+    complete_sessions: bool = False
     
-    @validator('date')
+    @validator('date', always=True)
     def validate_date(cls, v):
         if v and v > date.today():
             raise ValueError('Date cannot be in the future')
@@ -83,5 +88,9 @@ class BulkAttendanceRequest(BaseModel):
 class BulkAttendanceResult(BaseModel):
     success_count: int
     error_count: int
+    updated_count: int = 0
     errors: List[Dict[str, Any]]
-    created_attendances: List[Attendance]
\ No newline at end of file
+    created_attendances: List[Attendance]
+    sessions_completed: int = 0
+    # Attending students with no active payment that has sessions left
+    students_without_sessions: List[int] = []
\ No newline at end of file
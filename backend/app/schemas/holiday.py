@@ -0,0 +1,19 @@
+from pydantic import BaseModel
+from datetime import datetime, date
+
+class HolidayBase(BaseModel):
+    date: date
+    name: str
+
+class HolidayCreate(HolidayBase):
+    pass
+
+class Holiday(HolidayBase):
+    source: str  # "bundled" or "custom"
+
+class HolidayCalendarInfo(BaseModel):
+    first_day: date
+    last_day: date
+    holiday_count: int
+    session_day_count: int
+    loaded_at: datetime
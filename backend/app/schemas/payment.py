@@ -69,6 +69,24 @@ class SessionCompleteRequest(BaseModel):
     attendance_id: Optional[int] = None
     note: Optional[str] = None
 
+class BulkSessionCompleteRequest(BaseModel):
+    # Payments to complete a session of, and/or students whose active payment
+    # to complete one of (e.g. everyone present at roll call)
+    payment_ids: List[int] = []
+    student_ids: List[int] = []
+    
+    @validator('student_ids', always=True)
+    def validate_ids(cls, v, values):
+        if not v and not values.get('payment_ids'):
+            raise ValueError('Provide payment_ids or student_ids')
+        return v
+
+class BulkSessionCompleteResult(BaseModel):
+    success_count: int
+    error_count: int
+    errors: List[Dict[str, Any]]
+    completed_payments: List[Payment]
+
 class PaymentExtendRequest(BaseModel):
     additional_sessions: int
     additional_amount: Decimal
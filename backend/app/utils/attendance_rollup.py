@@ -0,0 +1,256 @@
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from itertools import groupby
+import calendar
+
+from sqlalchemy import and_, delete, insert, or_
+from sqlalchemy.orm import Session
+
+from ..models.attendance import Attendance
+from ..models.attendance_stat import AttendanceMonthlyStat
+
+@dataclass(frozen=True)
+class AttendanceSummary:
+    """
+    Counts and streak state for a date-ordered run of attendance records.
+
+    Summaries of adjacent periods combine exactly, so a long window can be
+    answered from monthly rollups plus the raw records of the partial months
+    at its edges.
+    """
+    present: int = 0
+    absent: int = 0
+    late: int = 0
+    early_leave: int = 0
+    first_status: Optional[str] = None
+    leading_run: int = 0
+    last_status: Optional[str] = None
+    trailing_run: int = 0
+    longest_present_run: int = 0
+    longest_absent_run: int = 0
+
+    @property
+    def total(self) -> int:
+        return self.present + self.absent + self.late + self.early_leave
+
+    @classmethod
+    def from_status(cls, status: str) -> "AttendanceSummary":
+        return cls(
+            **{status: 1},
+            first_status=status,
+            leading_run=1,
+            last_status=status,
+            trailing_run=1,
+            longest_present_run=1 if status == "present" else 0,
+            longest_absent_run=1 if status == "absent" else 0
+        )
+
+    @classmethod
+    def from_statuses(cls, statuses: Iterable[str]) -> "AttendanceSummary":
+        summary = cls()
+        for status in statuses:
+            summary = summary.combine(cls.from_status(status))
+        return summary
+
+    @classmethod
+    def from_row(cls, row: AttendanceMonthlyStat) -> "AttendanceSummary":
+        return cls(
+            present=row.present,
+            absent=row.absent,
+            late=row.late,
+            early_leave=row.early_leave,
+            first_status=row.first_status,
+            leading_run=row.leading_run,
+            last_status=row.last_status,
+            trailing_run=row.trailing_run,
+            longest_present_run=row.longest_present_run,
+            longest_absent_run=row.longest_absent_run
+        )
+
+    def combine(self, later: "AttendanceSummary") -> "AttendanceSummary":
+        """Summary of this period followed immediately by ``later``"""
+        if self.total == 0:
+            return later
+        if later.total == 0:
+            return self
+
+        joined = self.last_status == later.first_status
+        bridge = self.trailing_run + later.leading_run if joined else 0
+
+        longest_present_run = max(self.longest_present_run, later.longest_present_run)
+        longest_absent_run = max(self.longest_absent_run, later.longest_absent_run)
+        if joined and self.last_status == "present":
+            longest_present_run = max(longest_present_run, bridge)
+        if joined and self.last_status == "absent":
+            longest_absent_run = max(longest_absent_run, bridge)
+
+        # A period made of a single run extends into the neighbouring run
+        leading_run = self.leading_run
+        if joined and self.leading_run == self.total:
+            leading_run = self.total + later.leading_run
+        trailing_run = later.trailing_run
+        if joined and later.trailing_run == later.total:
+            trailing_run = later.total + self.trailing_run
+
+        return AttendanceSummary(
+            present=self.present + later.present,
+            absent=self.absent + later.absent,
+            late=self.late + later.late,
+            early_leave=self.early_leave + later.early_leave,
+            first_status=self.first_status,
+            leading_run=leading_run,
+            last_status=later.last_status,
+            trailing_run=trailing_run,
+            longest_present_run=longest_present_run,
+            longest_absent_run=longest_absent_run
+        )
+
+def month_key(day: date) -> str:
+    return day.strftime('%Y-%m')
+
+def month_bounds(key: str) -> Tuple[date, date]:
+    year, month = (int(part) for part in key.split('-'))
+    return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+
+def _next_month_start(day: date) -> date:
+    return (day.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+def refresh_monthly_stats(db: Session, keys: Iterable[Tuple[int, str]]) -> None:
+    """
+    Recompute the rollup rows for the given (student_id, "YYYY-MM") keys.
+
+    Runs inside the caller's transaction so the rollup commits or rolls back
+    together with the attendance write. Pending ORM changes must be flushed
+    first. Each month is recomputed from its own (at most 31) records, which
+    keeps updates and back-dated inserts exact.
+    """
+    students_by_month: Dict[str, Set[int]] = {}
+    for student_id, key in keys:
+        students_by_month.setdefault(key, set()).add(student_id)
+
+    for key, student_ids in students_by_month.items():
+        month_start, month_end = month_bounds(key)
+        records = db.query(Attendance.student_id, Attendance.status).filter(
+            and_(
+                Attendance.student_id.in_(student_ids),
+                Attendance.date >= month_start,
+                Attendance.date <= month_end
+            )
+        ).order_by(Attendance.student_id, Attendance.date).all()
+
+        statuses: Dict[int, List[str]] = {}
+        for record in records:
+            statuses.setdefault(record.student_id, []).append(record.status)
+
+        db.execute(
+            delete(AttendanceMonthlyStat).where(
+                and_(
+                    AttendanceMonthlyStat.student_id.in_(student_ids),
+                    AttendanceMonthlyStat.month == key
+                )
+            )
+        )
+
+        rows = []
+        for student_id, student_statuses in statuses.items():
+            summary = AttendanceSummary.from_statuses(student_statuses)
+            rows.append(_summary_row(student_id, key, summary))
+        if rows:
+            db.execute(insert(AttendanceMonthlyStat), rows)
+
+def _summary_row(student_id: int, key: str, summary: AttendanceSummary) -> dict:
+    return {
+        'student_id': student_id,
+        'month': key,
+        'present': summary.present,
+        'absent': summary.absent,
+        'late': summary.late,
+        'early_leave': summary.early_leave,
+        'first_status': summary.first_status,
+        'leading_run': summary.leading_run,
+        'last_status': summary.last_status,
+        'trailing_run': summary.trailing_run,
+        'longest_present_run': summary.longest_present_run,
+        'longest_absent_run': summary.longest_absent_run
+    }
+
+def rebuild_monthly_stats(db: Session, batch_size: int = 5000) -> int:
+    """Rebuild the whole rollup table from attendances; returns the number of rows written"""
+    db.execute(delete(AttendanceMonthlyStat))
+    
+    records = db.query(Attendance.student_id, Attendance.date, Attendance.status).order_by(
+        Attendance.student_id, Attendance.date
+    ).yield_per(batch_size)
+    
+    written = 0
+    rows = []
+    for (student_id, key), group in groupby(records, key=lambda r: (r.student_id, month_key(r.date))):
+        summary = AttendanceSummary.from_statuses(record.status for record in group)
+        rows.append(_summary_row(student_id, key, summary))
+        if len(rows) >= batch_size:
+            db.execute(insert(AttendanceMonthlyStat), rows)
+            written += len(rows)
+            rows = []
+    
+    if rows:
+        db.execute(insert(AttendanceMonthlyStat), rows)
+        written += len(rows)
+    return written
+
+def load_monthly_summaries(
+    db: Session,
+    student_id: int,
+    start_date: date,
+    end_date: date
+) -> List[Tuple[str, AttendanceSummary]]:
+    """
+    Date-ordered (month, summary) pairs for a student's records in [start_date, end_date].
+
+    Months that lie entirely inside the window are read from the rollup
+    table; the partial months at either edge are summarised from their raw
+    records, so the cost does not depend on how much history exists.
+    """
+    first_full_month = start_date if start_date.day == 1 else _next_month_start(start_date)
+    after_last_full_month = _next_month_start(end_date)
+    if end_date != after_last_full_month - timedelta(days=1):
+        after_last_full_month = end_date.replace(day=1)
+
+    summaries: Dict[str, AttendanceSummary] = {}
+
+    if first_full_month < after_last_full_month:
+        rollups = db.query(AttendanceMonthlyStat).filter(
+            and_(
+                AttendanceMonthlyStat.student_id == student_id,
+                AttendanceMonthlyStat.month >= month_key(first_full_month),
+                AttendanceMonthlyStat.month < month_key(after_last_full_month)
+            )
+        ).all()
+        for rollup in rollups:
+            summaries[rollup.month] = AttendanceSummary.from_row(rollup)
+        raw_ranges = [
+            (start_date, first_full_month - timedelta(days=1)),
+            (after_last_full_month, end_date)
+        ]
+    else:
+        raw_ranges = [(start_date, end_date)]
+
+    raw_ranges = [(range_start, range_end) for range_start, range_end in raw_ranges if range_start <= range_end]
+    if raw_ranges:
+        records = db.query(Attendance.date, Attendance.status).filter(
+            and_(
+                Attendance.student_id == student_id,
+                or_(*[
+                    and_(Attendance.date >= range_start, Attendance.date <= range_end)
+                    for range_start, range_end in raw_ranges
+                ])
+            )
+        ).order_by(Attendance.date).all()
+
+        statuses: Dict[str, List[str]] = {}
+        for record in records:
+            statuses.setdefault(month_key(record.date), []).append(record.status)
+        for key, month_statuses in statuses.items():
+            summaries[key] = AttendanceSummary.from_statuses(month_statuses)
+
+    return sorted(summaries.items())
@@ -0,0 +1,93 @@
+"""
+In-process publish/subscribe for pushing changes to streaming clients.
+
+Each subscriber gets a bounded queue. Publishing never waits: when a slow
+client's queue is full, its pending messages are dropped and it is marked
+for resync, so it reloads a full snapshot instead of holding up everyone
+else or growing without bound. Messages are published already encoded, so
+fanning out to hundreds of subscribers costs one serialization.
+"""
+import asyncio
+import os
+from contextlib import contextmanager
+from typing import Iterator, Optional, Set
+
+BROKER_QUEUE_SIZE = int(os.getenv("BROKER_QUEUE_SIZE", "256"))
+
+class Subscription:
+    """Queue of messages for one subscriber"""
+
+    def __init__(self, maxsize: int):
+        self.queue: "asyncio.Queue[bytes]" = asyncio.Queue(maxsize=maxsize)
+        self.resync = asyncio.Event()
+        self.dropped = 0
+
+    def offer(self, message: bytes) -> None:
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.dropped += self.queue.qsize() + 1
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.resync.set()
+
+    def request_resync(self) -> None:
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.resync.set()
+
+    async def next(self, timeout: float) -> Optional[bytes]:
+        """
+        Next message, or None when a resync is due or ``timeout`` passed.
+
+        Check and clear ``resync`` after a None to tell the two apart.
+        """
+        if self.resync.is_set():
+            return None
+        get = asyncio.ensure_future(self.queue.get())
+        resync = asyncio.ensure_future(self.resync.wait())
+        try:
+            done, _ = await asyncio.wait({get, resync}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            resync.cancel()
+            if not get.done():
+                get.cancel()
+        if get in done and not get.cancelled() and not self.resync.is_set():
+            return get.result()
+        return None
+
+class Broker:
+    """Fan-out of published messages to every current subscriber"""
+
+    def __init__(self, queue_size: int = BROKER_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self.subscribers: Set[Subscription] = set()
+        self.published = 0
+        self.dropped = 0
+
+    @contextmanager
+    def subscribe(self) -> Iterator[Subscription]:
+        subscription = Subscription(self.queue_size)
+        self.subscribers.add(subscription)
+        try:
+            yield subscription
+        finally:
+            self.subscribers.discard(subscription)
+            self.dropped += subscription.dropped
+
+    def publish(self, message: bytes) -> None:
+        self.published += 1
+        for subscription in self.subscribers:
+            subscription.offer(message)
+
+    def resync(self) -> None:
+        """Ask every subscriber to reload a full snapshot"""
+        for subscription in self.subscribers:
+            subscription.request_resync()
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": len(self.subscribers),
+            "published": self.published,
+            "dropped": self.dropped + sum(s.dropped for s in self.subscribers)
+        }
@@ -0,0 +1,273 @@
+"""
+In-process cache for the JSON bodies of read-heavy endpoints.
+
+Each cached endpoint is a namespace with its own TTL and the tables it reads.
+Entries hold the serialized response, so a hit skips both the queries and
+serialization, and the memory bound is exact. Writers bump the versions of
+the tables they changed after committing (see table_versions), which drops
+every entry that read them. Each response carries a weak ETag hashed from
+its cache key and body, so a poll with a matching If-None-Match gets 304
+Not Modified; while the entry is live that needs no database access, and
+once its TTL has passed the body is computed again before comparing. The
+cache is per process and is only used from the event loop.
+"""
+import asyncio
+import functools
+import hashlib
+import inspect
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from fastapi import Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .fast_json import dumps
+from .table_versions import TableVersions, table_versions
+
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1024"))
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+@dataclass
+class CacheNamespace:
+    name: str
+    ttl: float
+    tables: Tuple[str, ...]
+    hits: int = 0
+    misses: int = 0
+    # Misses that waited on a concurrent computation instead of querying
+    coalesced: int = 0
+    not_modified: int = 0
+
+@dataclass
+class CacheEntry:
+    body: bytes
+    expires_at: float
+    tables: Tuple[str, ...] = field(default_factory=tuple)
+
+class ResponseCache:
+    """LRU cache of response bodies bounded by entry count and total bytes"""
+
+    def __init__(
+        self,
+        max_entries: int = RESPONSE_CACHE_MAX_ENTRIES,
+        max_bytes: int = RESPONSE_CACHE_MAX_BYTES,
+        enabled: bool = RESPONSE_CACHE_ENABLED,
+        versions: TableVersions = table_versions
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        # A result computed across a write is not stored, because the
+        # versions it started from are no longer current
+        self.versions = versions
+        versions.subscribe(self.invalidate)
+        self.namespaces: Dict[str, CacheNamespace] = {}
+        self._entries: "OrderedDict[Tuple[str, Hashable], CacheEntry]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, Hashable], asyncio.Future] = {}
+        self.size_bytes = 0
+        self.evictions = 0
+
+    def register(self, name: str, ttl: float, tables: Tuple[str, ...]) -> CacheNamespace:
+        namespace = CacheNamespace(name=name, ttl=ttl, tables=tuple(tables))
+        self.namespaces[name] = namespace
+        return namespace
+
+    def get(self, name: str, key: Hashable) -> Optional[bytes]:
+        entry = self._entries.get((name, key))
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            self._remove((name, key))
+            return None
+        self._entries.move_to_end((name, key))
+        return entry.body
+
+    def set(self, name: str, key: Hashable, body: bytes, versions: Tuple[int, ...]) -> None:
+        namespace = self.namespaces[name]
+        if versions != self.versions.get(namespace.tables) or len(body) > self.max_bytes:
+            return
+
+        self._remove((name, key))
+        self._entries[(name, key)] = CacheEntry(
+            body=body,
+            expires_at=time.monotonic() + namespace.ttl,
+            tables=namespace.tables
+        )
+        self.size_bytes += len(body)
+        while len(self._entries) > self.max_entries or self.size_bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _remove(self, cache_key: Tuple[str, Hashable]) -> None:
+        entry = self._entries.pop(cache_key, None)
+        if entry is not None:
+            self.size_bytes -= len(entry.body)
+
+    def invalidate(self, *tables: str) -> None:
+        """Drop every entry that read any of ``tables``"""
+        changed = set(tables)
+        for cache_key in [k for k, entry in self._entries.items() if changed.intersection(entry.tables)]:
+            self._remove(cache_key)
+        # Later requests must not join a computation that started before the write
+        for cache_key in [k for k in self._inflight if changed.intersection(self.namespaces[k[0]].tables)]:
+            del self._inflight[cache_key]
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._inflight.clear()
+        self.size_bytes = 0
+
+    async def get_or_compute(self, name: str, key: Hashable, compute: Callable[[], Any]) -> bytes:
+        """Cached body for ``key``, computing it once for concurrent misses"""
+        namespace = self.namespaces[name]
+        body = self.get(name, key) if self.enabled else None
+        if body is not None:
+            namespace.hits += 1
+            return body
+
+        namespace.misses += 1
+        if not self.enabled:
+            return await compute()
+
+        while (pending := self._inflight.get((name, key))) is not None:
+            namespace.coalesced += 1
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                # The computation was cancelled with the request that started
+                # it (its client went away): compute it again, unless this
+                # request is being cancelled too
+                if not pending.cancelled() or asyncio.current_task().cancelling():
+                    raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[(name, key)] = future
+        versions = self.versions.get(namespace.tables)
+        try:
+            body = await compute()
+        except asyncio.CancelledError:
+            # The computation uses this request's session, so it cannot
+            # outlive it; the waiters compute it again
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Retrieve it so an unobserved failure is not logged
+            future.exception()
+            raise
+        finally:
+            if self._inflight.get((name, key)) is future:
+                del self._inflight[(name, key)]
+
+        future.set_result(body)
+        self.set(name, key, body, versions)
+        return body
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "size_bytes": self.size_bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+            "table_versions": self.versions.snapshot(),
+            "namespaces": {
+                name: {
+                    "ttl": namespace.ttl,
+                    "tables": list(namespace.tables),
+                    "hits": namespace.hits,
+                    "misses": namespace.misses,
+                    "coalesced": namespace.coalesced,
+                    "not_modified": namespace.not_modified
+                }
+                for name, namespace in self.namespaces.items()
+            }
+        }
+
+response_cache = ResponseCache()
+
+def encode_json(content: Any) -> bytes:
+    """Serialize a handler result: Pydantic models, or rows mapped to dicts"""
+    return dumps(content)
+
+def _digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+def weak_etag(name: str, key: Hashable, body: bytes) -> str:
+    """
+    Weak ETag for the cached ``body`` of ``name`` under ``key``.
+
+    Both parts are hashes, so the tag is the same in every worker and across
+    restarts, never matches a response for other parameters, and changes
+    whenever the body does, including after writes this process did not see.
+    """
+    return 'W/"{}-{}"'.format(_digest(repr((name, key)).encode()), _digest(body))
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of ``etag`` against an If-None-Match header"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+def cache_key(today: date, params: Dict[str, Any]) -> Hashable:
+    """Key of a cached handler call with ``params`` on ``today``"""
+    return (today,) + tuple(sorted(
+        (param, value) for param, value in params.items()
+        if not isinstance(value, (AsyncSession, Request, Response))
+    ))
+
+def cached(name: str, ttl: float, tables: Tuple[str, ...], cache: ResponseCache = response_cache):
+    """
+    Cache a GET handler's JSON body, keyed by its query parameters and today's date.
+
+    Responses carry a weak ETag of the cache key and body (see weak_etag); a
+    request whose If-None-Match matches the current body gets 304. The
+    handler only runs when the entry has expired or was invalidated, so a
+    304 never outlives the TTL without the data being read again. Bodies
+    are returned as a plain Response, so the route's response_model only
+    documents the OpenAPI schema and is not validated: the handler must
+    return models or dicts of that shape.
+    """
+    cache.register(name, ttl, tables)
+
+    def decorator(func):
+        signature = inspect.signature(func)
+        # The request is needed for If-None-Match; add it unless the handler takes it
+        request_param = next(
+            (param.name for param in signature.parameters.values() if param.annotation is Request),
+            None
+        )
+        if request_param is None:
+            signature = signature.replace(parameters=[
+                *signature.parameters.values(),
+                inspect.Parameter("request", inspect.Parameter.KEYWORD_ONLY, annotation=Request)
+            ])
+
+        @functools.wraps(func)
+        async def wrapper(**kwargs):
+            request = kwargs[request_param] if request_param else kwargs.pop("request")
+            key = cache_key(date.today(), kwargs)
+
+            async def compute() -> bytes:
+                return encode_json(await func(**kwargs))
+
+            body = await cache.get_or_compute(name, key, compute)
+            headers = {"ETag": weak_etag(name, key, body), "Cache-Control": "no-cache"}
+            if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+                cache.namespaces[name].not_modified += 1
+                return Response(status_code=304, headers=headers)
+            return Response(content=body, media_type="application/json", headers=headers)
+
+        wrapper.__signature__ = signature
+        return wrapper
+
+    return decorator
@@ -0,0 +1,158 @@
+"""
+Compressed responses for clients that accept them.
+
+Bodies of at least COMPRESSION_MIN_SIZE bytes are compressed with Brotli
+when the client lists ``br`` in Accept-Encoding and the ``brotli`` package
+is installed, and with gzip otherwise. Smaller bodies are sent as they are:
+the framing would cost more than it saves.
+
+Streamed responses (exports) are compressed chunk by chunk and flushed after
+each, so rows still reach the client as they are produced. Event streams,
+responses that already carry a Content-Encoding and bodiless statuses are
+never touched.
+"""
+import os
+import re
+import zlib
+from typing import Optional
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() in ("1", "true", "yes")
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+# Quality 4 compresses JSON better than gzip -6 at a similar speed; the
+# higher levels are meant for static assets compressed once
+BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+
+EXCLUDED_CONTENT_TYPES = ("text/event-stream",)
+ACCEPT_ENCODING_TOKEN = re.compile(r"\s*([a-z*]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?")
+
+def accepted_encodings(header: str) -> set:
+    """Codings named in an Accept-Encoding header, without those refused with q=0"""
+    accepted = set()
+    for part in header.lower().split(","):
+        match = ACCEPT_ENCODING_TOKEN.match(part)
+        if match is None:
+            continue
+        try:
+            quality = float(match.group(2)) if match.group(2) else 1.0
+        except ValueError:
+            continue
+        if quality > 0:
+            accepted.add(match.group(1))
+    return accepted
+
+def choose_encoding(header: str) -> Optional[str]:
+    accepted = accepted_encodings(header)
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+class _Compressor:
+    """Incremental gzip or Brotli compressor with a common interface"""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            self._zlib = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data)
+        return self._zlib.compress(data)
+
+    def flush(self) -> bytes:
+        """Emit everything compressed so far without ending the stream"""
+        if self.encoding == "br":
+            return self._brotli.flush()
+        return self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.finish()
+        return self._zlib.flush()
+
+class CompressionMiddleware:
+    """Compress response bodies with Brotli or gzip, per Accept-Encoding"""
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not COMPRESSION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(dict(scope["headers"]).get(b"accept-encoding", b"").decode("latin-1"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        compressor: Optional[_Compressor] = None
+        passthrough = False
+
+        async def compressing_send(message):
+            nonlocal start, compressor, passthrough
+            if message["type"] == "http.response.start":
+                headers = dict(message.get("headers", []))
+                content_type = headers.get(b"content-type", b"").decode("latin-1")
+                passthrough = (
+                    b"content-encoding" in headers
+                    or content_type.startswith(EXCLUDED_CONTENT_TYPES)
+                    or message["status"] < 200
+                    or message["status"] in (204, 304)
+                )
+                if passthrough:
+                    await send(message)
+                else:
+                    # Held back until the first body chunk shows whether to compress
+                    start = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start is not None:
+                response_start, start = start, None
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(response_start)
+                    await send(message)
+                    return
+                compressor = _Compressor(encoding)
+                headers = _encoded_headers(response_start.get("headers", []), encoding)
+                if not more_body:
+                    # A complete body is compressed in one go and keeps a Content-Length
+                    body = _compress(compressor, body, final=True)
+                    headers.append((b"content-length", str(len(body)).encode()))
+                    await send({**response_start, "headers": headers})
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                await send({**response_start, "headers": headers})
+
+            chunk = _compress(compressor, body, final=not more_body)
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, compressing_send)
+
+def _compress(compressor: _Compressor, body: bytes, final: bool) -> bytes:
+    return compressor.compress(body) + (compressor.finish() if final else compressor.flush())
+
+def _encoded_headers(headers, encoding: str) -> list:
+    """Response headers for a compressed body, without a Content-Length"""
+    vary = [value for name, value in headers if name.lower() == b"vary"]
+    encoded = [(name, value) for name, value in headers if name.lower() not in (b"content-length", b"vary")]
+    encoded.append((b"vary", b", ".join([*vary, b"Accept-Encoding"])))
+    encoded.append((b"content-encoding", encoding.encode()))
+    return encoded
@@ -1,5 +1,60 @@
-from datetime import date, timedelta
-from typing import List
+from datetime import date
+from bisect import bisect_left, bisect_right
+from typing import Iterable, List, Sequence, Tuple
+
+# date.toordinal() is 1 for Monday 0001-01-01, so weekday arithmetic on
+# ordinals needs no per-day loop: every block of 7 days holds 5 weekdays.
+
+def _valid_days_before(ordinal: int, exclude_weekends: bool) -> int:
+    """Number of session-eligible days (ignoring holidays) before the given ordinal"""
+    days = ordinal - 1
+    if not exclude_weekends:
+        return days
+    weeks, remainder = divmod(days, 7)
+    return weeks * 5 + min(remainder, 5)
+
+def _nth_valid_ordinal(index: int, exclude_weekends: bool) -> int:
+    """Ordinal of the session-eligible day with the given 0-based index"""
+    if not exclude_weekends:
+        return index + 1
+    weeks, remainder = divmod(index, 5)
+    return weeks * 7 + remainder + 1
+
+def _prepare_holidays(holidays: Iterable[date], exclude_weekends: bool) -> List[int]:
+    """Sorted, de-duplicated ordinals of the holidays that fall on otherwise valid days"""
+    return sorted({
+        holiday.toordinal() for holiday in holidays
+        if not (exclude_weekends and holiday.weekday() >= 5)
+    })
+
+def _count_holidays(holiday_ordinals: Sequence[int], start_ordinal: int, end_ordinal: int) -> int:
+    """Number of prepared holidays in [start_ordinal, end_ordinal]"""
+    return bisect_right(holiday_ordinals, end_ordinal) - bisect_left(holiday_ordinals, start_ordinal)
+
+def _session_end_ordinal(
+    start_ordinal: int,
+    total_sessions: int,
+    exclude_weekends: bool,
+    holiday_ordinals: Sequence[int]
+) -> int:
+    """Ordinal of the day on which the last of ``total_sessions`` sessions falls"""
+    if total_sessions <= 0:
+        return start_ordinal
+    
+    first_index = _valid_days_before(start_ordinal, exclude_weekends)
+    last_index = first_index + total_sessions - 1
+    
+    # Every holiday inside the range pushes the end out by one valid day.
+    # The count only grows as the range grows, so this settles after at most
+    # one extra step per holiday that is crossed.
+    skipped = 0
+    end_ordinal = _nth_valid_ordinal(last_index, exclude_weekends)
+    while True:
+        holidays_in_range = _count_holidays(holiday_ordinals, start_ordinal, end_ordinal)
+        if holidays_in_range == skipped:
+            return end_ordinal
+        skipped = holidays_in_range
+        end_ordinal = _nth_valid_ordinal(last_index + skipped, exclude_weekends)
 
 def calculate_session_end_date(
     start_date: date, 
@@ -19,34 +74,68 @@ def calculate_session_end_date(
     Returns:
         The calculated end date
     """
-    if holidays is None:
-        holidays = []
-    
-    current_date = start_date
-    sessions_counted = 0
-    
-    # We need to count 'total_sessions' valid days
-    while sessions_counted < total_sessions:
-        # Check if current date is a valid session day
-        is_valid_day = True
-        
-        # Skip weekends if exclude_weekends is True
-        if exclude_weekends and current_date.weekday() >= 5:  # 5=Saturday, 6=Sunday
-            is_valid_day = False
-        
-        # Skip holidays
-        if current_date in holidays:
-            is_valid_day = False
-        
-        # If it's a valid day, count it as a session
-        if is_valid_day:
-            sessions_counted += 1
-        
-        # If we haven't reached the total sessions yet, move to next day
-        if sessions_counted < total_sessions:
-            current_date += timedelta(days=1)
-    
-    return current_date
+    holiday_ordinals = _prepare_holidays(holidays or [], exclude_weekends)
+    end_ordinal = _session_end_ordinal(
+        start_date.toordinal(), total_sessions, exclude_weekends, holiday_ordinals
+    )
+    return date.fromordinal(end_ordinal)
+
+def calculate_session_end_dates(
+    packages: Iterable[Tuple[date, int]],
+    exclude_weekends: bool = True,
+    holidays: List[date] = None
+) -> List[date]:
+    """
+    Calculate end dates for many session packages at once.
+    
+    The holiday list is sorted once and shared by every package, which makes
+    this the right call for bulk payment imports and re-planning.
+    
+    Args:
+        packages: (start_date, total_sessions) pairs
+        exclude_weekends: Whether to exclude weekends (Saturday=5, Sunday=6)
+        holidays: List of holiday dates to exclude
+    
+    Returns:
+        End dates in the same order as ``packages``
+    """
+    holiday_ordinals = _prepare_holidays(holidays or [], exclude_weekends)
+    return [
+        date.fromordinal(_session_end_ordinal(
+            start_date.toordinal(), total_sessions, exclude_weekends, holiday_ordinals
+        ))
+        for start_date, total_sessions in packages
+    ]
+
+def count_session_days(
+    start_date: date,
+    end_date: date,
+    exclude_weekends: bool = True,
+    holidays: List[date] = None
+) -> int:
+    """
+    Count the session days between two dates (inclusive).
+    
+    Args:
+        start_date: Start date
+        end_date: End date
+        exclude_weekends: Whether to exclude weekends (Saturday=5, Sunday=6)
+        holidays: List of holiday dates to exclude
+    
+    Returns:
+        Number of session days
+    """
+    if start_date > end_date:
+        return 0
+    
+    start_ordinal = start_date.toordinal()
+    end_ordinal = end_date.toordinal()
+    holiday_ordinals = _prepare_holidays(holidays or [], exclude_weekends)
+    return (
+        _valid_days_before(end_ordinal + 1, exclude_weekends)
+        - _valid_days_before(start_ordinal, exclude_weekends)
+        - _count_holidays(holiday_ordinals, start_ordinal, end_ordinal)
+    )
 
 def get_business_days_between(start_date: date, end_date: date) -> int:
     """
@@ -62,16 +151,10 @@ def get_business_days_between(start_date: date, end_date: date) -> int:
     if start_date > end_date:
         return 0
     
-    current_date = start_date
-    business_days = 0
-    
-    while current_date <= end_date:
-        # Monday = 0, Sunday = 6
-        if current_date.weekday() < 5:  # Monday to Friday
-            business_days += 1
-        current_date += timedelta(days=1)
-    
-    return business_days
+    return (
+        _valid_days_before(end_date.toordinal() + 1, exclude_weekends=True)
+        - _valid_days_before(start_date.toordinal(), exclude_weekends=True)
+    )
 
 def calculate_days_until_expiry(end_date: date) -> int:
     """
@@ -103,98 +186,3 @@ def calculate_progress_percentage(sessions_completed: int, sessions_total: int)
     
     percentage = (sessions_completed / sessions_total) * 100
     return round(min(percentage, 100.0), 1)
-
-def get_korean_holidays_2024() -> List[date]:
-    """
-    Get a list of major Korean holidays for 2024.
-    This is a basic implementation - in production, you might want to use a proper holiday library.
-    
-    Returns:
-        List of holiday dates
-    """
-    holidays = [
-        # New Year's Day
-        date(2024, 1, 1),
-        # Lunar New Year (usually 3 days)
-        date(2024, 2, 9),
-        date(2024, 2, 10),
-        date(2024, 2, 11),
-        date(2024, 2, 12),
-        # Independence Movement Day
-        date(2024, 3, 1),
-        # Children's Day
-        date(2024, 5, 5),
-        # Buddha's Birthday
-        date(2024, 5, 15),
-        # Memorial Day
-        date(2024, 6, 6),
-        # Liberation Day
-        date(2024, 8, 15),
-        # Chuseok (usually 3 days)
-        date(2024, 9, 16),
-        date(2024, 9, 17),
-        date(2024, 9, 18),
-        # National Foundation Day
-        date(2024, 10, 3),
-        # Hangeul Day
-        date(2024, 10, 9),
-        # Christmas Day
-        date(2024, 12, 25),
-    ]
-    
-    return holidays
-
-def get_korean_holidays_2025() -> List[date]:
-    """
-    Get a list of major Korean holidays for 2025.
-    
-    Returns:
-        List of holiday dates
-    """
-    holidays = [
-        # New Year's Day
-        date(2025, 1, 1),
-        # Lunar New Year (usually 3 days)
-        date(2025, 1, 28),
-        date(2025, 1, 29),
-        date(2025, 1, 30),
-        # Independence Movement Day
-        date(2025, 3, 1),
-        # Children's Day
-        date(2025, 5, 5),
-        # Buddha's Birthday
-        date(2025, 5, 5),  # Same as Children's Day in 2025
-        # Memorial Day
-        date(2025, 6, 6),
-        # Liberation Day
-        date(2025, 8, 15),
-        # Chuseok (usually 3 days)
-        date(2025, 10, 5),
-        date(2025, 10, 6),
-        date(2025, 10, 7),
-        # National Foundation Day
-        date(2025, 10, 3),
-        # Hangeul Day
-        date(2025, 10, 9),
-        # Christmas Day
-        date(2025, 12, 25),
-    ]
-    
-    return holidays
-
-def get_current_year_holidays() -> List[date]:
-    """
-    Get holidays for the current year.
-    
-    Returns:
-        List of holiday dates for current year
-    """
-    current_year = date.today().year
-    
-    if current_year == 2024:
-        return get_korean_holidays_2024()
-    elif current_year == 2025:
-        return get_korean_holidays_2025()
-    else:
-        # For other years, return empty list or implement additional years
-        return []
\ No newline at end of file
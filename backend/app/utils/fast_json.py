@@ -0,0 +1,48 @@
+"""
+JSON responses that skip response_model validation and jsonable_encoder.
+
+Returning a Response from a handler makes FastAPI send it as is, while the
+route's response_model still documents the body in OpenAPI. Listing
+handlers map their SQLAlchemy rows straight to dicts with the schema's
+fields and return FastJSONResponse, so each row is neither built as a
+model nor validated again on the way out.
+"""
+from datetime import date, datetime, time
+from decimal import Decimal
+from operator import itemgetter
+from typing import Any, Dict, List, Sequence
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy.engine import Row
+
+def json_default(value: Any) -> Any:
+    """Encode the types the JSON encoders do not handle, as Pydantic would"""
+    if isinstance(value, (date, datetime, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=json_default, option=orjson.OPT_NON_STR_KEYS)
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+def row_dicts(rows: Sequence[Row], fields: Sequence[str]) -> List[Dict[str, Any]]:
+    """Map SQLAlchemy rows to dicts holding ``fields`` in order, without validation"""
+    if not rows:
+        return []
+    if not fields:
+        return [{} for _ in rows]
+    # Look the columns up once; per-row access by name is several times slower
+    positions = [rows[0]._fields.index(field) for field in fields]
+    if len(positions) == 1:
+        return [{fields[0]: row[positions[0]]} for row in rows]
+    values = itemgetter(*positions)
+    return [dict(zip(fields, values(row))) for row in rows]
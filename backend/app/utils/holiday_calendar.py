@@ -0,0 +1,198 @@
+import json
+import logging
+import os
+import threading
+from array import array
+from datetime import date, datetime
+from time import monotonic
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from ..models.holiday import Holiday
+from .date_calculator import calculate_session_end_date, count_session_days
+from .table_versions import table_versions
+
+logger = logging.getLogger(__name__)
+
+BUNDLED_HOLIDAYS_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "data", "holidays_kr.json"
+)
+
+# Years past the bundled data that the index still covers, so payments
+# started near the end of the data do not fall off the precomputed range.
+# No public holidays are known for them; calculations reaching them are logged
+EXTRA_YEARS = 2
+# Seconds before the calendar is rebuilt even without a holidays write seen
+# here, so closed days added through another worker are picked up
+HOLIDAY_CALENDAR_MAX_AGE = float(os.getenv("HOLIDAY_CALENDAR_MAX_AGE", "60"))
+
+def load_bundled_holidays(path: str = BUNDLED_HOLIDAYS_PATH) -> Dict[date, str]:
+    """Load the bundled public holidays as {date: name}"""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+
+    holidays = {}
+    for entries in data.values():
+        for entry in entries:
+            holidays[date.fromisoformat(entry["date"])] = entry["name"]
+    return holidays
+
+class HolidayCalendar:
+    """
+    Holidays for a range of years plus a precomputed session-day index.
+
+    Session days are weekdays that are not holidays. For every day in
+    [first_day, last_day] the index stores how many session days precede
+    it, so counting session days in a range or finding the Nth session day
+    after a date is a pair of array lookups. Dates outside the range fall
+    back to the closed-form calculator in date_calculator.
+
+    Public holidays are only known up to ``holidays_until`` (the end of the
+    bundled data); a calculation reaching past it is logged once per year,
+    since its session days there only skip weekends and custom closed days.
+    """
+
+    def __init__(
+        self,
+        holidays: Dict[date, str],
+        first_year: int,
+        last_year: int,
+        custom_dates: Iterable[date] = (),
+        holidays_until: Optional[date] = None
+    ):
+        self.holidays = dict(sorted(holidays.items()))
+        self.custom_dates = frozenset(custom_dates)
+        self.first_day = date(first_year, 1, 1)
+        self.last_day = date(last_year, 12, 31)
+        self.holidays_until = holidays_until or self.last_day
+        self.loaded_at = datetime.now()
+
+        first_ordinal = self.first_day.toordinal()
+        day_count = self.last_day.toordinal() - first_ordinal + 1
+
+        # _days_before[i] = session days in [first_day, first_day + i)
+        self._days_before = array("l", [0]) * (day_count + 1)
+        self._session_ordinals = array("l")
+        for offset in range(day_count):
+            ordinal = first_ordinal + offset
+            self._days_before[offset + 1] = self._days_before[offset]
+            if self._is_session_ordinal(ordinal):
+                self._session_ordinals.append(ordinal)
+                self._days_before[offset + 1] += 1
+
+    def _is_session_ordinal(self, ordinal: int) -> bool:
+        day = date.fromordinal(ordinal)
+        return day.weekday() < 5 and day not in self.holidays
+
+    def _check_listed(self, day: date) -> None:
+        if day > self.holidays_until and day.year not in _unlisted_years_logged:
+            _unlisted_years_logged.add(day.year)
+            logger.warning(
+                "No public holidays are listed for %d (bundled data ends %s); session dates "
+                "that year only skip weekends and custom closed days. Update %s.",
+                day.year, self.holidays_until, BUNDLED_HOLIDAYS_PATH
+            )
+
+    def _offset(self, day: date) -> Optional[int]:
+        if self.first_day <= day <= self.last_day:
+            return day.toordinal() - self.first_day.toordinal()
+        return None
+
+    @property
+    def session_day_count(self) -> int:
+        return len(self._session_ordinals)
+
+    def holiday_dates(self) -> List[date]:
+        return list(self.holidays)
+
+    def holidays_between(self, start_date: date, end_date: date) -> Dict[date, str]:
+        return {day: name for day, name in self.holidays.items() if start_date <= day <= end_date}
+
+    def is_session_day(self, day: date) -> bool:
+        return self._is_session_ordinal(day.toordinal())
+
+    def session_days_between(self, start_date: date, end_date: date) -> int:
+        """Number of session days in [start_date, end_date]"""
+        if start_date > end_date:
+            return 0
+        self._check_listed(end_date)
+
+        start_offset = self._offset(start_date)
+        end_offset = self._offset(end_date)
+        if start_offset is None or end_offset is None:
+            return count_session_days(start_date, end_date, holidays=self.holiday_dates())
+
+        return self._days_before[end_offset + 1] - self._days_before[start_offset]
+
+    def add_session_days(self, start_date: date, total_sessions: int) -> date:
+        """Date of the last of ``total_sessions`` session days starting on start_date"""
+        if total_sessions <= 0:
+            return start_date
+
+        end_date = None
+        start_offset = self._offset(start_date)
+        if start_offset is not None:
+            index = self._days_before[start_offset] + total_sessions - 1
+            if index < len(self._session_ordinals):
+                end_date = date.fromordinal(self._session_ordinals[index])
+
+        if end_date is None:
+            end_date = calculate_session_end_date(
+                start_date=start_date,
+                total_sessions=total_sessions,
+                exclude_weekends=True,
+                holidays=self.holiday_dates()
+            )
+        self._check_listed(end_date)
+        return end_date
+
+def load_holiday_calendar(db: Session) -> HolidayCalendar:
+    """Build a calendar from the bundled holidays and the holidays table"""
+    holidays = load_bundled_holidays()
+    holidays_until = date(max(day.year for day in holidays), 12, 31) if holidays else None
+    custom_dates = []
+    for holiday in db.query(Holiday).all():
+        holidays[holiday.date] = holiday.name
+        custom_dates.append(holiday.date)
+
+    years = {day.year for day in holidays} | {date.today().year}
+    return HolidayCalendar(holidays, min(years), max(years) + EXTRA_YEARS, custom_dates, holidays_until)
+
+# Years past the bundled data already warned about, so the log is not flooded
+_unlisted_years_logged: Set[int] = set()
+
+_calendar: Optional[HolidayCalendar] = None
+# holidays table version and monotonic time the calendar was built at
+_calendar_version: Optional[Tuple[int, ...]] = None
+_calendar_built_at = 0.0
+_calendar_lock = threading.Lock()
+
+def _is_current() -> bool:
+    return (
+        _calendar is not None
+        and _calendar_version == table_versions.get(("holidays",))
+        and monotonic() - _calendar_built_at < HOLIDAY_CALENDAR_MAX_AGE
+    )
+
+def get_holiday_calendar(db: Session) -> HolidayCalendar:
+    """
+    Process-wide holiday calendar, loaded on first use.
+
+    It is rebuilt once the holidays table was written through this process
+    or the calendar is older than HOLIDAY_CALENDAR_MAX_AGE seconds.
+    """
+    if not _is_current():
+        with _calendar_lock:
+            if not _is_current():
+                return reload_holiday_calendar(db)
+    return _calendar
+
+def reload_holiday_calendar(db: Session) -> HolidayCalendar:
+    """Rebuild the process-wide calendar, e.g. after the holidays table changed"""
+    global _calendar, _calendar_version, _calendar_built_at
+    version = table_versions.get(("holidays",))
+    built_at = monotonic()
+    calendar = load_holiday_calendar(db)
+    _calendar, _calendar_version, _calendar_built_at = calendar, version, built_at
+    return calendar
@@ -0,0 +1,272 @@
+"""
+Idempotency-Key support for write requests.
+
+A POST, PUT, PATCH or DELETE sent with an ``Idempotency-Key`` header runs
+once; repeating it with the same key and the same request returns the
+stored response, marked with ``Idempotent-Replayed: true``, without running
+the handler again. Tablets on flaky networks can therefore retry a roll
+call, a payment or a session completion without creating duplicates.
+
+Responses are kept in the idempotency_keys table of the application
+database, so every worker sees them:
+
+* only successful (2xx) responses are stored; an error leaves nothing
+  behind, so a retry runs the request again
+* a retry that arrives while the first request is still running waits for
+  it in the same process, and gets 409 with Retry-After from another worker
+* reusing a key for a different request is rejected with 422
+* entries expire after IDEMPOTENCY_TTL_SECONDS and the table is trimmed to
+  the newest IDEMPOTENCY_MAX_ENTRIES rows
+
+The stored response is written after the handler's own transaction, so a
+crash between the two lets a retry run again.
+"""
+import asyncio
+import hashlib
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+from ..database.connection import AsyncSessionLocal
+from ..models.idempotency_key import IdempotencyKey
+from .fast_json import dumps
+
+IDEMPOTENCY_ENABLED = os.getenv("IDEMPOTENCY_ENABLED", "true").lower() in ("1", "true", "yes")
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+IDEMPOTENCY_MAX_ENTRIES = int(os.getenv("IDEMPOTENCY_MAX_ENTRIES", "10000"))
+# Larger responses are returned normally but not stored
+IDEMPOTENCY_MAX_BODY_BYTES = int(os.getenv("IDEMPOTENCY_MAX_BODY_BYTES", str(1024 * 1024)))
+# A key claimed by a request that never finished (e.g. a killed worker) is
+# released after this long
+IDEMPOTENCY_LOCK_SECONDS = 60
+# Expired and surplus rows are removed after every this many stored responses
+IDEMPOTENCY_EVICT_EVERY = 100
+MAX_KEY_LENGTH = 255
+
+IDEMPOTENT_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+KEY_HEADER = b"idempotency-key"
+REPLAYED_HEADER = b"idempotent-replayed"
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+class IdempotencyStore:
+    """Claims, stored responses and eviction in the idempotency_keys table"""
+
+    def __init__(
+        self,
+        ttl_seconds: int = IDEMPOTENCY_TTL_SECONDS,
+        max_entries: int = IDEMPOTENCY_MAX_ENTRIES
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.stored = 0
+        self.replayed = 0
+
+    async def get(self, key: str) -> Optional[IdempotencyKey]:
+        """Live entry for ``key``; an expired one is deleted"""
+        async with AsyncSessionLocal() as db:
+            record = (await db.scalars(select(IdempotencyKey).where(IdempotencyKey.key == key))).first()
+            if record is not None and record.expires_at.replace(tzinfo=timezone.utc) <= _now():
+                await db.execute(delete(IdempotencyKey).where(IdempotencyKey.id == record.id))
+                await db.commit()
+                return None
+            return record
+
+    async def claim(self, key: str, fingerprint: str) -> Optional[int]:
+        """
+        Mark ``key`` as in progress and return the id of the claim row, or
+        None if another request holds it.
+
+        A claim that outlived IDEMPOTENCY_LOCK_SECONDS can be taken over by
+        a later request, so the claim is completed or released by its id,
+        not by the key alone.
+        """
+        async with AsyncSessionLocal() as db:
+            try:
+                result = await db.execute(insert(IdempotencyKey).values(
+                    key=key,
+                    fingerprint=fingerprint,
+                    expires_at=_now() + timedelta(seconds=IDEMPOTENCY_LOCK_SECONDS)
+                ))
+                await db.commit()
+                return result.inserted_primary_key[0]
+            except IntegrityError:
+                await db.rollback()
+                return None
+
+    async def complete(self, key: str, claim_id: int, status_code: int, headers: List[Tuple[str, str]], body: bytes) -> None:
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(IdempotencyKey).where(IdempotencyKey.key == key, IdempotencyKey.id == claim_id).values(
+                    status_code=status_code,
+                    headers=headers,
+                    body=body,
+                    expires_at=_now() + timedelta(seconds=self.ttl_seconds)
+                )
+            )
+            await db.commit()
+        self.stored += 1
+        if self.stored % IDEMPOTENCY_EVICT_EVERY == 0:
+            await self.evict()
+
+    async def release(self, key: str, claim_id: int) -> None:
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(IdempotencyKey).where(IdempotencyKey.key == key, IdempotencyKey.id == claim_id))
+            await db.commit()
+
+    async def evict(self) -> int:
+        """Delete expired entries and all but the newest ``max_entries``"""
+        async with AsyncSessionLocal() as db:
+            expired = await db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= _now()))
+            newest_dropped = select(IdempotencyKey.id).order_by(IdempotencyKey.id.desc()).offset(
+                self.max_entries
+            ).limit(1).scalar_subquery()
+            surplus = await db.execute(delete(IdempotencyKey).where(IdempotencyKey.id <= newest_dropped))
+            await db.commit()
+        return expired.rowcount + surplus.rowcount
+
+idempotency_store = IdempotencyStore()
+
+def request_fingerprint(scope, body: bytes) -> str:
+    digest = hashlib.sha256()
+    for part in (scope["method"].encode(), scope["path"].encode(), scope.get("query_string", b""), body):
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+    return digest.hexdigest()
+
+async def _send_json(send, status_code: int, detail: str, headers: List[Tuple[bytes, bytes]] = ()) -> None:
+    body = dumps({"detail": detail})
+    await send({
+        "type": "http.response.start",
+        "status": status_code,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            *headers
+        ]
+    })
+    await send({"type": "http.response.body", "body": body})
+
+class IdempotencyMiddleware:
+    """Run keyed write requests once and replay their stored responses"""
+
+    def __init__(self, app, store: IdempotencyStore = idempotency_store):
+        self.app = app
+        self.store = store
+        # Keys being handled by this process; same-key retries wait on them
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in IDEMPOTENT_METHODS or not IDEMPOTENCY_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        key = dict(scope["headers"]).get(KEY_HEADER)
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+
+        key = key.decode("latin-1").strip()
+        if not key or len(key) > MAX_KEY_LENGTH:
+            await _send_json(send, 400, f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters")
+            return
+
+        body = await self._read_body(receive)
+        fingerprint = request_fingerprint(scope, body)
+
+        while True:
+            pending = self._inflight.get(key)
+            if pending is not None:
+                await asyncio.shield(pending)
+                continue
+            record = await self.store.get(key)
+            if record is not None and record.fingerprint != fingerprint:
+                await _send_json(send, 422, "Idempotency-Key was already used for a different request")
+                return
+            if record is not None and record.status_code is not None:
+                await self._replay(record, send)
+                return
+            if record is not None:
+                await _send_json(
+                    send, 409, "A request with this Idempotency-Key is still being processed",
+                    [(b"retry-after", b"1")]
+                )
+                return
+            if self._inflight.get(key) is None:
+                claim_id = await self.store.claim(key, fingerprint)
+                if claim_id is not None:
+                    break
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            await self._run_and_store(scope, body, send, key, claim_id)
+        finally:
+            del self._inflight[key]
+            future.set_result(None)
+
+    async def _read_body(self, receive) -> bytes:
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                break
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        return b"".join(chunks)
+
+    async def _run_and_store(self, scope, body: bytes, send, key: str, claim_id: int) -> None:
+        body_sent = False
+
+        async def replay_receive():
+            nonlocal body_sent
+            if body_sent:
+                # The app only reads past the body to wait for a disconnect
+                await asyncio.Event().wait()
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        status_code: Optional[int] = None
+        headers: List[Tuple[str, str]] = []
+        chunks: List[bytes] = []
+        size = 0
+
+        async def capturing_send(message):
+            nonlocal status_code, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers.extend(
+                    (name.decode("latin-1"), value.decode("latin-1")) for name, value in message.get("headers", [])
+                )
+            elif message["type"] == "http.response.body":
+                chunk = message.get("body", b"")
+                size += len(chunk)
+                if size <= IDEMPOTENCY_MAX_BODY_BYTES:
+                    chunks.append(chunk)
+            await send(message)
+
+        stored = False
+        try:
+            await self.app(scope, replay_receive, capturing_send)
+            if status_code is not None and 200 <= status_code < 300 and size <= IDEMPOTENCY_MAX_BODY_BYTES:
+                await self.store.complete(key, claim_id, status_code, headers, b"".join(chunks))
+                stored = True
+        finally:
+            if not stored:
+                await self.store.release(key, claim_id)
+
+    async def _replay(self, record: IdempotencyKey, send) -> None:
+        self.store.replayed += 1
+        await send({
+            "type": "http.response.start",
+            "status": record.status_code,
+            "headers": [
+                *((name.encode("latin-1"), value.encode("latin-1")) for name, value in record.headers or []),
+                (REPLAYED_HEADER, b"true")
+            ]
+        })
+        await send({"type": "http.response.body", "body": record.body or b""})
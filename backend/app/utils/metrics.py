@@ -0,0 +1,231 @@
+"""
+Prometheus metrics in the text exposition format, without a client library.
+
+Counters and histograms are updated in process; values that already exist
+elsewhere (pool usage, cache counters, business gauges) are read by
+collectors when /metrics is scraped. The output is plain text, so a local
+Prometheus can scrape it and ``curl localhost:8000/metrics`` reads it.
+Values are per process.
+"""
+import inspect
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Awaitable, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .query_stats import current_query_stats
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+METRICS_PREFIX = "study_room_"
+# Prometheus' default latency buckets, in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+
+Labels = Tuple[str, ...]
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = METRICS_PREFIX + name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def samples(self) -> Iterator[Tuple[str, Sequence[str], Sequence[str], float]]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for name, labelnames, labels, value in self.samples():
+            lines.append(f"{name}{_format_labels(labelnames, labels)} {_format_value(value)}")
+        return lines
+
+class Counter(Metric):
+    """Monotonic total per label set"""
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.values: Dict[Labels, float] = defaultdict(float)
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self.values[labels] += amount
+
+    def set(self, value: float, *labels: str) -> None:
+        """Export a total that is counted elsewhere, from a collector"""
+        self.values[labels] = value
+
+    def samples(self):
+        for labels, value in sorted(self.values.items()):
+            yield self.name, self.labelnames, labels, value
+
+class Gauge(Metric):
+    """Current value per label set; collectors set them at scrape time"""
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.values: Dict[Labels, float] = {}
+
+    def set(self, value: float, *labels: str) -> None:
+        self.values[labels] = value
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def samples(self):
+        for labels, value in sorted(self.values.items()):
+            yield self.name, self.labelnames, labels, value
+
+class Histogram(Metric):
+    """Cumulative bucket counts, sum and count per label set"""
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # Per label set: count in each bucket (not cumulative), sum
+        self.values: Dict[Labels, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        counts, total = self.values.setdefault(labels, ([0] * len(self.buckets), [0.0]))
+        counts[bisect_left(self.buckets, value)] += 1
+        total[0] += value
+
+    def samples(self):
+        bucket_labelnames = self.labelnames + ("le",)
+        for labels, (counts, total) in sorted(self.values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                yield f"{self.name}_bucket", bucket_labelnames, labels + (_format_value(bound),), cumulative
+            yield f"{self.name}_sum", self.labelnames, labels, total[0]
+            yield f"{self.name}_count", self.labelnames, labels, cumulative
+
+Collector = Callable[[], Union[None, Awaitable[None]]]
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics: Dict[str, Metric] = {}
+        self.collectors: List[Collector] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def collector(self, func: Collector) -> Collector:
+        """Register a function (sync or async) that sets gauges before each scrape"""
+        self.collectors.append(func)
+        return func
+
+    async def render(self) -> str:
+        for collect in self.collectors:
+            result = collect()
+            if inspect.isawaitable(result):
+                await result
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+metrics = MetricsRegistry()
+
+http_requests = metrics.counter(
+    "http_requests_total", "HTTP requests by route and status code", ("method", "route", "status")
+)
+http_request_duration = metrics.histogram(
+    "http_request_duration_seconds",
+    "Time until the response headers were sent, by route",
+    ("method", "route")
+)
+http_requests_in_flight = metrics.gauge(
+    "http_requests_in_flight", "HTTP requests being handled, including open streams"
+)
+http_request_db_seconds = metrics.counter(
+    "http_request_db_seconds_total", "Time spent running SQL statements, by route", ("method", "route")
+)
+http_request_db_queries = metrics.counter(
+    "http_request_db_queries_total", "SQL statements run, by route", ("method", "route")
+)
+
+def _route(scope) -> str:
+    # Route templates keep the label set bounded; unknown paths share one label
+    route = scope.get("route")
+    return getattr(route, "path", "unmatched")
+
+class MetricsMiddleware:
+    """
+    Count requests and record their latency and database time per route.
+
+    Latency is measured until the response headers go out: the full handler
+    time for ordinary responses, time to first byte for streams. Database
+    time comes from the QueryStats of QueryStatsMiddleware, which must wrap
+    this middleware.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status: Optional[int] = None
+
+        async def send_with_metrics(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                http_request_duration.observe(time.perf_counter() - started, scope["method"], _route(scope))
+            await send(message)
+
+        http_requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            http_requests_in_flight.dec()
+            method, route = scope["method"], _route(scope)
+            # An exception before the headers ends as a 500 from the error middleware
+            http_requests.inc(method, route, str(status or 500))
+            stats = current_query_stats()
+            if stats is not None:
+                http_request_db_seconds.inc(method, route, amount=stats.duration)
+                http_request_db_queries.inc(method, route, amount=stats.count)
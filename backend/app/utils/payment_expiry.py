@@ -0,0 +1,121 @@
+"""
+Deactivating expired payments and the snapshot of payments about to expire.
+
+A payment package ends either when its sessions are used up or when its end
+date passes. The first is handled when a session is completed; the second
+by expire_payments(), which the scheduler runs once a day and which is also
+available as ``python -m app.cli expire-payments``.
+
+The expiring list changes only when payments or students are written or the
+date rolls over, so it is loaded once for the longest window the API serves
+and every /payments/expiring request filters that snapshot in memory. Writes
+this process does not see (other workers, the CLI, direct edits) show up once
+the snapshot is older than EXPIRING_SNAPSHOT_MAX_AGE.
+"""
+import asyncio
+import os
+from datetime import date, time
+from time import monotonic
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, select, update
+from sqlalchemy.orm import Session
+
+from ..models.payment import Payment
+from .table_versions import TableVersions, table_versions
+
+# Daily sweep of expired payments, run by the API at this local time
+PAYMENT_SWEEP_ENABLED = os.getenv("PAYMENT_SWEEP_ENABLED", "true").lower() in ("1", "true", "yes")
+PAYMENT_SWEEP_TIME = time.fromisoformat(os.getenv("PAYMENT_SWEEP_TIME", "00:05"))
+PAYMENT_SWEEP_BATCH_SIZE = int(os.getenv("PAYMENT_SWEEP_BATCH_SIZE", "500"))
+# Longest window /payments/expiring accepts
+EXPIRING_SNAPSHOT_DAYS = 30
+# Seconds before the snapshot is reloaded even without a write seen here
+EXPIRING_SNAPSHOT_MAX_AGE = float(os.getenv("EXPIRING_SNAPSHOT_MAX_AGE", "60"))
+
+def expire_payments(db: Session, today: Optional[date] = None, batch_size: int = PAYMENT_SWEEP_BATCH_SIZE) -> int:
+    """
+    Deactivate active payments whose end date is before ``today``.
+
+    Works in batches of ``batch_size`` rows, committing after each, so a
+    large backlog never holds the write lock for long. Returns the number of
+    payments deactivated.
+    """
+    today = today or date.today()
+    expired = 0
+    while True:
+        batch = select(Payment.id).where(
+            and_(
+                Payment.is_active == True,
+                Payment.end_date < today
+            )
+        ).limit(batch_size)
+        result = db.execute(
+            update(Payment)
+            .where(Payment.id.in_(batch))
+            .values(is_active=False)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        expired += result.rowcount
+        if result.rowcount < batch_size:
+            return expired
+
+class ExpiringSnapshot:
+    """
+    Expiring payments for the next EXPIRING_SNAPSHOT_DAYS days, loaded once.
+
+    The snapshot is reloaded on first use after the date changes, any of
+    ``tables`` is bumped or it is older than ``max_age`` seconds; concurrent
+    readers of a stale snapshot share one load.
+    """
+
+    def __init__(
+        self,
+        load: Callable[[date, int], Awaitable[List[Dict[str, Any]]]],
+        tables: Tuple[str, ...] = ("students", "payments"),
+        versions: TableVersions = table_versions,
+        max_age: float = EXPIRING_SNAPSHOT_MAX_AGE
+    ):
+        self.load = load
+        self.tables = tables
+        self.versions = versions
+        self.max_age = max_age
+        self.loads = 0
+        self._key: Optional[Tuple] = None
+        self._loaded_at = 0.0
+        self._items: List[Dict[str, Any]] = []
+        self._lock = asyncio.Lock()
+
+    def _current_key(self) -> Tuple:
+        return (date.today(), self.versions.get(self.tables))
+
+    def _is_current(self) -> bool:
+        return self._key == self._current_key() and monotonic() - self._loaded_at < self.max_age
+
+    async def get(self) -> List[Dict[str, Any]]:
+        if self._is_current():
+            return self._items
+        async with self._lock:
+            if not self._is_current():
+                await self._load()
+        return self._items
+
+    async def refresh(self) -> None:
+        """Load the snapshot now, e.g. right after the daily sweep"""
+        async with self._lock:
+            await self._load()
+
+    async def _load(self) -> None:
+        key = self._current_key()
+        loaded_at = monotonic()
+        self._items = await self.load(key[0], EXPIRING_SNAPSHOT_DAYS)
+        self._loaded_at = loaded_at
+        self.loads += 1
+        # A write during the load leaves the snapshot stale, so the next
+        # reader loads it again
+        self._key = key
+
+    async def within(self, days: int) -> List[Dict[str, Any]]:
+        """Payments ending within ``days`` days, soonest first"""
+        return [item for item in await self.get() if item['days_until_expiry'] <= days]
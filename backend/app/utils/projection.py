@@ -0,0 +1,28 @@
+from typing import List, Optional, Sequence
+
+from fastapi import HTTPException, status
+
+FIELDS_DESCRIPTION = "Comma-separated fields to return for each item; all fields when omitted"
+
+def parse_fields(fields: Optional[str], allowed: Sequence[str]) -> List[str]:
+    """
+    Resolve a ``fields=`` parameter to the requested subset of ``allowed``.
+
+    Fields keep the order of ``allowed`` (the response model's), whatever
+    order they were requested in. Raises 400 for an unknown or empty list.
+    """
+    if fields is None:
+        return list(allowed)
+    
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested.difference(allowed)
+    if unknown or not requested:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}" if unknown else "No fields requested"
+        )
+    return [name for name in allowed if name in requested]
+
+def with_fields(fields: Sequence[str], *required: str) -> List[str]:
+    """``fields`` plus the ``required`` ones a handler needs but was not asked for"""
+    return [*fields, *(name for name in required if name not in fields)]
@@ -0,0 +1,167 @@
+"""
+Per-request SQL statement counts and database time.
+
+Engines are instrumented with SQLAlchemy's cursor events; each statement's
+duration is added to the request it ran for, found through a context
+variable that QueryStatsMiddleware sets around every HTTP request. The
+middleware reports the totals in a ``Server-Timing`` header, which browser
+devtools show next to the request:
+
+    Server-Timing: db;dur=4.21;desc="7 queries", app;dur=9.80
+
+Statements slower than QUERY_SLOW_MS are logged with their endpoint, and so
+are requests that run more than QUERY_COUNT_WARN statements, which is how
+N+1 patterns show up. query_budget() asserts a statement budget in tests and
+scripts.
+"""
+import logging
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+QUERY_STATS_ENABLED = os.getenv("QUERY_STATS_ENABLED", "true").lower() in ("1", "true", "yes")
+# Log single statements slower than this many milliseconds (0 turns it off)
+QUERY_SLOW_MS = float(os.getenv("QUERY_SLOW_MS", "100"))
+# Log requests that run more statements than this (0 turns it off)
+QUERY_COUNT_WARN = int(os.getenv("QUERY_COUNT_WARN", "50"))
+# Longest statement text written to the log
+QUERY_LOG_MAX_CHARS = 500
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class QueryStats:
+    """Statements run and time spent in the database for one request or block"""
+    count: int = 0
+    duration: float = 0.0
+    statements: Optional[List[str]] = None
+    scope: Optional[dict] = field(default=None, repr=False)
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.duration += elapsed
+        if self.statements is not None:
+            self.statements.append(statement)
+
+    @property
+    def duration_ms(self) -> float:
+        return self.duration * 1000
+
+    @property
+    def endpoint(self) -> str:
+        # The router stores the matched route in the scope, so once routing
+        # is done this is its path template, e.g. /api/v1/students/{student_id}
+        if self.scope is None:
+            return "-"
+        route = self.scope.get("route")
+        return f"{self.scope['method']} {getattr(route, 'path', self.scope['path'])}"
+
+_request_stats: ContextVar[Optional[QueryStats]] = ContextVar("request_query_stats", default=None)
+# Open query_budget() blocks; they count statements from any task or thread
+_budgets: List[QueryStats] = []
+
+def current_query_stats() -> Optional[QueryStats]:
+    """Totals for the request being handled, or None outside a request"""
+    return _request_stats.get()
+
+def _short(statement: str) -> str:
+    statement = " ".join(statement.split())
+    if len(statement) > QUERY_LOG_MAX_CHARS:
+        return statement[:QUERY_LOG_MAX_CHARS] + "..."
+    return statement
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+    for budget in _budgets:
+        budget.record(statement, elapsed)
+    if QUERY_SLOW_MS and elapsed * 1000 >= QUERY_SLOW_MS:
+        logger.warning(
+            "Slow query (%.1f ms) in %s: %s",
+            elapsed * 1000, stats.endpoint if stats else "-", _short(statement)
+        )
+
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_started"):
+        connection.info["query_started"].pop()
+
+def instrument_engine(engine: Engine) -> Engine:
+    """Attribute the engine's statements to requests; pass an AsyncEngine's sync_engine"""
+    if QUERY_STATS_ENABLED and not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+    return engine
+
+class QueryStatsMiddleware:
+    """Collect QueryStats for each HTTP request and add a Server-Timing header"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not QUERY_STATS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(scope=scope)
+        token = _request_stats.set(stats)
+        started = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                # Streaming responses report what ran before their headers
+                server_timing = (
+                    f'db;dur={stats.duration_ms:.2f};desc="{stats.count} queries", '
+                    f"app;dur={(time.perf_counter() - started) * 1000:.2f}"
+                )
+                message["headers"] = [*message.get("headers", []), (b"server-timing", server_timing.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_stats.reset(token)
+            if QUERY_COUNT_WARN and stats.count > QUERY_COUNT_WARN:
+                logger.warning(
+                    "%s ran %d queries (%.1f ms in the database)",
+                    stats.endpoint, stats.count, stats.duration_ms
+                )
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+@contextmanager
+def query_budget(max_queries: int) -> Iterator[QueryStats]:
+    """
+    Fail when the block runs more than ``max_queries`` statements.
+
+    Counts every statement on the instrumented engines while the block runs,
+    whichever thread or task issues it, so it works with TestClient and the
+    httpx ASGI transport alike:
+
+        with query_budget(3):
+            client.get("/api/v1/students/")
+    """
+    budget = QueryStats(statements=[])
+    _budgets.append(budget)
+    try:
+        yield budget
+    finally:
+        _budgets.remove(budget)
+    if budget.count > max_queries:
+        statements = "\n".join(f"  {_short(statement)}" for statement in budget.statements)
+        raise QueryBudgetExceeded(f"{budget.count} queries, budget {max_queries}:\n{statements}")
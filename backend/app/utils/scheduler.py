@@ -0,0 +1,81 @@
+"""
+Daily jobs run inside the API process.
+
+Jobs are registered at import time and started from the app's lifespan.
+Each runs once shortly after startup, to catch up on days the server was
+down, and then every day at its time of day (server local time). A failing
+run is logged and retried the next day. With several workers every worker
+runs the jobs, so they must be safe to repeat.
+"""
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, time, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class DailyJob:
+    name: str
+    func: Callable[[], Awaitable[None]]
+    at: time
+    runs: int = 0
+    failures: int = 0
+    last_run: Optional[datetime] = None
+    task: Optional[asyncio.Task] = field(default=None, repr=False)
+
+    def next_run(self, now: datetime) -> datetime:
+        run = datetime.combine(now.date(), self.at)
+        return run if run > now else run + timedelta(days=1)
+
+    async def run(self) -> None:
+        self.last_run = datetime.now()
+        try:
+            await self.func()
+            self.runs += 1
+        except Exception:
+            self.failures += 1
+            logger.exception("Scheduled job %s failed", self.name)
+
+    async def loop(self) -> None:
+        await self.run()
+        while True:
+            now = datetime.now()
+            await asyncio.sleep((self.next_run(now) - now).total_seconds())
+            await self.run()
+
+class Scheduler:
+    def __init__(self):
+        self.jobs: Dict[str, DailyJob] = {}
+
+    def daily(self, name: str, at: time, func: Callable[[], Awaitable[None]]) -> DailyJob:
+        job = DailyJob(name=name, func=func, at=at)
+        self.jobs[name] = job
+        return job
+
+    def start(self) -> None:
+        for job in self.jobs.values():
+            if job.task is None:
+                job.task = asyncio.create_task(job.loop(), name=f"scheduler:{job.name}")
+
+    async def stop(self) -> None:
+        tasks: List[asyncio.Task] = [job.task for job in self.jobs.values() if job.task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for job in self.jobs.values():
+            job.task = None
+
+    def stats(self) -> dict:
+        return {
+            name: {
+                "at": job.at.strftime("%H:%M"),
+                "runs": job.runs,
+                "failures": job.failures,
+                "last_run": job.last_run.isoformat() if job.last_run else None
+            }
+            for name, job in self.jobs.items()
+        }
+
+scheduler = Scheduler()
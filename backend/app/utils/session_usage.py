@@ -0,0 +1,73 @@
+"""
+Completing payment sessions, and linking each to the attendance that used it.
+
+Sessions are counted in SQL with one conditional UPDATE per request, however
+many payments it touches, and the links are written with one INSERT. Each
+attendance consumes at most one session (the session_usages.attendance_id
+index is unique), so repeating a roll call never counts a session twice.
+"""
+from typing import Dict, Iterable, List
+
+from sqlalchemy import case, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.payment import Payment
+from ..models.session_usage import SessionUsage
+
+# Attendance statuses that use up a session; absences do not
+SESSION_CONSUMING_STATUSES = ("present", "late", "early_leave")
+
+def complete_sessions_statement(*conditions):
+    """
+    Complete one session of every payment matching ``conditions``, atomically.
+
+    The increment happens in SQL and only for active payments with sessions
+    left, so concurrent completions can neither lose an update nor go past
+    sessions_total. A payment whose last session this was is deactivated in
+    the same statement. Returns the updated payments.
+    """
+    sessions_completed = Payment.sessions_completed + 1
+    return (
+        update(Payment)
+        .where(
+            Payment.is_active == True,
+            Payment.sessions_completed < Payment.sessions_total,
+            *conditions
+        )
+        .values(
+            sessions_completed=sessions_completed,
+            is_active=case((sessions_completed >= Payment.sessions_total, False), else_=Payment.is_active)
+        )
+        .returning(Payment)
+        .execution_options(populate_existing=True)
+    )
+
+def next_payment_per_student(student_ids: Iterable[int]):
+    """Ids of each student's oldest active payment with sessions left"""
+    return select(func.min(Payment.id)).where(
+        Payment.is_active == True,
+        Payment.sessions_completed < Payment.sessions_total,
+        Payment.student_id.in_(list(student_ids))
+    ).group_by(Payment.student_id)
+
+async def consume_sessions(db: AsyncSession, attendance_ids: Dict[int, int]) -> List[Payment]:
+    """
+    Complete a session for each student's attendance and record the usage.
+
+    ``attendance_ids`` maps student ids to the attendance consuming the
+    session; each student's oldest running payment is used. Runs in the
+    caller's transaction and returns the updated payments; students missing
+    from the result had no active payment with sessions left.
+    """
+    if not attendance_ids:
+        return []
+
+    payments = (await db.scalars(
+        complete_sessions_statement(Payment.id.in_(next_payment_per_student(attendance_ids)))
+    )).all()
+    if payments:
+        await db.execute(insert(SessionUsage), [
+            {'payment_id': payment.id, 'attendance_id': attendance_ids[payment.student_id]}
+            for payment in payments
+        ])
+    return payments
@@ -0,0 +1,32 @@
+from contextlib import aclosing
+from typing import AsyncGenerator, AsyncIterator
+
+from fastapi.responses import StreamingResponse
+
+SSE_MEDIA_TYPE = "text/event-stream"
+
+# How long EventSource waits before reconnecting after the stream drops
+SSE_RETRY_MS = 3000
+
+def sse_event(event: str, data: bytes) -> bytes:
+    """Encode one server-sent event; ``data`` must be a single line, e.g. compact JSON"""
+    return b"event: " + event.encode() + b"\ndata: " + data + b"\n\n"
+
+def sse_comment(text: str) -> bytes:
+    """Comment line, ignored by clients; keeps idle connections from timing out"""
+    return b": " + text.encode() + b"\n\n"
+
+def sse_response(stream: AsyncGenerator[bytes, None]) -> StreamingResponse:
+    async def with_retry() -> AsyncIterator[bytes]:
+        yield f"retry: {SSE_RETRY_MS}\n\n".encode()
+        # Close the stream as soon as the client goes away so it can clean up
+        async with aclosing(stream):
+            async for chunk in stream:
+                yield chunk
+
+    return StreamingResponse(
+        with_retry(),
+        media_type=SSE_MEDIA_TYPE,
+        # Stop proxies such as nginx from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,83 @@
+from typing import List, Tuple
+
+from sqlalchemy import Select, case, func, literal_column, or_
+
+from ..database.search import POSTGRES_SEARCH_DOCUMENT, SEARCH_COLUMNS, students_fts
+from ..models.student import Student
+
+# Shortest fragment the trigram index can look up. Shorter terms (the first
+# keystrokes, a family or given name) are matched anywhere in the name with
+# ILIKE; the students table is small enough to scan. Matches at the start of
+# the full name or of the given name are listed first.
+MIN_TRIGRAM_LENGTH = 3
+
+# bm25 weights in SEARCH_COLUMNS order, so a hit in the name ranks first
+BM25_WEIGHTS = (10.0, 2.0, 4.0, 4.0, 1.0)
+
+# Above this many matches (e.g. "010", which every phone number contains)
+# ranking costs tens of milliseconds and tells nothing apart, so results
+# fall back to the plain listing order
+MAX_RANKED_MATCHES = 1000
+
+def search_terms(search: str) -> List[str]:
+    return search.split()
+
+def build_match_query(terms: List[str]) -> str:
+    """FTS5 query requiring every term as a literal substring"""
+    return " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+def _escape_like(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+# The name without its one-syllable family name
+given_name = func.substr(Student.name, 2)
+
+def apply_student_search(query: Select, search: str, dialect_name: str) -> Tuple[Select, list]:
+    """
+    Restrict a select of students to those matching every term of ``search``.
+
+    Returns the filtered query and the ORDER BY clauses that put the best
+    matches first. Terms of three or more characters match anywhere in the
+    name, grade, phone numbers or memo; shorter terms match anywhere in the
+    name, with names starting with the term or whose given name does ("길동"
+    for "홍길동") first.
+    """
+    terms = search_terms(search)
+
+    if dialect_name == "postgresql":
+        # pg_trgm serves terms of any length, though short ones less selectively
+        document = literal_column(POSTGRES_SEARCH_DOCUMENT)
+        for term in terms:
+            query = query.where(document.ilike(f"%{_escape_like(term)}%", escape="\\"))
+        return query, [func.word_similarity(" ".join(terms), document).desc()] if terms else []
+
+    long_terms = [term for term in terms if len(term) >= MIN_TRIGRAM_LENGTH]
+    short_terms = [term for term in terms if len(term) < MIN_TRIGRAM_LENGTH]
+
+    for term in short_terms:
+        query = query.where(Student.name.ilike(f"%{_escape_like(term)}%", escape="\\"))
+    prefix_first = [
+        case((or_(
+            Student.name.startswith(term, autoescape=True),
+            given_name.startswith(term, autoescape=True)
+        ), 0), else_=1)
+        for term in short_terms
+    ]
+
+    if not long_terms:
+        return query, [*prefix_first, Student.name] if short_terms else []
+
+    if dialect_name == "sqlite":
+        fts = literal_column("students_fts")
+        query = query.join(students_fts, students_fts.c.rowid == Student.id).where(
+            fts.op("MATCH")(build_match_query(long_terms))
+        )
+        return query, [*prefix_first, func.bm25(fts, *BM25_WEIGHTS)]
+
+    # No search index for other databases: scan the same columns
+    for term in long_terms:
+        pattern = f"%{_escape_like(term)}%"
+        query = query.where(or_(*(
+            getattr(Student, name).ilike(pattern, escape="\\") for name in SEARCH_COLUMNS
+        )))
+    return query, prefix_first
@@ -0,0 +1,38 @@
+"""
+Change versions for the tables the API writes.
+
+Every router that commits a change to a table bumps its version, and the
+response cache drops entries that read it. The counters live in this
+process, so they only see writes made through this API instance; writes made
+elsewhere show up once the cached entries expire.
+"""
+from typing import Callable, Dict, Iterable, List, Tuple
+
+class TableVersions:
+    """Monotonically increasing version per table name"""
+
+    def __init__(self):
+        self._versions: Dict[str, int] = {}
+        self._listeners: List[Callable[..., None]] = []
+
+    def get(self, tables: Iterable[str]) -> Tuple[int, ...]:
+        return tuple(self._versions.get(table, 0) for table in tables)
+
+    def bump(self, *tables: str) -> None:
+        for table in tables:
+            self._versions[table] = self._versions.get(table, 0) + 1
+        for listener in self._listeners:
+            listener(*tables)
+
+    def subscribe(self, listener: Callable[..., None]) -> None:
+        """Call ``listener(*tables)`` after every bump"""
+        self._listeners.append(listener)
+
+    def snapshot(self) -> Dict[str, int]:
+        return dict(self._versions)
+
+table_versions = TableVersions()
+
+def bump_tables(*tables: str) -> None:
+    """Record a committed write to ``tables``"""
+    table_versions.bump(*tables)
@@ -0,0 +1,5 @@
+"""
+Benchmarks for the study room backend.
+
+Run from the backend directory, e.g. ``python -m bench.sqlite_profile``.
+"""
@@ -0,0 +1,168 @@
+"""
+Synthetic academy data at configurable scale.
+
+Students get Korean names, grades, phone numbers, subjects and a weekly
+schedule, and join and leave at random points of the period. Each student
+attends on their scheduled weekdays, paying for rolling 8-session
+packages; the latest package of an active student is still running. Output
+is reproducible for a given seed and date.
+
+    python -m bench.generate --students 300 --years 2 --database-url sqlite:///./bench.db
+"""
+import argparse
+import json
+import random
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+FAMILY_NAMES = "김이박최정강조윤장임한오서신권황안송류홍"
+GIVEN_SYLLABLES = "민서지현준우예윤하도수연은성재영진호유태"
+GRADES = ["초4", "초5", "초6", "중1", "중2", "중3", "고1", "고2", "고3"]
+SUBJECTS = ["수학", "영어", "국어", "과학", "사회"]
+WEEKDAYS = ["월", "화", "수", "목", "금", "토"]
+CLASS_TIMES = ["14:00", "15:00", "16:00", "17:00", "18:00", "19:00", "20:00"]
+PAYMENT_METHODS = ["card", "card", "transfer", "cash"]
+STATUS_WEIGHTS = {"present": 85, "late": 7, "absent": 6, "early_leave": 2}
+SESSIONS_PER_PACKAGE = 8
+
+def package_price(grade):
+    return Decimal(280000 if grade.startswith("고") else 240000 if grade.startswith("중") else 200000)
+
+def phone_number(rng):
+    return f"010-{rng.randint(0, 9999):04d}-{rng.randint(0, 9999):04d}"
+
+def make_student(rng, today, days):
+    weekdays = sorted(rng.sample(range(len(WEEKDAYS)), rng.randint(2, 4)))
+    joined = today - timedelta(days=rng.randint(0, days))
+    # A fifth of the students have left by now
+    left = None
+    if rng.random() < 0.2 and (today - joined).days > 30:
+        left = joined + timedelta(days=rng.randint(30, (today - joined).days))
+    return {
+        "name": rng.choice(FAMILY_NAMES) + "".join(rng.choices(GIVEN_SYLLABLES, k=2)),
+        "grade": rng.choice(GRADES),
+        "phone": phone_number(rng),
+        "parent_phone": phone_number(rng),
+        "subjects": rng.sample(SUBJECTS, rng.randint(1, 3)),
+        "schedule": {WEEKDAYS[day]: rng.choice(CLASS_TIMES) for day in weekdays},
+        "is_active": left is None,
+        "memo": rng.choice([None, None, None, "형제 할인", "시험 대비반", "상담 필요"]),
+        "created_at": datetime.combine(joined, time(10, 0)),
+        # Not columns; used to lay out attendance and payments
+        "_weekdays": weekdays,
+        "_until": left or today
+    }
+
+def class_days(rng, student, today):
+    """Scheduled class dates up to yesterday, plus today for half of those due today"""
+    day = student["created_at"].date()
+    until = student["_until"]
+    while day <= until:
+        if day.weekday() in student["_weekdays"] and (day < today or rng.random() < 0.5):
+            yield day
+        day += timedelta(days=1)
+
+def make_attendance(rng, student_id, student, day):
+    status = rng.choices(list(STATUS_WEIGHTS), weights=list(STATUS_WEIGHTS.values()))[0]
+    start = datetime.strptime(student["schedule"][WEEKDAYS[day.weekday()]], "%H:%M")
+    time_in = time_out = None
+    if status != "absent":
+        arrival = start + timedelta(minutes=rng.randint(15, 40) if status == "late" else -rng.randint(0, 10))
+        departure = start + timedelta(minutes=rng.randint(60, 100) if status == "early_leave" else 120)
+        time_in, time_out = arrival.time(), departure.time()
+    return {
+        "student_id": student_id,
+        "date": day,
+        "status": status,
+        "time_in": time_in,
+        "time_out": time_out,
+        "note": "병결" if status == "absent" and rng.random() < 0.3 else None
+    }
+
+def make_payments(rng, student_id, student, attended_days):
+    """Consecutive 8-session packages covering the attended days"""
+    payments = []
+    for first in range(0, len(attended_days), SESSIONS_PER_PACKAGE):
+        sessions = attended_days[first:first + SESSIONS_PER_PACKAGE]
+        # Only an active student's last, partly used package is still running
+        running = student["is_active"] and len(sessions) < SESSIONS_PER_PACKAGE
+        end_date = sessions[-1]
+        if running:
+            remaining = SESSIONS_PER_PACKAGE - len(sessions)
+            end_date += timedelta(days=-(-remaining * 7 // len(student["_weekdays"])))
+        payments.append({
+            "student_id": student_id,
+            "amount": package_price(student["grade"]),
+            "payment_method": rng.choice(PAYMENT_METHODS),
+            "start_date": sessions[0],
+            "end_date": end_date,
+            "sessions_total": SESSIONS_PER_PACKAGE,
+            "sessions_completed": len(sessions),
+            "is_active": running,
+            "created_at": datetime.combine(sessions[0], time(9, 0))
+        })
+    return payments
+
+def generate_academy(engine, students=300, years=2.0, seed=0, today=None, batch_size=10000):
+    """Fill an empty database with a synthetic academy; returns row counts"""
+    from sqlalchemy import select
+    from sqlalchemy.orm import Session
+
+    from app.models import Attendance, Payment, Student
+    from app.utils.attendance_rollup import rebuild_monthly_stats
+
+    rng = random.Random(seed)
+    today = today or date.today()
+    days = int(years * 365)
+    counts = {"students": 0, "attendances": 0, "payments": 0}
+
+    with Session(engine) as session:
+        generated = [make_student(rng, today, days) for _ in range(students)]
+        session.execute(Student.__table__.insert(), [
+            {key: value for key, value in student.items() if not key.startswith("_")} for student in generated
+        ])
+        student_ids = session.scalars(select(Student.id).order_by(Student.id)).all()[-students:]
+        counts["students"] = len(student_ids)
+
+        attendances, payments = [], []
+        for student_id, student in zip(student_ids, generated):
+            rows = [make_attendance(rng, student_id, student, day) for day in class_days(rng, student, today)]
+            attendances.extend(rows)
+            payments.extend(make_payments(rng, student_id, student, [
+                row["date"] for row in rows if row["status"] != "absent"
+            ]))
+            if len(attendances) >= batch_size:
+                session.execute(Attendance.__table__.insert(), attendances)
+                counts["attendances"] += len(attendances)
+                attendances = []
+        if attendances:
+            session.execute(Attendance.__table__.insert(), attendances)
+            counts["attendances"] += len(attendances)
+        for first in range(0, len(payments), batch_size):
+            session.execute(Payment.__table__.insert(), payments[first:first + batch_size])
+        counts["payments"] = len(payments)
+
+        rebuild_monthly_stats(session)
+        session.commit()
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=300)
+    parser.add_argument("--years", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--database-url", required=True)
+    args = parser.parse_args()
+
+    from app.database.base import Base
+    from app.database.connection import create_db_engine
+    from app import models  # noqa: F401 - registers the models on Base.metadata
+
+    engine = create_db_engine(args.database_url)
+    Base.metadata.create_all(bind=engine)
+    counts = generate_academy(engine, args.students, args.years, args.seed)
+    engine.dispose()
+    print(json.dumps(counts))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Cost of turning 500 listing rows into a JSON response body.
+
+Compares the previous path, a Pydantic model built per row and then
+validated and serialized again through response_model, against mapping the
+rows to dicts and rendering them with FastJSONResponse. Both run on the same
+rows from a seeded throwaway database, and the bodies are checked to decode
+to the same JSON. Also times the whole request through the app.
+
+    python -m bench.json_response --rows 500
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+from typing import List
+
+def run_coroutine(coroutine):
+    # serialize_response never suspends for a coroutine endpoint; drive it
+    # directly so an event loop's overhead is not part of the timing
+    try:
+        coroutine.send(None)
+    except StopIteration as stop:
+        return stop.value
+    raise RuntimeError("coroutine suspended")
+
+def time_ms(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return round(statistics.median(timings) * 1000, 3)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    random.seed(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        os.environ["DATABASE_URL"] = database_url
+
+        from bench.load import seed
+        seed(database_url, students=args.rows, days=2)
+
+        import httpx
+        from fastapi.responses import JSONResponse
+        from fastapi.routing import serialize_response
+        from fastapi.utils import create_model_field
+        from sqlalchemy.orm import Session
+
+        from app.api.attendance import ATTENDANCE_LIST_FIELDS, _attendance_records_query
+        from app.api.payments import PAYMENT_ROW_FIELDS, _payments_query
+        from app.database.connection import async_engine, engine
+        from app.main import app
+        from app.schemas.attendance import AttendanceWithStudent
+        from app.schemas.payment import PaymentWithStudent
+        from app.utils.date_calculator import calculate_days_until_expiry, calculate_progress_percentage
+        from app.utils.fast_json import FastJSONResponse, row_dicts
+
+        def payment_fields(row):
+            return {
+                "days_until_expiry": calculate_days_until_expiry(row.end_date),
+                "progress_percentage": calculate_progress_percentage(row.sessions_completed, row.sessions_total)
+            }
+
+        def model_body(schema, rows, extra):
+            # What FastAPI does with a list of models and a response_model
+            models = [schema(**row._mapping, **extra(row)) for row in rows]
+            field = create_model_field(name="Response", type_=List[schema], mode="serialization")
+            content = run_coroutine(serialize_response(field=field, response_content=models, is_coroutine=True))
+            return JSONResponse(content).body
+
+        def fast_body(fields, rows, extra):
+            records = row_dicts(rows, fields)
+            for record, row in zip(records, rows):
+                record.update(extra(row))
+            return FastJSONResponse(records).body
+
+        endpoints = [
+            ("attendance", AttendanceWithStudent, ATTENDANCE_LIST_FIELDS, lambda row: {},
+             _attendance_records_query(None, None, None, None), "/api/v1/attendance/"),
+            ("payments", PaymentWithStudent, PAYMENT_ROW_FIELDS, payment_fields,
+             _payments_query(None, None, None), "/api/v1/payments/"),
+        ]
+
+        async def request_ms(path):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                timings = []
+                for _ in range(args.repeat):
+                    started = time.perf_counter()
+                    response = await client.get(path, params={"limit": args.rows})
+                    response.raise_for_status()
+                    timings.append(time.perf_counter() - started)
+            await async_engine.dispose()
+            return round(statistics.median(timings) * 1000, 3)
+
+        results = []
+        with Session(engine) as session:
+            for name, schema, fields, extra, query, path in endpoints:
+                rows = session.execute(query.limit(args.rows)).all()
+                model = model_body(schema, rows, extra)
+                fast = fast_body(fields, rows, extra)
+                results.append({
+                    "endpoint": name,
+                    "rows": len(rows),
+                    "same_json": json.loads(model) == json.loads(fast),
+                    "bytes": len(fast),
+                    "model_path_ms": time_ms(lambda: model_body(schema, rows, extra), args.repeat),
+                    "fast_path_ms": time_ms(lambda: fast_body(fields, rows, extra), args.repeat),
+                    "request_p50_ms": asyncio.run(request_ms(path))
+                })
+        engine.dispose()
+
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Bytes on the wire and latency of the large listing endpoints.
+
+Requests each listing in full and narrowed with ``fields=``, both without
+compression and with gzip, against a seeded throwaway database, and reports
+the transferred size and median request time of every combination.
+
+    python -m bench.list_payload --rows 500
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+
+# Narrow views a client would realistically ask for
+PROJECTIONS = {
+    "/api/v1/attendance/": "student_id,student_name,date,status",
+    "/api/v1/payments/": "student_name,end_date,days_until_expiry,progress_percentage",
+    "/api/v1/students/": "id,name,grade,is_active",
+}
+
+async def measure(app, path, params, encoding, repeat):
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            response = await client.get(path, params=params, headers={"accept-encoding": encoding})
+            response.raise_for_status()
+            timings.append(time.perf_counter() - started)
+    return {
+        "wire_bytes": response.num_bytes_downloaded,
+        "body_bytes": len(response.content),
+        "p50_ms": round(statistics.median(timings) * 1000, 3)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    random.seed(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        os.environ["DATABASE_URL"] = database_url
+        os.environ["PAYMENT_SWEEP_ENABLED"] = "false"
+
+        from bench.load import seed
+        seed(database_url, students=args.rows, days=2)
+
+        from app.database.connection import dispose_engines
+        from app.main import app
+
+        async def run():
+            results = []
+            async with app.router.lifespan_context(app):
+                for path, projection in PROJECTIONS.items():
+                    # The students listing pages through at most 100 at a time
+                    limit = min(args.rows, 100) if "students" in path else args.rows
+                    for fields in (None, projection):
+                        params = {"limit": limit}
+                        if fields:
+                            params["fields"] = fields
+                        for encoding in ("identity", "gzip"):
+                            results.append({
+                                "endpoint": path,
+                                "fields": fields or "all",
+                                "encoding": encoding,
+                                **await measure(app, path, params, encoding, args.repeat)
+                            })
+            await dispose_engines()
+            return results
+
+        results = asyncio.run(run())
+
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Requests per second for a mix of read endpoints under concurrent clients.
+
+Seeds a throwaway database, serves the app with uvicorn in a subprocess and
+keeps N requests in flight for a fixed duration at each concurrency level.
+The client runs in this process, so on small machines it competes with the
+server for CPU; compare runs made on the same machine.
+
+    python -m bench.load --concurrency 50 200 1000 --duration 10
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+import httpx
+
+def seed(database_url, students, days):
+    from app.database.base import Base
+    from app.database.connection import create_db_engine
+    from app.models import Attendance, Payment, Student
+    from app.utils.attendance_rollup import rebuild_monthly_stats
+    from sqlalchemy.orm import Session
+
+    engine = create_db_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    today = date.today()
+    with Session(engine) as session:
+        session.execute(Student.__table__.insert(), [
+            {"name": f"student-{i:05d}", "grade": "중3", "is_active": True} for i in range(students)
+        ])
+        session.execute(Attendance.__table__.insert(), [
+            {
+                "student_id": student_id,
+                "date": today - timedelta(days=day),
+                "status": random.choice(["present", "present", "present", "absent", "late"])
+            }
+            for student_id in range(1, students + 1)
+            for day in range(1, days + 1)
+        ])
+        session.execute(Payment.__table__.insert(), [
+            {
+                "student_id": student_id,
+                "amount": 200000,
+                "payment_method": "card",
+                "start_date": today - timedelta(days=10),
+                "end_date": today + timedelta(days=random.randint(0, 30)),
+                "sessions_total": 8,
+                "sessions_completed": random.randint(0, 7),
+                "is_active": True
+            }
+            for student_id in range(1, students + 1)
+        ])
+        rebuild_monthly_stats(session)
+        session.commit()
+    engine.dispose()
+
+def request_paths(students):
+    return [
+        lambda: "/api/v1/students/?limit=20",
+        lambda: "/api/v1/attendance/today",
+        lambda: "/api/v1/attendance/?limit=50",
+        lambda: "/api/v1/payments/?limit=50",
+        lambda: "/api/v1/payments/expiring?days=7",
+        lambda: f"/api/v1/attendance/stats/{random.randint(1, students)}",
+        lambda: f"/api/v1/students/{random.randint(1, students)}",
+    ]
+
+async def run_level(base_url, concurrency, duration, paths):
+    """Keep ``concurrency`` requests in flight for ``duration`` seconds"""
+    latencies = []
+    errors = 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        deadline = time.perf_counter() + duration
+
+        async def worker():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                path = random.choice(paths)()
+                started = time.perf_counter()
+                try:
+                    response = await client.get(path)
+                    if response.status_code != 200:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 1),
+        "p95_ms": round(latencies[int(0.95 * (len(latencies) - 1))] * 1000, 1)
+    }
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def wait_until_ready(base_url, process, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("uvicorn exited before becoming ready")
+        try:
+            if httpx.get(f"{base_url}/health").status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("uvicorn did not become ready")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[50, 200, 1000])
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--students", type=int, default=200)
+    parser.add_argument("--days", type=int, default=90)
+    args = parser.parse_args()
+
+    random.seed(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        seed(database_url, args.students, args.days)
+
+        port = _free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+            env={**os.environ, "DATABASE_URL": database_url}
+        )
+        try:
+            wait_until_ready(base_url, process)
+            paths = request_paths(args.students)
+            results = [
+                asyncio.run(run_level(base_url, concurrency, args.duration, paths))
+                for concurrency in args.concurrency
+            ]
+        finally:
+            process.terminate()
+            process.wait()
+
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+GET /payments/stats latency as the payments table grows.
+
+Seeds a throwaway database with payments spread over the last year and
+times the endpoint through the FastAPI app at each size.
+
+    python -m bench.payment_stats --sizes 1000 10000 100000
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+def seed_payments(session, count, batch_size=10000):
+    from app.models import Payment, Student
+
+    if session.query(Student).count() == 0:
+        session.execute(Student.__table__.insert(), [
+            {"name": f"student-{i:05d}", "is_active": True} for i in range(500)
+        ])
+
+    now = datetime.now()
+    today = date.today()
+    existing = session.query(Payment).count()
+    rows = []
+    for _ in range(count - existing):
+        created_at = now - timedelta(days=random.randint(0, 365), seconds=random.randint(0, 86399))
+        rows.append({
+            "student_id": random.randint(1, 500),
+            "amount": Decimal(random.randint(50000, 500000)),
+            "payment_method": random.choice(["cash", "card", "transfer"]),
+            "start_date": created_at.date(),
+            "end_date": today + timedelta(days=random.randint(-60, 30)),
+            "sessions_total": 8,
+            "sessions_completed": random.randint(0, 8),
+            "is_active": random.random() < 0.3,
+            "created_at": created_at
+        })
+        if len(rows) >= batch_size:
+            session.execute(Payment.__table__.insert(), rows)
+            rows = []
+    if rows:
+        session.execute(Payment.__table__.insert(), rows)
+    session.commit()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    random.seed(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        # Time the queries, not the response cache
+        os.environ["RESPONSE_CACHE_ENABLED"] = "false"
+
+        from fastapi.testclient import TestClient
+        from app.database.base import Base
+        from app.database.connection import SessionLocal, engine
+        from app.main import app
+
+        Base.metadata.create_all(bind=engine)
+        results = []
+        with TestClient(app) as client:
+            for size in sorted(args.sizes):
+                session = SessionLocal()
+                try:
+                    seed_payments(session, size)
+                finally:
+                    session.close()
+
+                for period in ("monthly", "quarterly"):
+                    timings = []
+                    for _ in range(args.repeat):
+                        started = time.perf_counter()
+                        response = client.get("/api/v1/payments/stats", params={"period": period})
+                        timings.append(time.perf_counter() - started)
+                        response.raise_for_status()
+                    results.append({
+                        "payments": size,
+                        "period": period,
+                        "p50_ms": round(statistics.median(timings) * 1000, 2),
+                        "max_ms": round(max(timings) * 1000, 2)
+                    })
+        engine.dispose()
+
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
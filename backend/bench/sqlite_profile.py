@@ -0,0 +1,130 @@
+"""
+Concurrent reads during bulk writes, with and without the SQLite profile.
+
+Seeds a throwaway database, then runs a writer that commits batches of
+attendance rows while reader threads repeatedly run the /attendance/today
+query. The "default" profile is a bare engine with rollback journaling;
+"tuned" uses the PRAGMAs and pool from app.database.connection.
+
+    python -m bench.sqlite_profile --readers 8 --batches 200 --batch-size 50
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import and_, create_engine, insert, select
+
+from app.database.base import Base
+from app.database.connection import create_db_engine, get_sqlite_pragmas
+from app.models import Attendance, Student
+
+def _percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+def _today_query(today):
+    return select(Student.id, Student.name, Attendance.status).outerjoin(
+        Attendance,
+        and_(Attendance.student_id == Student.id, Attendance.date == today)
+    ).where(Student.is_active == True).order_by(Student.name)
+
+def run_profile(name, engine, students, readers, batches, batch_size):
+    """Run the writer and readers against ``engine`` and summarise the latencies"""
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Student), [
+            {"name": f"student-{i:05d}", "grade": "중3", "is_active": True}
+            for i in range(students)
+        ])
+
+    stop = threading.Event()
+    read_latencies = []
+    read_errors = []
+    lock = threading.Lock()
+
+    def reader():
+        today = date.today()
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                with engine.connect() as conn:
+                    conn.execute(_today_query(today)).all()
+            except Exception as e:  # "database is locked" under contention
+                with lock:
+                    read_errors.append(str(e))
+                continue
+            elapsed = time.perf_counter() - started
+            with lock:
+                read_latencies.append(elapsed)
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+
+    write_started = time.perf_counter()
+    first_day = date.today() - timedelta(days=batches * batch_size // students + 1)
+    row_number = 0
+    for _ in range(batches):
+        rows = []
+        for _ in range(batch_size):
+            rows.append({
+                "student_id": row_number % students + 1,
+                "date": first_day + timedelta(days=row_number // students),
+                "status": "present"
+            })
+            row_number += 1
+        with engine.begin() as conn:
+            conn.execute(insert(Attendance), rows)
+    write_seconds = time.perf_counter() - write_started
+
+    stop.set()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+
+    return {
+        "profile": name,
+        "write_seconds": round(write_seconds, 3),
+        "commits_per_second": round(batches / write_seconds, 1),
+        "reads": len(read_latencies),
+        "reads_per_second": round(len(read_latencies) / write_seconds, 1),
+        "read_errors": len(read_errors),
+        "read_p50_ms": round(statistics.median(read_latencies) * 1000, 3) if read_latencies else None,
+        "read_p95_ms": round(_percentile(read_latencies, 0.95) * 1000, 3) if read_latencies else None,
+        "read_max_ms": round(max(read_latencies) * 1000, 3) if read_latencies else None,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=200)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--batches", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=50)
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        default_url = f"sqlite:///{os.path.join(tmp, 'default.db')}"
+        default_engine = create_engine(default_url, connect_args={"check_same_thread": False})
+        results.append(run_profile(
+            "default", default_engine, args.students, args.readers, args.batches, args.batch_size
+        ))
+
+        tuned_url = f"sqlite:///{os.path.join(tmp, 'tuned.db')}"
+        tuned_engine = create_db_engine(tuned_url, sqlite_pragmas=get_sqlite_pragmas())
+        results.append(run_profile(
+            "tuned", tuned_engine, args.students, args.readers, args.batches, args.batch_size
+        ))
+
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Cold start cost: importing the API and the maintenance CLI, and API startup.
+
+Each measurement runs in a fresh interpreter, like a new uvicorn worker or a
+serverless cold start. Import costs come from ``python -X importtime``;
+``startup_ms`` adds running the app's lifespan startup against a throwaway
+database. Reports medians over several runs and the slowest modules.
+
+    python -m bench.startup --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+STARTUP_SCRIPT = """
+import asyncio, time
+started = time.perf_counter()
+from app.main import app
+async def start():
+    async with app.router.lifespan_context(app):
+        print(round((time.perf_counter() - started) * 1000, 1))
+asyncio.run(start())
+"""
+
+def parse_importtime(stderr):
+    """(module, self_us, cumulative_us) for every line of -X importtime output"""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append((name.strip(), int(self_us), int(cumulative_us)))
+    return modules
+
+def run(args, env):
+    return subprocess.run([sys.executable, *args], capture_output=True, text=True, env=env, check=True)
+
+def measure_import(module, runs, env, top):
+    totals = []
+    slowest = {}
+    for _ in range(runs):
+        modules = parse_importtime(run(["-X", "importtime", "-c", f"import {module}"], env).stderr)
+        totals.append(next(cumulative for name, _, cumulative in modules if name == module))
+        for name, self_us, _ in modules:
+            slowest.setdefault(name, []).append(self_us)
+    ranked = sorted(slowest.items(), key=lambda item: statistics.median(item[1]), reverse=True)[:top]
+    return {
+        "module": module,
+        "import_ms": round(statistics.median(totals) / 1000, 1),
+        "slowest_self_ms": {name: round(statistics.median(times) / 1000, 1) for name, times in ranked},
+        "loaded_web_stack": "fastapi" in dict(slowest),
+        "loaded_async_driver": "aiosqlite" in dict(slowest)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        env.pop("ASYNC_DATABASE_URL", None)
+
+        results = {
+            "imports": [measure_import(module, args.runs, env, args.top) for module in ("app.main", "app.cli")],
+            "startup_ms": statistics.median(
+                float(run(["-c", STARTUP_SCRIPT], env).stdout) for _ in range(args.runs)
+            )
+        }
+
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
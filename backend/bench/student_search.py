@@ -0,0 +1,103 @@
+"""
+Student search latency: ILIKE '%term%' scan against the search index.
+
+Seeds a throwaway database with random Korean names, grades and phone
+numbers, then times the two statements GET /students runs for a search
+(the count and the first page) for a mix of keystroke-sized terms.
+
+    python -m bench.student_search --sizes 10000 50000
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from bench.generate import FAMILY_NAMES, GIVEN_SYLLABLES
+
+TERMS = ["김", "민", "김민", "서연", "김민서", "민서", "010", "1234", "없는사람"]
+
+def seed_students(session, count, batch_size=10000):
+    from app.models import Student
+
+    rows = []
+    for _ in range(count):
+        rows.append({
+            "name": random.choice(FAMILY_NAMES) + "".join(random.choices(GIVEN_SYLLABLES, k=2)),
+            "grade": random.choice(["중1", "중2", "중3", "고1", "고2", "고3"]),
+            "phone": f"010-{random.randint(0, 9999):04d}-{random.randint(0, 9999):04d}",
+            "parent_phone": f"010-{random.randint(0, 9999):04d}-{random.randint(0, 9999):04d}",
+            "is_active": True
+        })
+        if len(rows) >= batch_size:
+            session.execute(Student.__table__.insert(), rows)
+            rows = []
+    if rows:
+        session.execute(Student.__table__.insert(), rows)
+    session.commit()
+
+def time_search(session, build, term, repeat):
+    """Median and max milliseconds for the count plus first page of ``term``"""
+    from app.utils.student_search import MAX_RANKED_MATCHES
+
+    query, ordering = build(term)
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        total = session.scalar(select(func.count()).select_from(query.subquery()))
+        page_ordering = ordering if total <= MAX_RANKED_MATCHES else ordering[-1:]
+        session.execute(query.order_by(*page_ordering).limit(10)).all()
+        timings.append(time.perf_counter() - started)
+    return total, round(statistics.median(timings) * 1000, 3), round(max(timings) * 1000, 3)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 50000])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    random.seed(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+
+        from app.database.base import Base
+        from app.database.connection import engine
+        from app.models import Student
+        from app.utils.student_search import apply_student_search
+
+        def ilike(term):
+            return select(Student).where(Student.name.ilike(f"%{term}%")), [Student.id]
+
+        def indexed(term):
+            query, ordering = apply_student_search(select(Student), term, engine.dialect.name)
+            return query, [*ordering, Student.id]
+
+        Base.metadata.create_all(bind=engine)
+        results = []
+        with Session(engine) as session:
+            seeded = 0
+            for size in sorted(args.sizes):
+                seed_students(session, size - seeded)
+                seeded = size
+                for term in TERMS:
+                    for method, build in (("ilike", ilike), ("index", indexed)):
+                        total, p50_ms, max_ms = time_search(session, build, term, args.repeat)
+                        results.append({
+                            "students": size,
+                            "term": term,
+                            "method": method,
+                            "matches": total,
+                            "p50_ms": p50_ms,
+                            "max_ms": max_ms
+                        })
+        engine.dispose()
+
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
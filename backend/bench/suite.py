@@ -0,0 +1,193 @@
+"""
+Scripted API scenarios against a generated academy, for catching regressions.
+
+Generates a throwaway academy with bench.generate, then drives the app in
+process through the httpx ASGI transport, one request at a time, and
+reports p50/p95/p99 latency and SQL statements per request for each
+scenario. Each percentile is the median over several rounds, which keeps a
+single slow round on a busy machine from deciding the result. The response
+cache is off unless --cache is given, so the numbers reflect the queries.
+
+    python -m bench.suite --students 300 --years 2 --output bench.json
+    python -m bench.suite --compare bench.json
+
+With --compare, a scenario whose p95 grew by more than --threshold, or that
+runs more statements per request than before, is listed under
+"regressions" and the command exits with status 1. Statement counts are
+exact; compare latencies only between runs on the same machine.
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date
+
+WARMUP_REQUESTS = 3
+
+def scenarios(rng, student_ids, due_today):
+    """(name, method, path, params or JSON body factory) for each scenario"""
+    today = date.today().isoformat()
+    return [
+        ("students_list", "GET", "/api/v1/students/",
+         lambda: {"limit": 20, "offset": rng.randrange(0, max(len(student_ids) - 20, 1))}),
+        ("students_search", "GET", "/api/v1/students/",
+         lambda: {"search": rng.choice(["김", "이민", "서연", "010-12", "중3"])}),
+        ("today_board", "GET", "/api/v1/attendance/today", lambda: {}),
+        ("attendance_list", "GET", "/api/v1/attendance/", lambda: {"limit": 100}),
+        ("bulk_roll_call", "POST", "/api/v1/attendance/bulk", lambda: {
+            "date": today,
+            "upsert": True,
+            "attendances": [
+                {"student_id": student_id, "status": rng.choice(["present", "present", "late", "absent"])}
+                for student_id in due_today
+            ]
+        }),
+        ("attendance_stats", "GET", "/api/v1/attendance/stats/{student_id}", lambda: {"period": "monthly"}),
+        ("payments_list", "GET", "/api/v1/payments/", lambda: {"limit": 100}),
+        ("payment_stats", "GET", "/api/v1/payments/stats", lambda: {"period": "monthly"}),
+        ("expiring_payments", "GET", "/api/v1/payments/expiring", lambda: {"days": 7}),
+    ]
+
+def percentile(values, percent):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(percent / 100 * (len(ordered) - 1))))]
+
+async def run_scenarios(requests, rounds, seed):
+    import httpx
+    from sqlalchemy import event, select
+
+    from app.database.connection import AsyncSessionLocal, get_async_engine
+    from app.main import app
+    from app.models import Student
+    from bench.generate import WEEKDAYS
+
+    statements = 0
+
+    def count_statement(*args):
+        nonlocal statements
+        statements += 1
+
+    event.listen(get_async_engine().sync_engine, "before_cursor_execute", count_statement)
+
+    async with AsyncSessionLocal() as db:
+        active = (await db.execute(select(Student.id, Student.schedule).where(Student.is_active == True))).all()
+    weekday = WEEKDAYS[date.today().weekday()] if date.today().weekday() < len(WEEKDAYS) else None
+    student_ids = [row.id for row in active]
+    due_today = [row.id for row in active if weekday in (row.schedule or {})] or student_ids[:20]
+
+    rng = random.Random(seed)
+    results = []
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for name, method, path, make_params in scenarios(rng, student_ids, due_today):
+                round_timings, counts = [], []
+                for _ in range(rounds):
+                    gc.collect()
+                    timings = []
+                    for attempt in range(WARMUP_REQUESTS + requests):
+                        url = path.format(student_id=rng.choice(student_ids))
+                        payload = make_params()
+                        statements = 0
+                        started = time.perf_counter()
+                        if method == "GET":
+                            response = await client.get(url, params=payload)
+                        else:
+                            response = await client.request(method, url, json=payload)
+                        elapsed = time.perf_counter() - started
+                        response.raise_for_status()
+                        if attempt >= WARMUP_REQUESTS:
+                            timings.append(elapsed * 1000)
+                            counts.append(statements)
+                    round_timings.append(timings)
+
+                def across_rounds(percent):
+                    return round(statistics.median(percentile(timings, percent) for timings in round_timings), 2)
+
+                results.append({
+                    "scenario": name,
+                    "requests": len(counts),
+                    "p50_ms": across_rounds(50),
+                    "p95_ms": across_rounds(95),
+                    "p99_ms": across_rounds(99),
+                    "queries_mean": round(statistics.mean(counts), 1),
+                    "queries_max": max(counts)
+                })
+    return results
+
+def compare(results, baseline, threshold):
+    """Scenarios slower than ``threshold`` times the baseline p95 or running more statements"""
+    previous = {entry["scenario"]: entry for entry in baseline["scenarios"]}
+    regressions = []
+    for entry in results:
+        before = previous.get(entry["scenario"])
+        if before is None:
+            continue
+        if entry["p95_ms"] > before["p95_ms"] * threshold:
+            regressions.append({"scenario": entry["scenario"], "metric": "p95_ms",
+                                "baseline": before["p95_ms"], "current": entry["p95_ms"]})
+        if entry["queries_max"] > before["queries_max"]:
+            regressions.append({"scenario": entry["scenario"], "metric": "queries_max",
+                                "baseline": before["queries_max"], "current": entry["queries_max"]})
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=300)
+    parser.add_argument("--years", type=float, default=2.0)
+    parser.add_argument("--requests", type=int, default=50, help="measured requests per scenario and round")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cache", action="store_true", help="leave the response cache on")
+    parser.add_argument("--output", help="also write the results to this file")
+    parser.add_argument("--compare", help="results file from an earlier run to check against")
+    parser.add_argument("--threshold", type=float, default=1.5, help="allowed p95 growth factor")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        # Must be set before the app reads its configuration
+        os.environ["DATABASE_URL"] = database_url
+        os.environ.pop("ASYNC_DATABASE_URL", None)
+        os.environ["RESPONSE_CACHE_ENABLED"] = "true" if args.cache else "false"
+
+        from app.database.connection import dispose_engines, get_engine
+        from app.database.schema import create_tables
+        from bench.generate import generate_academy
+
+        create_tables()
+        counts = generate_academy(get_engine(), args.students, args.years, args.seed)
+        results = asyncio.run(run_scenarios(args.requests, args.rounds, args.seed))
+        asyncio.run(dispose_engines())
+
+    report = {
+        "config": {
+            **counts,
+            "years": args.years,
+            "seed": args.seed,
+            "requests": args.requests,
+            "rounds": args.rounds,
+            "cache": args.cache,
+            "python": sys.version.split()[0]
+        },
+        "scenarios": results
+    }
+    if args.compare:
+        with open(args.compare) as f:
+            report["regressions"] = compare(results, json.load(f), args.threshold)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    print(json.dumps(report, indent=2))
+    if report.get("regressions"):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""initial schema
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-16 10:00:00.000000
+
+Tables as originally created by ``Base.metadata.create_all``. Every
+operation uses ``if_not_exists`` so databases that were created by the
+app before migrations existed can be upgraded in place.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'students',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('grade', sa.String(length=20), nullable=True),
+        sa.Column('phone', sa.String(length=20), nullable=True),
+        sa.Column('parent_phone', sa.String(length=20), nullable=True),
+        sa.Column('subjects', sa.JSON(), nullable=True),
+        sa.Column('schedule', sa.JSON(), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('memo', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True
+    )
+    op.create_index('ix_students_id', 'students', ['id'], unique=False, if_not_exists=True)
+
+    op.create_table(
+        'attendances',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('student_id', sa.Integer(), nullable=False),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('time_in', sa.Time(), nullable=True),
+        sa.Column('time_out', sa.Time(), nullable=True),
+        sa.Column('note', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.ForeignKeyConstraint(['student_id'], ['students.id']),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True
+    )
+    op.create_index('ix_attendances_id', 'attendances', ['id'], unique=False, if_not_exists=True)
+
+    op.create_table(
+        'payments',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('student_id', sa.Integer(), nullable=False),
+        sa.Column('amount', sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column('payment_method', sa.String(length=20), nullable=False),
+        sa.Column('start_date', sa.Date(), nullable=False),
+        sa.Column('end_date', sa.Date(), nullable=False),
+        sa.Column('sessions_total', sa.Integer(), nullable=True),
+        sa.Column('sessions_completed', sa.Integer(), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['student_id'], ['students.id']),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True
+    )
+    op.create_index('ix_payments_id', 'payments', ['id'], unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_payments_id', table_name='payments')
+    op.drop_table('payments')
+    op.drop_index('ix_attendances_id', table_name='attendances')
+    op.drop_table('attendances')
+    op.drop_index('ix_students_id', table_name='students')
+    op.drop_table('students')
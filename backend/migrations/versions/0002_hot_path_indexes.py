@@ -0,0 +1,75 @@
+"""composite indexes for attendance and payment hot paths
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-16 11:00:00.000000
+
+Adds a unique (student_id, date) index on attendances and the
+(student_id, is_active) / (is_active, end_date) indexes on payments.
+Older versions could record a student twice on the same day. If any such
+duplicates exist the upgrade stops before changing anything and lists them;
+they have to be resolved by hand (see README) before running it again.
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Duplicates listed in the error message when the upgrade is refused
+MAX_DUPLICATES_SHOWN = 20
+
+
+def check_duplicate_attendances() -> None:
+    """Refuse to continue while a student has several attendances on one day."""
+    if context.is_offline_mode():
+        return
+    duplicates = op.get_bind().execute(sa.text(
+        "SELECT student_id, date, COUNT(*) AS records FROM attendances "
+        "GROUP BY student_id, date HAVING COUNT(*) > 1 ORDER BY date, student_id"
+    )).all()
+    if not duplicates:
+        return
+    shown = "\n".join(
+        f"  student_id={row.student_id} date={row.date}: {row.records} records"
+        for row in duplicates[:MAX_DUPLICATES_SHOWN]
+    )
+    more = len(duplicates) - MAX_DUPLICATES_SHOWN
+    raise RuntimeError(
+        f"Cannot add the unique (student_id, date) index: {len(duplicates)} student/date pairs "
+        f"have more than one attendance record.\n{shown}"
+        + (f"\n  ... and {more} more" if more > 0 else "")
+        + "\nKeep one record per pair (see README.md, '중복 출석 기록'), "
+        "then run the upgrade again. Nothing was changed."
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    check_duplicate_attendances()
+    op.create_index(
+        'ix_attendances_student_id_date', 'attendances', ['student_id', 'date'],
+        unique=True, if_not_exists=True
+    )
+    op.create_index(
+        'ix_payments_student_id_is_active', 'payments', ['student_id', 'is_active'],
+        unique=False, if_not_exists=True
+    )
+    op.create_index(
+        'ix_payments_is_active_end_date', 'payments', ['is_active', 'end_date'],
+        unique=False, if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_payments_is_active_end_date', table_name='payments')
+    op.drop_index('ix_payments_student_id_is_active', table_name='payments')
+    op.drop_index('ix_attendances_student_id_date', table_name='attendances')
@@ -0,0 +1,56 @@
+"""monthly attendance rollup table
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-16 13:00:00.000000
+
+Existing databases need a one-off backfill after upgrading:
+    python -m app.cli rebuild-attendance-stats
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, Sequence[str], None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'attendance_monthly_stats',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('student_id', sa.Integer(), nullable=False),
+        sa.Column('month', sa.String(length=7), nullable=False),
+        sa.Column('present', sa.Integer(), nullable=False),
+        sa.Column('absent', sa.Integer(), nullable=False),
+        sa.Column('late', sa.Integer(), nullable=False),
+        sa.Column('early_leave', sa.Integer(), nullable=False),
+        sa.Column('first_status', sa.String(length=20), nullable=True),
+        sa.Column('leading_run', sa.Integer(), nullable=False),
+        sa.Column('last_status', sa.String(length=20), nullable=True),
+        sa.Column('trailing_run', sa.Integer(), nullable=False),
+        sa.Column('longest_present_run', sa.Integer(), nullable=False),
+        sa.Column('longest_absent_run', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.ForeignKeyConstraint(['student_id'], ['students.id']),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True
+    )
+    op.create_index('ix_attendance_monthly_stats_id', 'attendance_monthly_stats', ['id'], unique=False, if_not_exists=True)
+    op.create_index(
+        'ix_attendance_monthly_stats_student_id_month', 'attendance_monthly_stats', ['student_id', 'month'],
+        unique=True, if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_attendance_monthly_stats_student_id_month', table_name='attendance_monthly_stats')
+    op.drop_index('ix_attendance_monthly_stats_id', table_name='attendance_monthly_stats')
+    op.drop_table('attendance_monthly_stats')
@@ -0,0 +1,32 @@
+"""indexes for date/created_at ordered listings and keyset pagination
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-16 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, Sequence[str], None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_attendances_date_id', 'attendances', ['date', 'id'], unique=False, if_not_exists=True)
+    op.create_index('ix_payments_created_at_id', 'payments', ['created_at', 'id'], unique=False, if_not_exists=True)
+    op.create_index('ix_students_name', 'students', ['name'], unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_students_name', table_name='students')
+    op.drop_index('ix_payments_created_at_id', table_name='payments')
+    op.drop_index('ix_attendances_date_id', table_name='attendances')
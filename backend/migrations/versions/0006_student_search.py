@@ -0,0 +1,61 @@
+"""student search index: FTS5 trigram table (SQLite) or pg_trgm (PostgreSQL)
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, Sequence[str], None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = "name, grade, phone, parent_phone, memo"
+NEW_VALUES = "new.name, new.grade, new.phone, new.parent_phone, new.memo"
+OLD_VALUES = "old.name, old.grade, old.phone, old.parent_phone, old.memo"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute(f"""CREATE VIRTUAL TABLE IF NOT EXISTS students_fts USING fts5(
+            {COLUMNS},
+            content='students',
+            content_rowid='id',
+            tokenize='trigram'
+        )""")
+        op.execute(f"""CREATE TRIGGER IF NOT EXISTS students_fts_ai AFTER INSERT ON students BEGIN
+            INSERT INTO students_fts(rowid, {COLUMNS}) VALUES (new.id, {NEW_VALUES});
+        END""")
+        op.execute(f"""CREATE TRIGGER IF NOT EXISTS students_fts_ad AFTER DELETE ON students BEGIN
+            INSERT INTO students_fts(students_fts, rowid, {COLUMNS}) VALUES ('delete', old.id, {OLD_VALUES});
+        END""")
+        op.execute(f"""CREATE TRIGGER IF NOT EXISTS students_fts_au AFTER UPDATE OF {COLUMNS} ON students BEGIN
+            INSERT INTO students_fts(students_fts, rowid, {COLUMNS}) VALUES ('delete', old.id, {OLD_VALUES});
+            INSERT INTO students_fts(rowid, {COLUMNS}) VALUES (new.id, {NEW_VALUES});
+        END""")
+        op.execute("INSERT INTO students_fts(students_fts) VALUES ('rebuild')")
+    elif dialect == 'postgresql':
+        document = " || ' ' || ".join(f"coalesce(students.{name}, '')" for name in COLUMNS.split(", "))
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.execute(f"CREATE INDEX IF NOT EXISTS ix_students_search_trgm ON students USING gin (({document}) gin_trgm_ops)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute("DROP TRIGGER IF EXISTS students_fts_au")
+        op.execute("DROP TRIGGER IF EXISTS students_fts_ad")
+        op.execute("DROP TRIGGER IF EXISTS students_fts_ai")
+        op.execute("DROP TABLE IF EXISTS students_fts")
+    elif dialect == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_students_search_trgm")
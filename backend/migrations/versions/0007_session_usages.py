@@ -0,0 +1,44 @@
+"""session usage link between attendances and payments
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, Sequence[str], None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'session_usages',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('payment_id', sa.Integer(), nullable=False),
+        sa.Column('attendance_id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.ForeignKeyConstraint(['attendance_id'], ['attendances.id']),
+        sa.ForeignKeyConstraint(['payment_id'], ['payments.id']),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True
+    )
+    op.create_index('ix_session_usages_id', 'session_usages', ['id'], unique=False, if_not_exists=True)
+    op.create_index('ix_session_usages_attendance_id', 'session_usages', ['attendance_id'], unique=True, if_not_exists=True)
+    op.create_index('ix_session_usages_payment_id', 'session_usages', ['payment_id'], unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_session_usages_payment_id', table_name='session_usages')
+    op.drop_index('ix_session_usages_attendance_id', table_name='session_usages')
+    op.drop_index('ix_session_usages_id', table_name='session_usages')
+    op.drop_table('session_usages')
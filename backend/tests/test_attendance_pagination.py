@@ -0,0 +1,76 @@
+"""
+Attendance listing pages must be read in index order: a temp B-tree in the
+plan means every cursor page sorts the whole history before it.
+"""
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import create_engine, insert
+from sqlalchemy.dialects import sqlite
+
+from app.api.attendance import (
+    ATTENDANCE_EXPORT_FIELDS,
+    ATTENDANCE_PAGE_ORDER,
+    _after_cursor,
+    _attendance_records_query,
+    _by_date_and_name
+)
+from app.database.base import Base
+from app.models.attendance import Attendance
+from app.models.student import Student
+
+@pytest.fixture
+def connection():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        yield connection
+    engine.dispose()
+
+def page_query(date_filter=None, student_id=None, start_date=None, end_date=None, cursor=None):
+    query = _attendance_records_query(
+        date_filter, student_id, start_date, end_date, ATTENDANCE_EXPORT_FIELDS
+    ).order_by(*ATTENDANCE_PAGE_ORDER)
+    if cursor is not None:
+        query = _after_cursor(query, *cursor)
+    return query.limit(100)
+
+def query_plan(connection, query):
+    compiled = query.compile(dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True})
+    rows = connection.exec_driver_sql("EXPLAIN QUERY PLAN " + str(compiled))
+    return [row.detail for row in rows]
+
+@pytest.mark.parametrize("filters", [
+    {},
+    {"student_id": 7},
+    {"date_filter": date(2026, 3, 2)},
+    {"start_date": date(2026, 1, 1), "end_date": date(2026, 6, 30)}
+])
+@pytest.mark.parametrize("cursor", [None, (date(2026, 3, 2), 1234)])
+def test_pages_are_read_in_index_order(connection, filters, cursor):
+    plan = query_plan(connection, page_query(cursor=cursor, **filters))
+    assert not [step for step in plan if "TEMP B-TREE" in step], plan
+
+def test_cursor_pages_cover_every_row_once(connection):
+    connection.execute(insert(Student), [{"name": name} for name in ("최민서", "김하준", "박지우")])
+    first_day = date(2026, 3, 2)
+    connection.execute(insert(Attendance), [
+        {"student_id": student_id, "date": first_day + timedelta(days=day), "status": "present"}
+        for day in range(7) for student_id in (3, 1, 2)
+    ])
+    everything = connection.execute(page_query()).all()
+
+    seen, cursor = [], None
+    while True:
+        page = connection.execute(page_query(cursor=cursor).limit(4)).all()
+        seen += page
+        if len(page) < 4:
+            break
+        cursor = (page[-1].date, page[-1].id)
+        # Within a page rows are shown by date, then student name
+        shown = _by_date_and_name(page)
+        assert [(row.date, row.student_name) for row in shown] == sorted(
+            ((row.date, row.student_name) for row in page), key=lambda key: (-key[0].toordinal(), key[1])
+        )
+    assert [row.id for row in seen] == [row.id for row in everything]
+    assert len(everything) == 21
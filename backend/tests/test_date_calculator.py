@@ -0,0 +1,101 @@
+"""
+Property tests: the weekday arithmetic in app.utils.date_calculator must
+agree with the day-by-day loops it replaced, kept below as oracles.
+"""
+from datetime import date, timedelta
+
+from hypothesis import given, strategies as st
+
+from app.utils.date_calculator import (
+    calculate_session_end_date,
+    calculate_session_end_dates,
+    count_session_days,
+    get_business_days_between
+)
+
+def loop_session_end_date(start_date, total_sessions, exclude_weekends=True, holidays=None):
+    """calculate_session_end_date before the closed-form rewrite"""
+    if holidays is None:
+        holidays = []
+    
+    current_date = start_date
+    sessions_counted = 0
+    while sessions_counted < total_sessions:
+        is_valid_day = True
+        if exclude_weekends and current_date.weekday() >= 5:
+            is_valid_day = False
+        if current_date in holidays:
+            is_valid_day = False
+        if is_valid_day:
+            sessions_counted += 1
+        if sessions_counted < total_sessions:
+            current_date += timedelta(days=1)
+    return current_date
+
+def loop_business_days_between(start_date, end_date):
+    """get_business_days_between before the closed-form rewrite"""
+    if start_date > end_date:
+        return 0
+    
+    current_date = start_date
+    business_days = 0
+    while current_date <= end_date:
+        if current_date.weekday() < 5:
+            business_days += 1
+        current_date += timedelta(days=1)
+    return business_days
+
+def loop_session_days(start_date, end_date, exclude_weekends, holidays):
+    """Session days in [start_date, end_date], counted one day at a time"""
+    days = 0
+    current_date = start_date
+    while current_date <= end_date:
+        if not (exclude_weekends and current_date.weekday() >= 5) and current_date not in holidays:
+            days += 1
+        current_date += timedelta(days=1)
+    return days
+
+start_dates = st.dates(min_value=date(2000, 1, 1), max_value=date(2040, 12, 31))
+sessions = st.integers(min_value=0, max_value=120)
+
+@st.composite
+def holiday_lists(draw, start_date):
+    """Holidays around ``start_date``, with duplicates and weekend days left in"""
+    offsets = draw(st.lists(st.integers(min_value=-30, max_value=250), max_size=40))
+    return [start_date + timedelta(days=offset) for offset in offsets]
+
+@st.composite
+def session_cases(draw):
+    start_date = draw(start_dates)
+    return start_date, draw(sessions), draw(st.booleans()), draw(holiday_lists(start_date))
+
+@given(session_cases())
+def test_session_end_date_matches_loop(case):
+    start_date, total_sessions, exclude_weekends, holidays = case
+    assert calculate_session_end_date(start_date, total_sessions, exclude_weekends, holidays) == \
+        loop_session_end_date(start_date, total_sessions, exclude_weekends, holidays)
+
+@given(start_dates, sessions, st.booleans())
+def test_session_end_date_without_holidays_matches_loop(start_date, total_sessions, exclude_weekends):
+    assert calculate_session_end_date(start_date, total_sessions, exclude_weekends) == \
+        loop_session_end_date(start_date, total_sessions, exclude_weekends)
+
+@given(st.lists(st.tuples(start_dates, sessions), max_size=20), st.booleans(), st.data())
+def test_batch_matches_single_calls(packages, exclude_weekends, data):
+    holidays = data.draw(holiday_lists(packages[0][0])) if packages else []
+    assert calculate_session_end_dates(packages, exclude_weekends, holidays) == [
+        loop_session_end_date(start_date, total_sessions, exclude_weekends, holidays)
+        for start_date, total_sessions in packages
+    ]
+
+@given(start_dates, st.integers(min_value=-20, max_value=400))
+def test_business_days_between_matches_loop(start_date, span):
+    end_date = start_date + timedelta(days=span)
+    assert get_business_days_between(start_date, end_date) == loop_business_days_between(start_date, end_date)
+
+@given(session_cases(), st.integers(min_value=-20, max_value=300))
+def test_count_session_days_matches_loop(case, span):
+    start_date, _, exclude_weekends, holidays = case
+    end_date = start_date + timedelta(days=span)
+    assert count_session_days(start_date, end_date, exclude_weekends, holidays) == \
+        loop_session_days(start_date, end_date, exclude_weekends, holidays)
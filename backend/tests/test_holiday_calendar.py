@@ -0,0 +1,65 @@
+"""
+The process-wide holiday calendar picks up holidays added elsewhere, and
+calculations past the bundled data are logged.
+"""
+import logging
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+from app.database.base import Base
+from app.models.holiday import Holiday
+from app.utils import holiday_calendar
+from app.utils.holiday_calendar import HolidayCalendar, get_holiday_calendar
+from app.utils.table_versions import table_versions
+
+@pytest.fixture
+def db(monkeypatch):
+    # The tests replace the process-wide calendar; put the original back after
+    monkeypatch.setattr(holiday_calendar, "_calendar", None)
+    monkeypatch.setattr(holiday_calendar, "_calendar_version", None)
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+def add_closed_day(db, day):
+    # Written outside this process's API, so no table version is bumped
+    db.execute(insert(Holiday).values(date=day, name="휴원"))
+    db.commit()
+
+def test_calendar_is_rebuilt_after_the_max_age(db, monkeypatch):
+    monkeypatch.setattr(holiday_calendar, "HOLIDAY_CALENDAR_MAX_AGE", 60.0)
+    calendar = holiday_calendar.reload_holiday_calendar(db)
+    add_closed_day(db, date(2026, 12, 30))
+    assert get_holiday_calendar(db) is calendar
+
+    monkeypatch.setattr(holiday_calendar, "HOLIDAY_CALENDAR_MAX_AGE", 0.0)
+    rebuilt = get_holiday_calendar(db)
+    assert rebuilt is not calendar
+    assert date(2026, 12, 30) in rebuilt.custom_dates
+
+def test_calendar_is_rebuilt_after_a_holidays_write(db):
+    holiday_calendar.reload_holiday_calendar(db)
+    add_closed_day(db, date(2026, 12, 29))
+    table_versions.bump("holidays")
+    assert date(2026, 12, 29) in get_holiday_calendar(db).custom_dates
+
+def test_calculations_past_the_bundled_data_are_logged_once_per_year(caplog, monkeypatch):
+    monkeypatch.setattr(holiday_calendar, "_unlisted_years_logged", set())
+    calendar = HolidayCalendar({date(2027, 1, 1): "신정"}, 2027, 2029, holidays_until=date(2027, 12, 31))
+
+    with caplog.at_level(logging.WARNING, logger=holiday_calendar.__name__):
+        calendar.add_session_days(date(2027, 12, 1), 8)
+        assert not caplog.records
+        assert calendar.add_session_days(date(2027, 12, 28), 8) == date(2028, 1, 6)
+        calendar.session_days_between(date(2028, 1, 1), date(2028, 3, 1))
+        calendar.add_session_days(date(2029, 12, 20), 30)
+
+    assert [record.getMessage().split(" (")[0] for record in caplog.records] == [
+        "No public holidays are listed for 2028",
+        "No public holidays are listed for 2030"
+    ]
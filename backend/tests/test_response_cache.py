@@ -0,0 +1,75 @@
+"""
+Concurrent misses of the response cache share one computation, and only
+the request that is cancelled sees the cancellation.
+"""
+import asyncio
+
+import pytest
+
+from app.utils.cache import ResponseCache
+from app.utils.table_versions import TableVersions
+
+def make_cache():
+    cache = ResponseCache(versions=TableVersions())
+    cache.register("board", 10, ("attendances",))
+    return cache
+
+def slow_compute(calls, body=b"[]", fail=None):
+    async def compute():
+        calls.append(None)
+        await asyncio.sleep(0.05)
+        if fail is not None:
+            raise fail
+        return body
+    return compute
+
+async def start(cache, compute):
+    task = asyncio.create_task(cache.get_or_compute("board", "key", compute))
+    await asyncio.sleep(0.01)
+    return task
+
+def test_concurrent_misses_compute_once():
+    async def scenario():
+        cache, calls = make_cache(), []
+        leader = await start(cache, slow_compute(calls))
+        waiter = await start(cache, slow_compute(calls))
+        assert await asyncio.gather(leader, waiter) == [b"[]", b"[]"]
+        assert len(calls) == 1
+        assert cache.namespaces["board"].coalesced == 1
+    asyncio.run(scenario())
+
+def test_waiter_recomputes_when_the_leader_is_cancelled():
+    async def scenario():
+        cache, calls = make_cache(), []
+        leader = await start(cache, slow_compute(calls))
+        waiter = await start(cache, slow_compute(calls))
+        leader.cancel()
+        assert await waiter == b"[]"
+        assert leader.cancelled()
+        assert len(calls) == 2
+        # The recomputed body is cached as usual
+        assert cache.get("board", "key") == b"[]"
+    asyncio.run(scenario())
+
+def test_cancelled_waiter_leaves_the_leader_running():
+    async def scenario():
+        cache, calls = make_cache(), []
+        leader = await start(cache, slow_compute(calls))
+        waiter = await start(cache, slow_compute(calls))
+        waiter.cancel()
+        assert await leader == b"[]"
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert len(calls) == 1
+    asyncio.run(scenario())
+
+def test_leader_failure_reaches_the_waiters():
+    async def scenario():
+        cache, calls = make_cache(), []
+        leader = await start(cache, slow_compute(calls, fail=RuntimeError("database is locked")))
+        waiter = await start(cache, slow_compute(calls))
+        for task in (leader, waiter):
+            with pytest.raises(RuntimeError):
+                await task
+        assert len(calls) == 1
+    asyncio.run(scenario())
@@ -0,0 +1,50 @@
+"""
+Student search on SQLite: short terms match anywhere in the name, longer
+ones go through the FTS5 trigram index.
+"""
+import pytest
+from sqlalchemy import create_engine, insert, select
+
+from app.database.base import Base
+from app.models.student import Student
+from app.utils.student_search import apply_student_search
+
+@pytest.fixture
+def connection():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(insert(Student), [
+            {"name": name, "grade": grade, "phone": phone, "memo": memo}
+            for name, grade, phone, memo in (
+                ("동민수", "중1", None, None),
+                ("홍길동", "중3", "010-1234-5678", None),
+                ("김길동", "고1", None, "수학 심화반"),
+                ("이서연", "중2", None, None),
+                ("길하은", "초6", None, None),
+                ("박50%", "초5", None, None)
+            )
+        ])
+        yield connection
+    engine.dispose()
+
+def search(connection, terms):
+    query, ordering = apply_student_search(select(Student.name), terms, "sqlite")
+    return connection.execute(query.order_by(*ordering, Student.id)).scalars().all()
+
+def test_short_term_matches_anywhere_in_the_name(connection):
+    # Names starting with the term first, then the rest by name
+    assert search(connection, "동") == ["동민수", "김길동", "홍길동"]
+
+def test_short_term_lists_given_name_matches_first(connection):
+    assert search(connection, "길") == ["길하은", "김길동", "홍길동"]
+    assert search(connection, "길동") == ["김길동", "홍길동"]
+
+def test_short_term_wildcards_are_literal(connection):
+    assert search(connection, "0%") == ["박50%"]
+    assert search(connection, "_") == []
+
+def test_long_terms_use_the_index_across_columns(connection):
+    assert search(connection, "1234") == ["홍길동"]
+    assert search(connection, "심화반") == ["김길동"]
+    assert search(connection, "길동 심화반") == ["김길동"]